@@ -28,24 +28,39 @@ from datetime import datetime
 import subprocess
 import platform
 import sys
+import time
+import multiprocessing
+import queue
+
+from secoes import Secao, blocos_em_fluxo, carregar_marcadores, secoes_em_fluxo
+from documentos import DocumentosAbertos
+from legendas import Legendas, formatar_tempo, ler_tempo
+from reanalise import AnaliseIncremental
+from cache_secoes import CacheSecoes, NOME_ARQUIVO_CACHE
+from analise_paralela import AnaliseParalela, vale_paralelizar
+from sistema_arquivos import ListagemPastas, caminho_relativo
+from biblioteca import (
+    BibliotecaRoteiros, IndiceRoteiros, Roteiro, VarreduraBiblioteca, NOME_ARQUIVO_BIBLIOTECA,
+    NOMES_TEXTO_NARRADO
+)
+from observador import criar_observador
+from historico import HistoricoCopias, NOME_ARQUIVO_HISTORICO, NOME_ARQUIVO_HISTORICO_LEGADO
+from raizes import (
+    adicionar_raiz, carregar_opcoes_registro, carregar_profundidade, carregar_raizes, nome_canal,
+    normalizar_raiz, salvar_raizes
+)
+from registro import NIVEIS, configurar_registro, definir_nivel, nivel_atual, obter_logger, registro_memoria
+
+log = obter_logger("app")
+
+# Arquivos analisados antes de serem abertos no Visualizar (narrado + recentes)
+LIMITE_PRE_CARGA = 3
+LIMITE_ARQUIVOS_RECENTES = 50
 
-class ScriptCopier:
-    def listar_arquivos_incluindo_ocultos(self, caminho):
-        try:
-            if platform.system() == 'Windows':
-                cmd = f'cmd /c "dir /b /a "{caminho}""'
-                result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-                if result.returncode == 0:
-                    items = result.stdout.strip().split('\n')
-                    return [item.strip() for item in items if item.strip()]
-                else:
-                    return os.listdir(caminho)
-            else:
-                return os.listdir(caminho)
-        except Exception as e:
-            return os.listdir(caminho) if os.path.exists(caminho) else []
 
+class ScriptCopier:
     def __init__(self, root):
+        configurar_registro(*carregar_opcoes_registro())
         self.root = root
         self.root.title("Script Copier Universal - By Nardoto")
         self.root.geometry("1200x750")
@@ -59,14 +74,40 @@ class ScriptCopier:
 
         self.arquivo_atual = ""
         self.secoes = {}
-        self.texto_completo = ""
         self.pasta_roteiros = ""
         self.pasta_raiz_selecionada = ""
-        self.roteiros_disponiveis = {}
-        self.roteiro_atual = None
+        self.roteiro_atual = None  # Pasta do roteiro relativa à raiz (chave do histórico)
+        self.nome_roteiro_atual = None
         self.pasta_roteiro_atual = ""
-        self.historico_copias = {}
+        self.historico = None  # HistoricoCopias da pasta raiz aberta (historico.db)
         self.historico_modificado = False  # Flag para detectar mudanças
+        self.carga_secoes = None  # (documento, gerador) da leitura em fluxo do roteiro
+        self.carga_secoes_after = None
+        self.documentos = DocumentosAbertos()  # Arquivos indexados por linha (lidos sob demanda)
+        self.analise_roteiro = None  # Estado da última análise (para recarregar só o que mudou)
+        self.botoes_secoes = {}  # {Secao: (frame, botão)}
+        self.cache_secoes = None  # Cache em disco das seções (cache_secoes.db na pasta raiz)
+        self.marcadores = carregar_marcadores()  # Detectores (padrão + marcadores.json da pasta raiz)
+        self.caminho_visualizado = ""  # Arquivo exibido na aba Visualizar
+        self.intervalo_visualizado = None  # (início, fim) em ms da seção .srt exibida
+        self.analise_paralela = AnaliseParalela()  # Pool que analisa os arquivos da pasta
+        self.analise_pendente = {}  # {caminho: (item_id, nome, stat)} ainda no pool
+        self.analise_pendente_after = None
+        self.arquivos_recentes = []  # Arquivos abertos no Visualizar, o mais recente primeiro
+        self.pastas = ListagemPastas()  # Listagens (os.scandir) em cache por pasta
+        self.raizes = carregar_raizes()  # Pastas raiz registradas (uma por canal)
+        self.profundidade_maxima = carregar_profundidade()  # Níveis de subpastas percorridos na busca
+        self.canais = {}  # {nome exibido: raiz} do filtro de canal
+        self.canal_filtro = ""  # Raiz exibida no combobox ("" = todos os canais)
+        self.roteiros_por_raiz = {}  # {raiz: [Roteiro]} da última busca de cada raiz
+        self.marcadores_raiz = {}  # {raiz: Marcadores} usados na busca de cada raiz
+        self.bibliotecas = {}  # {raiz: BibliotecaRoteiros} (biblioteca.db em cada raiz)
+        self.indice_roteiros = IndiceRoteiros()  # Rótulos do combobox ↔ Roteiros ↔ pastas
+        self.observadores = {}  # {raiz: observador} avisam de mudanças (thread + fila)
+        self.observador_after = None
+        self.varreduras = {}  # {raiz: VarreduraBiblioteca} buscas em andamento (threads)
+        self.percursos_raiz = {}  # {raiz: PercursoPastas} da última busca completa (pastas visitadas/puladas)
+        self.varredura_after = None
 
         self.configurar_estilo()
         self.criar_interface()
@@ -193,7 +234,7 @@ class ScriptCopier:
         # Botão selecionar pasta na mesma linha
         btn_selecionar = tk.Button(
             frame_titulo_linha,
-            text="📁 Selecionar Pasta",
+            text="📁 Adicionar Pasta",
             command=self.selecionar_pasta_raiz,
             bg=self.accent_color,
             fg="white",
@@ -224,6 +265,41 @@ class ScriptCopier:
         frame_selecao_mestre = tk.Frame(frame_mestre, bg=self.bg_color)
         frame_selecao_mestre.pack(fill=tk.X)
 
+        # Filtro de canal: escolhe uma das raízes registradas sem nova busca
+        tk.Label(
+            frame_selecao_mestre,
+            text="Canal:",
+            bg=self.bg_color,
+            fg=self.fg_color,
+            font=(self.font_family, 10, "bold")
+        ).pack(side=tk.LEFT, padx=(0, 5))
+
+        self.combo_canal = ttk.Combobox(
+            frame_selecao_mestre,
+            state="readonly",
+            font=("Arial", 10),
+            width=20
+        )
+        self.combo_canal.pack(side=tk.LEFT, padx=(0, 5))
+        self.combo_canal.bind("<<ComboboxSelected>>", self.ao_selecionar_canal)
+
+        btn_remover_canal = tk.Button(
+            frame_selecao_mestre,
+            text="➖",
+            command=self.remover_canal,
+            bg=self.button_bg,
+            fg=self.fg_color,
+            font=(self.font_family, 9),
+            relief=tk.FLAT,
+            padx=8,
+            pady=4,
+            cursor="hand2",
+            borderwidth=0
+        )
+        btn_remover_canal.pack(side=tk.LEFT, padx=(0, 15))
+        btn_remover_canal.bind("<Enter>", lambda e: btn_remover_canal.config(bg=self.button_hover))
+        btn_remover_canal.bind("<Leave>", lambda e: btn_remover_canal.config(bg=self.button_bg))
+
         tk.Label(
             frame_selecao_mestre,
             text="Selecione o Roteiro:",
@@ -244,7 +320,7 @@ class ScriptCopier:
         btn_atualizar = tk.Button(
             frame_selecao_mestre,
             text="🔄",
-            command=self.buscar_pasta_roteiros,
+            command=self.atualizar_canal,
             bg=self.button_bg,
             fg=self.fg_color,
             font=(self.font_family, 9),
@@ -258,6 +334,25 @@ class ScriptCopier:
         btn_atualizar.bind("<Enter>", lambda e: btn_atualizar.config(bg=self.button_hover))
         btn_atualizar.bind("<Leave>", lambda e: btn_atualizar.config(bg=self.button_bg))
 
+        # Cancela a busca de roteiros (habilitado só durante a busca)
+        self.btn_cancelar_busca = tk.Button(
+            frame_selecao_mestre,
+            text="⏹️",
+            command=self.cancelar_busca_roteiros,
+            bg=self.button_bg,
+            fg=self.fg_color,
+            font=(self.font_family, 9),
+            relief=tk.FLAT,
+            padx=8,
+            pady=4,
+            cursor="hand2",
+            borderwidth=0,
+            state=tk.DISABLED
+        )
+        self.btn_cancelar_busca.pack(side=tk.LEFT, padx=(0, 5))
+        self.btn_cancelar_busca.bind("<Enter>", lambda e: self.btn_cancelar_busca.config(bg=self.button_hover))
+        self.btn_cancelar_busca.bind("<Leave>", lambda e: self.btn_cancelar_busca.config(bg=self.button_bg))
+
         btn_abrir = tk.Button(
             frame_selecao_mestre,
             text="📂",
@@ -518,6 +613,7 @@ class ScriptCopier:
         self.tree_arquivos.bind("<Enter>", lambda e: self.tree_arquivos.bind("<MouseWheel>", scroll_tree))
         self.tree_arquivos.bind("<Leave>", lambda e: self.tree_arquivos.unbind("<MouseWheel>"))
         self.tree_arquivos.bind("<<TreeviewSelect>>", self.arquivo_tree_selecionado)
+        self.tree_arquivos.bind("<<TreeviewOpen>>", self.ao_expandir_arquivo_tree)
 
         frame_dir = tk.Frame(frame_principal, bg=self.bg_color)
         frame_dir.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -566,6 +662,23 @@ class ScriptCopier:
         btn_copiar_vis.bind("<Enter>", lambda e: btn_copiar_vis.config(bg=self.accent_hover))
         btn_copiar_vis.bind("<Leave>", lambda e: btn_copiar_vis.config(bg=self.accent_color))
 
+        btn_intervalo_vis = tk.Button(
+            frame_acoes_vis,
+            text="⏱️ Copiar Intervalo",
+            command=self.copiar_intervalo_legendas,
+            bg=self.button_bg,
+            fg=self.fg_color,
+            font=(self.font_family, 9),
+            relief=tk.FLAT,
+            padx=8,
+            pady=4,
+            cursor="hand2",
+            borderwidth=0
+        )
+        btn_intervalo_vis.pack(side=tk.LEFT, padx=(0, 5))
+        btn_intervalo_vis.bind("<Enter>", lambda e: btn_intervalo_vis.config(bg=self.button_hover))
+        btn_intervalo_vis.bind("<Leave>", lambda e: btn_intervalo_vis.config(bg=self.button_bg))
+
         btn_recarregar_vis = tk.Button(
             frame_acoes_vis,
             text="🔄",
@@ -628,8 +741,12 @@ class ScriptCopier:
         self.label_status_vis.pack(side=tk.LEFT, padx=15, pady=8)
 
     def mostrar_tela_inicial(self):
-        """Mostra tela inicial solicitando seleção da pasta raiz"""
-        self.atualizar_status("👆 Clique no botão azul acima para selecionar a pasta raiz do projeto")
+        """Mostra tela inicial solicitando seleção da pasta raiz (ou busca nas raízes já registradas)"""
+        self.atualizar_lista_canais()
+        if self.raizes:
+            self.buscar_pasta_roteiros()
+        else:
+            self.atualizar_status("👆 Clique no botão azul acima para selecionar a pasta raiz do projeto")
 
     def mostrar_ajuda(self):
         """Mostra janela com instruções de como estruturar arquivos"""
@@ -651,7 +768,23 @@ ROTEIROS_GERADOS/
 ├── NOME_DO_ROTEIRO_2/
 │   └── arquivo.txt (qualquer arquivo .txt)
 │
-└── historico.json (criado automaticamente)
+└── historico.db (criado automaticamente)
+
+Vários canais: use "📁 Adicionar Pasta" uma vez para cada pasta raiz.
+As pastas ficam registradas para as próximas vezes; o filtro "Canal"
+mostra um canal ou todos, e o 🔄 busca de novo só o canal filtrado.
+Cada pasta raiz mantém seu próprio histórico de cópias (historico.db);
+dois computadores abertos na mesma pasta raiz somam as cópias.
+
+Roteiros organizados em subpastas (ex.: 2024/03/NOME_DO_ROTEIRO) também
+são encontrados, por padrão até 4 níveis abaixo da pasta raiz
+("profundidade_maxima" no raizes.json, na pasta de configuração do app).
+Para pular pastas de mídia, crie um .scriptcopierignore na pasta raiz,
+uma regra por linha:
+
+renders/
+audio/
+2019/*/brutos
 
 
 📄 PADRÕES DE SEÇÕES RECONHECIDOS:
@@ -665,6 +798,20 @@ O app identifica automaticamente seções usando estes padrões:
 ✓ PART 1 - Título da Parte  |  PART ONE - Título da Parte
 ✓ CONCLUSION - Título da Conclusão
 
+Marcadores próprios: crie um marcadores.json na pasta raiz, por exemplo:
+
+{"roteiro": {"marcadores": [
+    {"tipo": "intervalo", "palavras": ["BREAK"],
+     "titulo": " *- *.+", "nivel": 1, "icone": "⏸️"}
+]}}
+
+("roteiro" = aba Copiar, "estrutura" = árvores do Visualizar; os seus
+marcadores são testados antes dos padrão, ou use "substituir": true)
+
+Textos sem marcadores são divididos em blocos por linhas em branco.
+Para ajustar: {"blocos": {"intervalo_minimo": 2, "tamanho_maximo": 20000}}
+(linhas em branco seguidas entre blocos | caracteres por bloco)
+
 
 📋 EXEMPLO 1: 01_Roteiro_Estruturado.txt
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -771,9 +918,15 @@ história sagrada, inscreva-se no canal!
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 ✓ Funciona com arquivos .txt e .srt
+✓ Legendas .srt: a aba Visualizar mostra o tempo de cada seção e o
+  botão ⏱️ Copiar Intervalo copia as legendas entre dois tempos
 ✓ Aceita pastas com estrutura organizada OU arquivos diretos
 ✓ Detecta automaticamente o formato
 ✓ Salva histórico de cópias automaticamente
+✓ Corrigir o título (ou parte do texto) de uma seção não perde as
+  marcações de cópia: a seção é reconhecida pelo título e pelo conteúdo
+✓ Registro (log) no botão 📜 Registro abaixo; para gravar também em
+  arquivo, "log_arquivo": true no raizes.json (scriptcopier.log)
 ✓ Arquivos podem ter qualquer nome (não precisa ser exatamente esses nomes)
 """
 
@@ -801,9 +954,28 @@ história sagrada, inscreva-se no canal!
         text_ajuda.insert(1.0, ajuda_texto)
         text_ajuda.config(state=tk.DISABLED)
 
+        frame_botoes = tk.Frame(janela_ajuda, bg=self.bg_color)
+        frame_botoes.pack(pady=(0, 20))
+
+        # Botão do registro (log)
+        btn_registro = tk.Button(
+            frame_botoes,
+            text="📜 Registro",
+            command=self.mostrar_registro,
+            bg=self.button_bg,
+            fg=self.fg_color,
+            font=(self.font_family, 10, "bold"),
+            relief=tk.FLAT,
+            padx=20,
+            pady=10,
+            cursor="hand2",
+            borderwidth=0
+        )
+        btn_registro.pack(side=tk.LEFT, padx=5)
+
         # Botão fechar
         btn_fechar = tk.Button(
-            janela_ajuda,
+            frame_botoes,
             text="Fechar",
             command=janela_ajuda.destroy,
             bg=self.accent_color,
@@ -815,7 +987,94 @@ história sagrada, inscreva-se no canal!
             cursor="hand2",
             borderwidth=0
         )
-        btn_fechar.pack(pady=(0, 20))
+        btn_fechar.pack(side=tk.LEFT, padx=5)
+
+    def mostrar_registro(self):
+        """Mostra as últimas mensagens do registro (log) e permite mudar o nível"""
+        memoria = registro_memoria()
+
+        janela = tk.Toplevel(self.root)
+        janela.title("Registro do Script Copier")
+        janela.geometry("900x500")
+        janela.configure(bg=self.bg_color)
+
+        frame_topo = tk.Frame(janela, bg=self.bg_color)
+        frame_topo.pack(fill=tk.X, padx=20, pady=(20, 5))
+
+        tk.Label(
+            frame_topo,
+            text="Nível:",
+            bg=self.bg_color,
+            fg=self.fg_color,
+            font=(self.font_family, 10)
+        ).pack(side=tk.LEFT)
+
+        combo_nivel = ttk.Combobox(frame_topo, values=NIVEIS, state="readonly", width=10)
+        combo_nivel.set(nivel_atual())
+        combo_nivel.pack(side=tk.LEFT, padx=5)
+
+        tk.Label(
+            frame_topo,
+            text="(DEBUG mostra cada cópia; vale até fechar o app — para manter, use \"log_nivel\" no raizes.json)",
+            bg=self.bg_color,
+            fg=self.fg_secondary,
+            font=(self.font_family, 9)
+        ).pack(side=tk.LEFT, padx=5)
+
+        text_registro = scrolledtext.ScrolledText(
+            janela,
+            wrap=tk.NONE,
+            font=("Consolas", 9),
+            bg=self.bg_secondary,
+            fg=self.fg_color,
+            padx=10,
+            pady=10,
+            relief=tk.FLAT
+        )
+        text_registro.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
+
+        def atualizar():
+            linhas = memoria.linhas() if memoria else []
+            text_registro.config(state=tk.NORMAL)
+            text_registro.delete(1.0, tk.END)
+            text_registro.insert(1.0, "\n".join(linhas) if linhas else "(nenhuma mensagem registrada)")
+            text_registro.config(state=tk.DISABLED)
+            text_registro.see(tk.END)
+
+        def mudar_nivel(event=None):
+            definir_nivel(combo_nivel.get())
+            log.info("Nível do registro: %s", combo_nivel.get())
+            atualizar()
+
+        def copiar():
+            pyperclip.copy("\n".join(memoria.linhas()) if memoria else "")
+            self.atualizar_status("✅ Registro copiado!")
+
+        combo_nivel.bind("<<ComboboxSelected>>", mudar_nivel)
+
+        frame_botoes = tk.Frame(janela, bg=self.bg_color)
+        frame_botoes.pack(pady=(5, 20))
+
+        for texto, comando, cor, cor_texto in (
+            ("🔄 Atualizar", atualizar, self.button_bg, self.fg_color),
+            ("📋 Copiar", copiar, self.button_bg, self.fg_color),
+            ("Fechar", janela.destroy, self.accent_color, "white"),
+        ):
+            tk.Button(
+                frame_botoes,
+                text=texto,
+                command=comando,
+                bg=cor,
+                fg=cor_texto,
+                font=(self.font_family, 10, "bold"),
+                relief=tk.FLAT,
+                padx=20,
+                pady=10,
+                cursor="hand2",
+                borderwidth=0
+            ).pack(side=tk.LEFT, padx=5)
+
+        atualizar()
 
     def criar_atalho_dialog(self):
         """Mostra diálogo para criar atalhos do aplicativo"""
@@ -1122,66 +1381,87 @@ Obrigado por usar o Script Copier Universal! 🚀
         if self.historico_modificado:
             resposta = messagebox.askyesnocancel(
                 "Salvar Estado",
-                "Você fez alterações não salvas.\n\n"
+                "Você fez alterações desde o último salvamento.\n\n"
                 "Deseja salvar antes de sair?\n\n"
-                "• SIM: Salva o histórico de cópias\n"
-                "• NÃO: Sai sem salvar\n"
+                "• SIM: Salva o histórico de cópias e as informações do vídeo\n"
+                "• NÃO: Sai sem salvar as informações do vídeo\n"
+                "   (as cópias já registradas são gravadas de qualquer forma)\n"
                 "• CANCELAR: Volta ao aplicativo"
             )
 
             if resposta is None:  # Cancelar
                 return
             elif resposta:  # Sim - Salvar
-                self.salvar_estado_completo()
-                messagebox.showinfo("Sucesso", "Estado salvo com sucesso!")
+                if self.salvar_estado_completo():
+                    messagebox.showinfo("Sucesso", "Estado salvo com sucesso!")
 
         # Fecha o aplicativo
+        self.cancelar_carga_secoes()
+        self.cancelar_analise_pasta()
+        self.cancelar_busca_roteiros()
+        self.parar_observador()
+        self.analise_paralela.fechar()
+        self.documentos.fechar_todos()
+        if self.cache_secoes:
+            self.cache_secoes.fechar()
+        if self.historico:
+            if self.historico.nao_gravadas():
+                self.atualizar_status("💾 Gravando o histórico de cópias...")
+                self.root.update_idletasks()
+            perdidas = self.historico.fechar()
+            if perdidas:
+                messagebox.showwarning(
+                    "Histórico",
+                    f"{perdidas} cópia(s) não puderam ser gravadas no histórico:\n"
+                    f"{self.historico.erro or 'banco ocupado'}"
+                )
+        for biblioteca in self.bibliotecas.values():
+            biblioteca.fechar()
         self.root.destroy()
 
     def salvar_estado_completo(self):
         """Salva todo o estado do aplicativo (sem mensagem)"""
         try:
-            # Salva o histórico de cópias
-            self.salvar_historico()
+            # Salva o histórico de cópias (avisa se alguma ficou na fila)
+            salvo = self.salvar_historico()
 
             # Marca como salvo
-            self.historico_modificado = False
+            self.historico_modificado = not salvo
 
             # Se houver roteiro selecionado, salva info do vídeo também
             if self.pasta_roteiro_atual:
                 self.salvar_info_video(mostrar_mensagem=False)
 
-            return True
+            return salvo
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao salvar estado:\n{str(e)}")
             return False
 
     def salvar_estado_completo_manual(self):
         """Salva o estado manualmente via botão"""
-        if not self.pasta_raiz_selecionada:
+        if not self.raizes:
             messagebox.showwarning("Aviso", "Selecione uma pasta raiz primeiro!")
             return
 
         try:
-            # Salva o histórico de cópias
-            self.salvar_historico()
-
-            # Conta quantas cópias foram salvas
-            total_copias = sum(
-                len(secoes)
-                for secoes in self.historico_copias.values()
-            )
+            # Salva o histórico de cópias (avisa se alguma ficou na fila)
+            salvo = self.salvar_historico()
 
             # Se houver roteiro selecionado, salva info do vídeo também
             if self.pasta_roteiro_atual:
                 self.salvar_info_video(mostrar_mensagem=False)
+            if not salvo:
+                return
+
+            # Conta quantas cópias foram salvas
+            total_roteiros, total_copias = self.historico.resumo() if self.historico else (0, 0)
 
             agora = datetime.now()
             messagebox.showinfo(
                 "✅ Estado Salvo",
                 f"Estado salvo com sucesso!\n\n"
                 f"📋 Total de cópias: {total_copias}\n"
-                f"📂 Roteiros: {len(self.historico_copias)}\n"
+                f"📂 Roteiros: {total_roteiros}\n"
                 f"🕒 Data: {agora.strftime('%d/%m/%Y às %H:%M')}"
             )
 
@@ -1191,25 +1471,88 @@ Obrigado por usar o Script Copier Universal! 🚀
             messagebox.showerror("Erro", f"Erro ao salvar estado:\n{str(e)}")
 
     def selecionar_pasta_raiz(self):
-        """Permite ao usuário selecionar a pasta raiz do projeto"""
+        """Registra mais uma pasta raiz (canal) e busca os roteiros só dela"""
         pasta_selecionada = filedialog.askdirectory(
             title="Selecione a Pasta Raiz do Projeto (contém as subpastas dos roteiros)"
         )
 
         if pasta_selecionada:
-            self.pasta_raiz_selecionada = pasta_selecionada
+            raiz = adicionar_raiz(self.raizes, pasta_selecionada)
+            salvar_raizes(self.raizes)
+            self.atualizar_lista_canais()
+            # Busca roteiros na pasta selecionada (as outras raízes continuam no índice)
+            self.buscar_pasta_roteiros(raizes=[raiz])
+
+    def atualizar_lista_canais(self):
+        """Preenche o filtro de canal com as raízes registradas"""
+        self.canais = {nome_canal(raiz, self.raizes): raiz for raiz in self.raizes}
+        self.combo_canal['values'] = ["🌐 Todos os canais"] + list(self.canais)
+        if self.canal_filtro not in self.raizes:
+            self.canal_filtro = ""
+        nomes = {raiz: nome for nome, raiz in self.canais.items()}
+        self.combo_canal.set(nomes.get(self.canal_filtro, "🌐 Todos os canais"))
+
+        if self.raizes:
             self.label_pasta_selecionada.config(
-                text=f"📁 Pasta selecionada: {pasta_selecionada}",
+                text=f"📁 {len(self.raizes)} pasta(s) raiz: " + ", ".join(self.canais),
                 fg="#4CAF50"
             )
-            # Busca roteiros na pasta selecionada
-            self.buscar_pasta_roteiros()
+        else:
+            self.label_pasta_selecionada.config(text="Nenhuma pasta selecionada", fg=self.fg_secondary)
+
+    def ao_selecionar_canal(self, event=None):
+        """Filtra o combobox pelo canal escolhido (sem buscar de novo)"""
+        self.canal_filtro = self.canais.get(self.combo_canal.get(), "")
+        total = self.montar_lista_roteiros()
+        self.atualizar_status(f"✅ {total} roteiro(s) no canal")
+
+    def atualizar_canal(self):
+        """Botão 🔄: busca de novo só a raiz do canal filtrado (ou todas)
+
+        Também confere os arquivos das pastas que não mudaram, para pegar
+        edições feitas fora do app.
+        """
+        raizes = [self.canal_filtro] if self.canal_filtro else None
+        self.buscar_pasta_roteiros(completo=True, raizes=raizes)
+
+    def remover_canal(self):
+        """Tira a raiz do canal filtrado da biblioteca (os arquivos não são apagados)"""
+        raiz = self.canal_filtro
+        if not raiz:
+            messagebox.showwarning("Aviso", "Escolha no filtro o canal a remover.")
+            return
+        if not messagebox.askyesno("Remover Canal", f"Remover da lista a pasta raiz:\n{raiz}\n\nNenhum arquivo será apagado."):
+            return
+
+        varredura = self.varreduras.pop(raiz, None)
+        if varredura:
+            varredura.cancelar()
+        self.parar_observador(raiz)
+        self.roteiros_por_raiz.pop(raiz, None)
+        self.percursos_raiz.pop(raiz, None)
+        biblioteca = self.bibliotecas.pop(raiz, None)
+        if biblioteca:
+            biblioteca.fechar()
+
+        self.raizes.remove(raiz)
+        salvar_raizes(self.raizes)
+        self.atualizar_lista_canais()
+        total = self.montar_lista_roteiros()
+        self.atualizar_status(f"✅ Canal removido: {total} roteiro(s) nos demais canais")
 
     def carregar_arquivos_roteiro(self, event=None):
-        """Carrega os arquivos disponíveis e popula a árvore"""
+        """Carrega os arquivos disponíveis e popula a árvore
+
+        Só os nós dos arquivos são criados aqui: as seções de cada um são
+        lidas ao expandir ou selecionar o arquivo (popular_arquivo_tree).
+        O texto narrado e os arquivos abertos por último são analisados
+        antes, em segundo plano, para já estarem prontos quando abertos.
+        """
         if not self.pasta_roteiro_atual or not os.path.exists(self.pasta_roteiro_atual):
             return
 
+        self.cancelar_analise_pasta()
+
         # Limpa a árvore
         for item in self.tree_arquivos.get_children():
             self.tree_arquivos.delete(item)
@@ -1219,140 +1562,250 @@ Obrigado por usar o Script Copier Universal! 🚀
         self.tree_arquivos.heading('#0', text='Arquivos da Pasta')
 
         # Dicionário para guardar info dos arquivos e suas estruturas
-        self.mapa_arquivos = {}  # {item_id: {'tipo': 'arquivo'|'secao', 'caminho': '...', 'conteudo': '...'}}
+        self.mapa_arquivos = {}  # {item_id: {'tipo': 'arquivo'|'secao', 'caminho': '...', 'secao': Secao}}
 
         # Lista TODOS os arquivos .txt e .srt
         arquivos_encontrados = []
         try:
-            for arquivo in self.listar_arquivos_incluindo_ocultos(self.pasta_roteiro_atual):
-                caminho_completo = os.path.join(self.pasta_roteiro_atual, arquivo)
-                if arquivo.endswith(('.txt', '.srt')) and os.path.isfile(caminho_completo):
-                    arquivos_encontrados.append((arquivo, caminho_completo))
+            for entrada in self.pastas.arquivos(self.pasta_roteiro_atual, ('.txt', '.srt')):
+                arquivos_encontrados.append((entrada.name, entrada.path))
         except Exception as e:
             pass  # Silencioso em produção
 
-        if arquivos_encontrados:
-            # Ordena arquivos alfabeticamente
-            arquivos_encontrados.sort()
+        if not arquivos_encontrados:
+            self.label_status_vis.config(text="⚠️ Nenhum arquivo .txt ou .srt encontrado")
+            return
 
-            for arquivo, caminho in arquivos_encontrados:
-                # Determina o ícone baseado na extensão
-                if arquivo.endswith('.txt'):
-                    icone = "📄"
-                elif arquivo.endswith('.srt'):
-                    icone = "📝"
-                else:
-                    icone = "📋"
+        # Ordena arquivos alfabeticamente
+        arquivos_encontrados.sort()
 
-                # Adiciona o arquivo como nó principal
-                item_id = self.tree_arquivos.insert('', 'end', text=f"{icone} {arquivo}")
+        itens = {}  # {caminho normalizado: item_id}
+        for arquivo, caminho in arquivos_encontrados:
+            # Determina o ícone baseado na extensão
+            if arquivo.endswith('.txt'):
+                icone = "📄"
+            elif arquivo.endswith('.srt'):
+                icone = "📝"
+            else:
+                icone = "📋"
+
+            # Adiciona o arquivo como nó principal, com um filho provisório
+            # (mostra a seta de expandir até as seções serem lidas)
+            item_id = self.tree_arquivos.insert('', 'end', text=f"{icone} {arquivo}")
+            self.tree_arquivos.insert(item_id, 'end', text="⏳ Carregando seções...")
+
+            # Guarda informações do arquivo
+            self.mapa_arquivos[item_id] = {
+                'tipo': 'arquivo',
+                'caminho': caminho,
+                'nome': arquivo,
+                'carregado': False
+            }
+            itens[os.path.normpath(caminho)] = item_id
+
+        self.label_status_vis.config(text=f"✅ {len(arquivos_encontrados)} arquivo(s) encontrado(s)")
+        self.pre_carregar_arquivos(itens)
+
+    def pre_carregar_arquivos(self, itens):
+        """Analisa em segundo plano os arquivos que provavelmente serão abertos
+
+        O texto narrado primeiro, depois os abertos por último. Os que
+        estão no cache de seções entram direto; os outros vão ao pool, ou
+        são analisados aqui mesmo se forem pequenos (vale_paralelizar).
+        """
+        prioridade = []
+        for nome in NOMES_TEXTO_NARRADO:
+            entrada = self.pastas.entrada(self.pasta_roteiro_atual, nome)
+            if entrada is not None:
+                prioridade.append(os.path.normpath(entrada.path))
+        prioridade += [caminho for caminho in self.arquivos_recentes if caminho in itens]
+
+        a_analisar = {}
+        for caminho in prioridade[:LIMITE_PRE_CARGA]:
+            item_id = itens[caminho]
+            if self.mapa_arquivos[item_id]['carregado'] or caminho in a_analisar:
+                continue
+            try:
+                info = os.stat(caminho)
+                secoes = self.secoes_estrutura_em_cache(caminho, info)
+                if secoes is None:
+                    a_analisar[caminho] = (item_id, os.path.basename(caminho), info)
+                else:
+                    self.inserir_secoes_tree(item_id, caminho, secoes)
+            except Exception as e:
+                log.warning("Erro ao analisar %s: %s", caminho, e)
 
-                # Guarda informações do arquivo
-                self.mapa_arquivos[item_id] = {
-                    'tipo': 'arquivo',
-                    'caminho': caminho,
-                    'nome': arquivo
-                }
+        if not a_analisar:
+            return
 
-                # Tenta carregar e analisar estrutura do arquivo (BONUS)
+        # Poucos bytes: analisa direto, o pool custaria mais do que economiza
+        if not vale_paralelizar([info.st_size for _, _, info in a_analisar.values()]):
+            for caminho, (item_id, arquivo, info) in a_analisar.items():
                 try:
-                    with open(caminho, 'r', encoding='utf-8') as f:
-                        conteudo = f.read()
-
-                    # Analisa se tem estrutura (ACT, CHAPTER, etc.)
-                    secoes = self.detectar_secoes_arquivo(conteudo)
-
-                    if secoes:
-                        # Se tem estrutura, adiciona como sub-items
-                        for secao in secoes:
-                            icone_secao = "📖"
-                            if 'ACT' in secao['titulo'].upper() or 'ATO' in secao['titulo'].upper():
-                                icone_secao = "🎭"
-                            elif 'OPENING' in secao['titulo'].upper() or 'HOOK' in secao['titulo'].upper():
-                                icone_secao = "🎬"
-                            elif 'CLOSING' in secao['titulo'].upper() or 'CONCLUS' in secao['titulo'].upper():
-                                icone_secao = "🏁"
-
-                            titulo_curto = secao['titulo'][:70]
-                            if len(secao['titulo']) > 70:
-                                titulo_curto += "..."
-
-                            secao_id = self.tree_arquivos.insert(item_id, 'end', text=f"  {icone_secao} {titulo_curto}")
-
-                            # Guarda info da seção
-                            self.mapa_arquivos[secao_id] = {
-                                'tipo': 'secao',
-                                'caminho': caminho,
-                                'conteudo': secao['texto'],
-                                'titulo': secao['titulo']
-                            }
-
+                    self.inserir_secoes_tree(item_id, caminho, self.detectar_estrutura_arquivo(caminho, info))
                 except Exception as e:
-                    print(f"Erro ao analisar {arquivo}: {e}")
+                    log.warning("Erro ao analisar %s: %s", arquivo, e)
+            if self.cache_secoes:
+                self.cache_secoes.salvar()
+            return
 
-            self.label_status_vis.config(text=f"✅ {len(arquivos_encontrados)} arquivo(s) encontrado(s)")
-        else:
-            self.label_status_vis.config(text="⚠️ Nenhum arquivo .txt ou .srt encontrado")
+        try:
+            self.analise_pendente = a_analisar
+            self.analise_paralela.iniciar(list(a_analisar), self.pasta_raiz_selecionada)
+            self.analise_pendente_after = self.root.after(30, self.receber_analises_pasta)
+        except Exception as e:
+            log.warning("Análise paralela indisponível: %s", e)
+            self.cancelar_analise_pasta()
+
+    def ao_expandir_arquivo_tree(self, event=None):
+        """Lê as seções do arquivo ao expandir o nó dele"""
+        self.popular_arquivo_tree(self.tree_arquivos.focus())
+
+    def popular_arquivo_tree(self, item_id):
+        """Insere as seções de um arquivo da árvore, se ainda não foram lidas"""
+        info = self.mapa_arquivos.get(item_id)
+        if not info or info['tipo'] != 'arquivo' or info['carregado']:
+            return
+
+        caminho = os.path.normpath(info['caminho'])
+        self.analise_pendente.pop(caminho, None)  # Se ainda estiver no pool, o resultado é ignorado
+        try:
+            secoes = self.secoes_estrutura_arquivo(caminho)
+        except Exception as e:
+            log.warning("Erro ao analisar %s: %s", info['nome'], e)
+            secoes = []
+        self.inserir_secoes_tree(item_id, caminho, secoes)
+        if self.cache_secoes:
+            self.cache_secoes.salvar()
+
+    def inserir_secoes_tree(self, item_id, caminho, secoes):
+        """Adiciona as seções do arquivo como sub-itens na árvore (no lugar do filho provisório)"""
+        self.tree_arquivos.delete(*self.tree_arquivos.get_children(item_id))
+        self.mapa_arquivos[item_id]['carregado'] = True
+
+        for secao in secoes:
+            icone_secao = self.marcadores.estrutura.icone(secao.tipo)
+            recuo = "  " * self.marcadores.estrutura.niveis.get(secao.tipo, 1)
+
+            titulo_curto = secao.titulo[:70]
+            if len(secao.titulo) > 70:
+                titulo_curto += "..."
+
+            secao_id = self.tree_arquivos.insert(item_id, 'end', text=f"{recuo}{icone_secao} {titulo_curto}")
+
+            # Guarda info da seção
+            self.mapa_arquivos[secao_id] = {
+                'tipo': 'secao',
+                'caminho': caminho,
+                'secao': secao,
+                'titulo': secao.titulo
+            }
+
+    def receber_analises_pasta(self):
+        """Coloca na árvore as análises que o pool já terminou"""
+        self.analise_pendente_after = None
+        cache = self.obter_cache_secoes()
 
-    def detectar_secoes_arquivo(self, conteudo):
-        """Detecta seções em um arquivo (BONUS se tiver estrutura)"""
-        secoes = []
-        linhas = conteudo.split('\n')
-
-        # Padrões para identificar seções
-        padroes = [
-            r'^(?:ATO|ACT)\s+([IVX\d]+)',
-            r'^(?:PARTE|PART)\s+([IVX\d]+)',
-            r'^(?:CAPÍTULO|CAPITULO|CHAPTER|CAP\.?)\s+([IVX\d]+)',
-            r'^(?:CENA|SCENE)\s+([IVX\d]+)',
-            r'^(?:HOOK|ABERTURA|OPENING)',
-            r'^(?:CONCLUS[ÃA]O|CLOSING|ENCERRAMENTO)',
-            r'^(?:EPÍLOGO|EPILOGO|EPILOGUE)'
-        ]
-
-        secao_atual = None
-        texto_secao = []
-        linha_inicio = 0
-
-        for i, linha in enumerate(linhas):
-            linha_limpa = linha.strip()
-
-            # Pula linhas vazias e decorativas
-            if not linha_limpa or re.match(r'^[=\-▓━╔╗║╚═]{3,}$', linha_limpa):
+        for caminho, linhas, erro in self.analise_paralela.prontos():
+            item_id, arquivo, info = self.analise_pendente.pop(caminho, (None, None, None))
+            if item_id is None or self.mapa_arquivos[item_id]['carregado']:
+                continue
+            if erro:
+                log.warning("Erro ao analisar %s: %s", arquivo, erro)
                 continue
 
-            # Remove símbolos decorativos
-            linha_para_analise = re.sub(r'\s*[▓▓▓━\-=]+\s*$', '', linha_limpa)
-
-            # Verifica se é uma seção
-            for padrao in padroes:
-                if re.match(padrao, linha_para_analise, re.IGNORECASE):
-                    # Salva seção anterior
-                    if secao_atual:
-                        secoes.append({
-                            'titulo': secao_atual,
-                            'texto': '\n'.join(texto_secao).strip()
-                        })
-
-                    # Inicia nova seção
-                    secao_atual = linha_para_analise
-                    texto_secao = [linha]
-                    linha_inicio = i
-                    break
-            else:
-                # Não é título de seção, adiciona ao texto
-                if secao_atual:
-                    texto_secao.append(linha)
+            secoes = [Secao.sem_texto(*linha) for linha in linhas]
+            if cache:
+                cache.guardar(caminho, 'estrutura', secoes, info)
+            self.inserir_secoes_tree(item_id, caminho, secoes)
+
+        if self.analise_pendente:
+            self.analise_pendente_after = self.root.after(30, self.receber_analises_pasta)
+            return
+
+        if self.cache_secoes:
+            self.cache_secoes.salvar()
+
+    def cancelar_analise_pasta(self):
+        """Descarta a análise em andamento (ex.: outra pasta foi selecionada)"""
+        if self.analise_pendente_after:
+            self.root.after_cancel(self.analise_pendente_after)
+            self.analise_pendente_after = None
+        self.analise_paralela.cancelar()
+        self.analise_pendente = {}
+
+    def secoes_estrutura_arquivo(self, caminho):
+        """Seções de estrutura do arquivo: do cache em disco se não mudou, senão detectadas"""
+        info = os.stat(caminho)
+        secoes = self.secoes_estrutura_em_cache(caminho, info)
+        if secoes is None:
+            secoes = self.detectar_estrutura_arquivo(caminho, info)
+        return secoes
+
+    def secoes_estrutura_em_cache(self, caminho, info):
+        """Seções do cache em disco (o arquivo nem é aberto), None se não houver"""
+        cache = self.obter_cache_secoes()
+        if cache:
+            return cache.buscar(os.path.normpath(caminho), 'estrutura', info)
+        return None
+
+    def detectar_estrutura_arquivo(self, caminho, info):
+        """Detecta as seções de estrutura e guarda no cache em disco"""
+        caminho = os.path.normpath(caminho)
+        cache = self.obter_cache_secoes()
 
-        # Salva última seção
-        if secao_atual:
-            secoes.append({
-                'titulo': secao_atual,
-                'texto': '\n'.join(texto_secao).strip()
-            })
+        # Lê em fluxo do arquivo: só o texto das seções fica em memória
+        documento = self.documentos.abrir(caminho)
+        if 'secoes_estrutura' not in documento.cache:
+            documento.cache['secoes_estrutura'] = list(secoes_em_fluxo(documento.linhas(), self.marcadores.estrutura))
+        secoes = documento.cache['secoes_estrutura']
 
+        if cache:
+            cache.guardar(caminho, 'estrutura', secoes, info)
         return secoes
 
+    def carregar_marcadores_pasta(self):
+        """Carrega os marcadores da pasta raiz (marcadores.json, se existir)"""
+        marcadores = carregar_marcadores(self.pasta_raiz_selecionada)
+        if marcadores.versao != self.marcadores.versao:
+            # Seções já detectadas com os marcadores antigos não valem mais
+            self.cancelar_carga_secoes()
+            self.documentos.fechar_todos()
+            self.analise_roteiro = None
+        self.marcadores = marcadores
+
+    def obter_biblioteca(self, raiz=None):
+        """Índice de roteiros de uma pasta raiz (em memória se não der para gravar na pasta)"""
+        raiz = normalizar_raiz(raiz or self.pasta_roteiros)
+        biblioteca = self.bibliotecas.get(raiz)
+        if biblioteca is None:
+            try:
+                biblioteca = BibliotecaRoteiros(os.path.join(raiz, NOME_ARQUIVO_BIBLIOTECA))
+            except Exception as e:
+                log.warning("Índice de roteiros de %s indisponível: %s (usando um índice em memória)", raiz, e)
+                biblioteca = BibliotecaRoteiros(":memory:")
+            self.bibliotecas[raiz] = biblioteca
+        return biblioteca
+
+    def obter_cache_secoes(self):
+        """Retorna o cache de seções da pasta raiz (None se não for possível usá-lo)"""
+        arquivo_historico = self.obter_arquivo_historico()
+        if not arquivo_historico:
+            return None
+
+        caminho_db = os.path.join(os.path.dirname(arquivo_historico), NOME_ARQUIVO_CACHE)
+        if (self.cache_secoes is None or self.cache_secoes.caminho_db != caminho_db
+                or self.cache_secoes.versao != self.marcadores.versao):
+            if self.cache_secoes:
+                self.cache_secoes.fechar()
+            try:
+                self.cache_secoes = CacheSecoes(caminho_db, self.marcadores.versao)
+            except Exception as e:
+                log.warning("Cache de seções indisponível (%s): %s", caminho_db, e)
+                self.cache_secoes = None
+
+        return self.cache_secoes
+
     def arquivo_tree_selecionado(self, event=None):
         """Chamado quando clica em um arquivo ou seção na árvore"""
         selecao = self.tree_arquivos.selection()
@@ -1364,12 +1817,17 @@ Obrigado por usar o Script Copier Universal! 🚀
             return
 
         info = self.mapa_arquivos[item_id]
+        self.caminho_visualizado = info['caminho']
+        self.intervalo_visualizado = None
 
         if info['tipo'] == 'arquivo':
-            # Carrega e exibe o arquivo completo
+            self.popular_arquivo_tree(item_id)
+            self.registrar_arquivo_recente(info['caminho'])
+
+            # Carrega e exibe o arquivo completo (o índice é reaproveitado entre cliques)
             try:
-                with open(info['caminho'], 'r', encoding='utf-8') as f:
-                    conteudo = f.read()
+                documento = self.documentos.abrir(info['caminho'])
+                conteudo = documento.texto
 
                 self.text_visualizar.config(state=tk.NORMAL)
                 self.text_visualizar.delete(1.0, tk.END)
@@ -1379,12 +1837,11 @@ Obrigado por usar o Script Copier Universal! 🚀
                 # Atualiza labels
                 self.label_arquivo_atual.config(text=f"📄 {info['nome']}")
 
-                num_palavras = len(conteudo.split())
-                num_linhas = len(conteudo.split('\n'))
-                num_chars = len(conteudo)
-                self.label_info_arquivo.config(
-                    text=f"({num_palavras} palavras | {num_linhas} linhas | {num_chars} caracteres)"
-                )
+                detalhes = f"{documento.palavras} palavras | {documento.total_linhas} linhas | {len(conteudo)} caracteres"
+                if info['caminho'].endswith('.srt'):
+                    legendas = self.legendas_arquivo(info['caminho'])
+                    detalhes += f" | {len(legendas)} legendas | ⏱️ {formatar_tempo(legendas.duracao)}"
+                self.label_info_arquivo.config(text=f"({detalhes})")
 
                 self.label_status_vis.config(text=f"✅ Arquivo carregado: {info['nome']}")
 
@@ -1394,7 +1851,12 @@ Obrigado por usar o Script Copier Universal! 🚀
 
         elif info['tipo'] == 'secao':
             # Exibe apenas a seção selecionada
-            texto = info['conteudo']
+            secao = info['secao']
+            if secao.buffer is None:
+                # Seção vinda do cache em disco: lê só as linhas dela do arquivo
+                texto = self.documentos.abrir(info['caminho']).trecho(secao.linha_inicio, secao.linha_fim).strip()
+            else:
+                texto = secao.texto
 
             self.text_visualizar.config(state=tk.NORMAL)
             self.text_visualizar.delete(1.0, tk.END)
@@ -1408,14 +1870,121 @@ Obrigado por usar o Script Copier Universal! 🚀
 
             self.label_arquivo_atual.config(text=f"📖 {titulo_display}")
 
-            num_palavras = len(texto.split())
             num_linhas = len(texto.split('\n'))
-            self.label_info_arquivo.config(
-                text=f"({num_palavras} palavras | {num_linhas} linhas)"
-            )
+            detalhes = f"{secao.palavras} palavras | {num_linhas} linhas"
+            if info['caminho'].endswith('.srt'):
+                # Tempo da seção: do primeiro ao último cue dentro dela
+                legendas = self.legendas_arquivo(info['caminho'])
+                self.intervalo_visualizado = legendas.intervalo(legendas.faixa_linhas(secao.linha_inicio, secao.linha_fim))
+                if self.intervalo_visualizado:
+                    inicio, fim = self.intervalo_visualizado
+                    detalhes += f" | ⏱️ {formatar_tempo(inicio)} → {formatar_tempo(fim)}"
+            self.label_info_arquivo.config(text=f"({detalhes})")
 
             self.label_status_vis.config(text=f"✅ Seção visualizada")
 
+    def registrar_arquivo_recente(self, caminho):
+        """Guarda o arquivo aberto no Visualizar (usado para pré-carregar as seções)"""
+        caminho = os.path.normpath(caminho)
+        if caminho in self.arquivos_recentes:
+            self.arquivos_recentes.remove(caminho)
+        self.arquivos_recentes.insert(0, caminho)
+        del self.arquivos_recentes[LIMITE_ARQUIVOS_RECENTES:]
+
+    def legendas_arquivo(self, caminho):
+        """Cues do .srt (interpretados uma vez por versão do arquivo)"""
+        documento = self.documentos.abrir(caminho)
+        if 'legendas' not in documento.cache:
+            documento.cache['legendas'] = Legendas(documento.texto)
+        return documento.cache['legendas']
+
+    def copiar_intervalo_legendas(self):
+        """Diálogo para copiar os cues do .srt exibido entre dois tempos"""
+        if not self.caminho_visualizado.endswith('.srt'):
+            messagebox.showinfo("Copiar Intervalo", "Selecione um arquivo .srt (ou uma seção dele) na árvore.")
+            return
+
+        try:
+            legendas = self.legendas_arquivo(self.caminho_visualizado)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao ler legendas:\n{str(e)}")
+            return
+
+        inicio, fim = self.intervalo_visualizado or (0, legendas.duracao)
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Copiar Intervalo")
+        dialog.configure(bg=self.bg_color)
+        dialog.resizable(False, False)
+
+        frame_campos = tk.Frame(dialog, bg=self.bg_color)
+        frame_campos.pack(padx=20, pady=(20, 10))
+
+        campos = {}
+        for linha, (rotulo, valor) in enumerate((("Início:", inicio), ("Fim:", fim))):
+            tk.Label(
+                frame_campos,
+                text=rotulo,
+                bg=self.bg_color,
+                fg=self.fg_color,
+                font=(self.font_family, 10)
+            ).grid(row=linha, column=0, sticky="w", pady=4)
+            entrada = tk.Entry(frame_campos, font=(self.font_mono, 10), width=16)
+            entrada.insert(0, formatar_tempo(valor))
+            entrada.grid(row=linha, column=1, padx=(10, 0), pady=4)
+            campos[rotulo] = entrada
+
+        somente_texto = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            dialog,
+            text="Somente o texto (sem números e tempos)",
+            variable=somente_texto,
+            bg=self.bg_color,
+            fg=self.fg_color,
+            selectcolor=self.bg_secondary,
+            activebackground=self.bg_color,
+            font=(self.font_family, 9)
+        ).pack(padx=20, anchor="w")
+
+        def copiar():
+            try:
+                t1 = ler_tempo(campos["Início:"].get())
+                t2 = ler_tempo(campos["Fim:"].get())
+            except ValueError as e:
+                messagebox.showerror("Erro", str(e), parent=dialog)
+                return
+
+            indices = legendas.entre(min(t1, t2), max(t1, t2))
+            if not indices:
+                messagebox.showinfo("Copiar Intervalo", "Nenhuma legenda nesse intervalo.", parent=dialog)
+                return
+
+            texto = legendas.texto_cues(indices) if somente_texto.get() else legendas.srt_cues(indices)
+            self.root.clipboard_clear()
+            self.root.clipboard_append(texto)
+            self.root.update()
+
+            self.label_status_vis.config(
+                text=f"✅ {len(indices)} legenda(s) copiada(s): {formatar_tempo(min(t1, t2))} → {formatar_tempo(max(t1, t2))}"
+            )
+            dialog.destroy()
+
+        btn_copiar = tk.Button(
+            dialog,
+            text="📋 Copiar",
+            command=copiar,
+            bg=self.accent_color,
+            fg="#ffffff",
+            font=(self.font_family, 10, "bold"),
+            relief=tk.FLAT,
+            padx=20,
+            pady=8,
+            cursor="hand2",
+            borderwidth=0
+        )
+        btn_copiar.pack(pady=(10, 20))
+        dialog.bind("<Return>", lambda e: copiar())
+
     def visualizar_arquivo_selecionado(self, event=None):
         """Visualiza o arquivo selecionado"""
         arquivo_nome = self.combo_arquivos.get()
@@ -1426,8 +1995,8 @@ Obrigado por usar o Script Copier Universal! 🚀
         self.arquivo_visualizacao_atual = caminho_arquivo
 
         try:
-            with open(caminho_arquivo, 'r', encoding='utf-8') as f:
-                conteudo = f.read()
+            self.documento_visualizado = self.documentos.abrir(caminho_arquivo)
+            conteudo = self.documento_visualizado.texto
 
             self.conteudo_atual = conteudo
 
@@ -1443,11 +2012,9 @@ Obrigado por usar o Script Copier Universal! 🚀
             # Atualiza labels
             self.label_arquivo_atual.config(text=f"📄 {arquivo_nome}")
 
-            num_palavras = len(conteudo.split())
-            num_linhas = len(conteudo.split('\n'))
-            num_chars = len(conteudo)
             self.label_info_arquivo.config(
-                text=f"({num_palavras} palavras | {num_linhas} linhas | {num_chars} caracteres)"
+                text=f"({self.documento_visualizado.palavras} palavras | "
+                     f"{self.documento_visualizado.total_linhas} linhas | {len(conteudo)} caracteres)"
             )
 
             self.label_status_vis.config(text=f"✅ Arquivo carregado: {arquivo_nome}")
@@ -1466,77 +2033,23 @@ Obrigado por usar o Script Copier Universal! 🚀
         self.tree_estrutura['columns'] = ()
         self.tree_estrutura.heading('#0', text='Estrutura do Documento')
 
-        linhas = conteudo.split('\n')
-        self.mapa_estrutura = {}  # {item_id: (inicio_linha, fim_linha, texto)}
+        self.mapa_estrutura = {}  # {item_id: Secao}
 
         # SEMPRE adiciona "Documento Completo" primeiro - GARANTIDO
         item_completo = self.tree_estrutura.insert('', 'end', text="📄 Documento Completo")
-        self.mapa_estrutura[item_completo] = (0, len(linhas) - 1, conteudo)
-
-        # Padrões para identificar seções - BONUS se o arquivo tiver estrutura
-        padroes = {
-            'ato': r'^(?:ATO|ACT)\s+([IVX\d]+)',
-            'parte': r'^(?:PARTE|PART)\s+([IVX\d]+)',
-            'capitulo': r'^(?:CAPÍTULO|CAPITULO|CHAPTER|CAP\.?)\s+([IVX\d]+)',
-            'cena': r'^(?:CENA|SCENE)\s+([IVX\d]+)',
-            'hook': r'^(?:HOOK|ABERTURA|OPENING)',
-            'conclusao': r'^(?:CONCLUS[ÃA]O|CLOSING|ENCERRAMENTO)',
-            'epilogo': r'^(?:EPÍLOGO|EPILOGO|EPILOGUE)'
-        }
-
-        itens_raiz = []
-        item_atual = None
-        linha_inicio = 0
-
-        # Tenta encontrar estrutura (BONUS)
-        for i, linha in enumerate(linhas):
-            linha_limpa = linha.strip()
-
-            # Pula linhas vazias e linhas decorativas
-            if not linha_limpa or re.match(r'^[=\-▓━╔╗║╚═]{3,}$', linha_limpa):
-                continue
+        self.mapa_estrutura[item_completo] = Secao(
+            conteudo, 'documento', "Documento Completo", 0, len(conteudo), 0, conteudo.count('\n')
+        )
 
-            # Remove símbolos decorativos do final da linha para análise
-            linha_para_analise = re.sub(r'\s*[▓▓▓━\-=]+\s*$', '', linha_limpa)
-
-            # Verifica cada padrão
-            for tipo, padrao in padroes.items():
-                match = re.match(padrao, linha_para_analise, re.IGNORECASE)
-                if match:
-                    # Adiciona item anterior se existir
-                    if item_atual:
-                        fim = i - 1
-                        texto_secao = '\n'.join(linhas[linha_inicio:fim + 1])
-                        self.mapa_estrutura[item_atual['id']] = (linha_inicio, fim, texto_secao)
-
-                    # Cria novo item
-                    titulo = linha_para_analise[:80]
-                    if len(linha_para_analise) > 80:
-                        titulo += "..."
-
-                    # Determina o ícone baseado no tipo
-                    icone = "📖"
-                    if tipo == 'ato':
-                        icone = "🎭"
-                    elif tipo == 'hook':
-                        icone = "🎬"
-                    elif tipo == 'conclusao':
-                        icone = "🏁"
-                    elif tipo == 'parte':
-                        icone = "📚"
-                    elif tipo == 'capitulo':
-                        icone = "📖"
-
-                    item_id = self.tree_estrutura.insert('', 'end', text=f"{icone} {titulo}")
-                    item_atual = {'id': item_id, 'tipo': tipo, 'titulo': linha_para_analise}
-                    linha_inicio = i
-                    itens_raiz.append(item_atual)
-                    break
+        # Seções encontradas pelo detector compartilhado - BONUS se o arquivo tiver estrutura
+        for secao in self.marcadores.estrutura.secoes(conteudo):
+            titulo = secao.titulo[:80]
+            if len(secao.titulo) > 80:
+                titulo += "..."
 
-        # Adiciona último item se encontrou estrutura
-        if item_atual:
-            texto_secao = '\n'.join(linhas[linha_inicio:])
-            self.mapa_estrutura[item_atual['id']] = (linha_inicio, len(linhas) - 1, texto_secao)
+            icone = self.marcadores.estrutura.icone(secao.tipo)
+            item_id = self.tree_estrutura.insert('', 'end', text=f"{icone} {titulo}")
+            self.mapa_estrutura[item_id] = secao
 
     def item_selecionado(self, event=None):
         """Quando um item da árvore é selecionado"""
@@ -1548,7 +2061,10 @@ Obrigado por usar o Script Copier Universal! 🚀
         if item_id not in self.mapa_estrutura:
             return
 
-        inicio, fim, texto = self.mapa_estrutura[item_id]
+        secao = self.mapa_estrutura[item_id]
+
+        # Lê a faixa pelo índice de linhas, sem reler o arquivo
+        texto = self.documento_visualizado.trecho(secao.linha_inicio, secao.linha_fim)
 
         # Exibe o texto da seção
         self.text_visualizar.config(state=tk.NORMAL)
@@ -1557,10 +2073,9 @@ Obrigado por usar o Script Copier Universal! 🚀
         self.text_visualizar.config(state=tk.DISABLED)
 
         # Atualiza info
-        num_palavras = len(texto.split())
-        num_linhas = len(texto.split('\n'))
+        num_linhas = secao.linha_fim - secao.linha_inicio + 1
         self.label_info_arquivo.config(
-            text=f"({num_palavras} palavras | {num_linhas} linhas | Linhas {inicio+1}-{fim+1})"
+            text=f"({secao.palavras} palavras | {num_linhas} linhas | Linhas {secao.linha_inicio+1}-{secao.linha_fim+1})"
         )
 
         titulo_item = self.tree_estrutura.item(item_id)['text']
@@ -1583,219 +2098,501 @@ Obrigado por usar o Script Copier Universal! 🚀
 
     def recarregar_arquivo_atual(self):
         """Recarrega o arquivo atual"""
+        # Roteiro da aba Copiar: reanalisa só as seções que mudaram
+        if self.arquivo_atual and self.analise_roteiro:
+            self.recarregar_secoes_roteiro()
+
         if hasattr(self, 'arquivo_visualizacao_atual'):
             self.visualizar_arquivo_selecionado()
 
-    def buscar_pasta_roteiros(self):
-        """Lista os roteiros disponíveis na pasta raiz selecionada"""
-        # Limpa a lista anterior
-        self.roteiros_disponiveis = {}
-        self.combo_roteiro_mestre.set("")
-        self.combo_roteiro_mestre['values'] = []
+    def recarregar_secoes_roteiro(self):
+        """Relê o roteiro da aba Copiar e atualiza só os botões das seções alteradas"""
+        if self.carga_secoes:
+            return  # Ainda lendo o arquivo pela primeira vez
+
+        try:
+            documento = self.documentos.abrir(self.arquivo_atual)
+            if documento.cache.get('analise_roteiro') is self.analise_roteiro:
+                self.atualizar_status("✅ Roteiro sem alterações")
+                return
+
+            # Sem marcadores (divisão por blocos): recarrega tudo
+            if not self.analise_roteiro.secoes:
+                self.carregar_arquivo(self.arquivo_atual)
+                return
+
+            mudancas = self.analise_roteiro.reanalisar(documento)
+            documento.cache['analise_roteiro'] = self.analise_roteiro
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao recarregar arquivo:\n{str(e)}")
+            self.atualizar_status(f"❌ Erro: {str(e)}")
+            return
+
+        if mudancas is None:
+            self.atualizar_status("✅ Roteiro sem alterações")
+            return
+
+        if not mudancas.secoes:
+            self.carregar_arquivo(self.arquivo_atual)
+            return
+
+        self.aplicar_mudancas_secoes(mudancas)
+        self.atualizar_status(
+            f"✅ Roteiro atualizado: {len(mudancas.adicionadas)} nova(s), "
+            f"{len(mudancas.removidas)} removida(s), {len(mudancas.alteradas)} alterada(s)"
+        )
+
+    def aplicar_mudancas_secoes(self, mudancas):
+        """Atualiza o painel de seções sem recriar os botões que não mudaram"""
+        secao_exibida = self.secoes.get(getattr(self, 'secao_atual_indice', None))
+
+        # Remove os botões das seções que saíram ou mudaram
+        for secao in mudancas.removidas + [antiga for antiga, _ in mudancas.alteradas]:
+            if secao in self.botoes_secoes:
+                frame_btn, _ = self.botoes_secoes.pop(secao)
+                frame_btn.destroy()
+
+        self.secoes = dict(enumerate(mudancas.secoes))
+        self.associar_historico()  # Título corrigido: o botão novo já sai com o histórico
+
+        # De trás para frente: cada botão novo entra antes do seguinte
+        proximo = None
+        for indice in reversed(range(len(self.secoes))):
+            secao = self.secoes[indice]
+            if secao in self.botoes_secoes:
+                frame_btn, btn = self.botoes_secoes[secao]
+                btn.config(command=lambda idx=indice: self.exibir_secao(idx))
+            else:
+                frame_btn = self.criar_botao_secao(indice, antes=proximo)
+            proximo = frame_btn
+
+        # Mantém a seção que estava sendo exibida
+        if secao_exibida is not None:
+            indices = {secao: indice for indice, secao in self.secoes.items()}
+            if secao_exibida in indices:
+                self.secao_atual_indice = indices[secao_exibida]
+            else:
+                mesmo_titulo = [i for i, s in self.secoes.items() if s.titulo == secao_exibida.titulo]
+                if mesmo_titulo:
+                    self.exibir_secao(mesmo_titulo[0])
+                else:
+                    del self.secao_atual_indice
+                    self.btn_copiar.config(state=tk.DISABLED)
+
+    def buscar_pasta_roteiros(self, completo=False, raizes=None, manter_lista=False):
+        """Lista os roteiros das pastas raiz registradas
+
+        Cada raiz tem sua busca numa thread e o combobox vai sendo
+        preenchido em lotes (receber_busca_roteiros); buscar de novo uma
+        raiz cancela a busca anterior dela. raizes limita a busca a
+        algumas pastas (as outras continuam no índice como estavam).
+        completo=True também confere os arquivos das pastas que não
+        mudaram, para pegar edições feitas fora do app. manter_lista=True
+        deixa os roteiros já listados no combobox até a busca terminar
+        (revalidação pedida pelo observador).
+        """
+        raizes = list(self.raizes) if raizes is None else raizes
 
         # Verifica se uma pasta foi selecionada
-        if not self.pasta_raiz_selecionada:
+        if not self.raizes:
             self.atualizar_status("⚠️ Nenhuma pasta selecionada. Clique no botão azul acima.")
             self.label_pasta_mestre.config(text="❌ Nenhuma pasta selecionada")
             return
 
-        pasta_roteiros = self.pasta_raiz_selecionada
-
-        if os.path.exists(pasta_roteiros):
-            self.pasta_roteiros = pasta_roteiros
-            self.label_pasta_mestre.config(text=f"📂 Pasta: {pasta_roteiros}")
+        for raiz in raizes:
+            varredura = self.varreduras.pop(raiz, None)
+            if varredura:
+                varredura.cancelar()
+            if not manter_lista:
+                # Revalidação pedida pelo observador: ele continua, e um evento
+                # durante a busca a reinicia (nada criado no meio dela se perde)
+                self.parar_observador(raiz)
+
+            if not os.path.exists(raiz):
+                self.roteiros_por_raiz.pop(raiz, None)
+                self.atualizar_status(f"❌ Pasta não encontrada: {raiz}")
+                continue
 
+            marcadores = carregar_marcadores(raiz)
+            self.marcadores_raiz[raiz] = marcadores
             try:
-                roteiros_com_status = []
-
-                # PRIMEIRO: Verifica se há arquivos .txt DIRETAMENTE na pasta raiz
-                arquivos_txt_raiz = [f for f in self.listar_arquivos_incluindo_ocultos(pasta_roteiros)
-                                     if f.endswith(('.txt', '.srt')) and os.path.isfile(os.path.join(pasta_roteiros, f))]
-
-                if arquivos_txt_raiz:
-                    # Se há arquivos diretos, cria um "roteiro virtual" para esta pasta
-                    nome_pasta = os.path.basename(pasta_roteiros)
-                    nome_roteiro = f"📁 {nome_pasta} ({len(arquivos_txt_raiz)} arquivos)"
-                    roteiros_com_status.append(nome_roteiro)
-                    # Guarda a própria pasta como "roteiro"
-                    self.roteiros_disponiveis[nome_roteiro] = pasta_roteiros
-
-                # SEGUNDO: Procura por SUBPASTAS com arquivos .txt
-                for item in self.listar_arquivos_incluindo_ocultos(pasta_roteiros):
-                    caminho_item = os.path.join(pasta_roteiros, item)
-                    if os.path.isdir(caminho_item):
-                        # Procura por arquivos .txt ou .srt na subpasta
-                        arquivo_texto = None
-                        # Tenta formato novo primeiro (02_Texto_Narrado.txt)
-                        arquivo_novo = os.path.join(caminho_item, "02_Texto_Narrado.txt")
-                        if os.path.exists(arquivo_novo):
-                            arquivo_texto = arquivo_novo
-                        else:
-                            # Tenta formato antigo (03_Texto_Narrado.txt)
-                            arquivo_antigo = os.path.join(caminho_item, "03_Texto_Narrado.txt")
-                            if os.path.exists(arquivo_antigo):
-                                arquivo_texto = arquivo_antigo
-                            else:
-                                # Se não encontrou nenhum dos dois, procura qualquer .txt ou .srt
-                                arquivos_txt = [f for f in self.listar_arquivos_incluindo_ocultos(caminho_item)
-                                              if f.endswith(('.txt', '.srt'))]
-                                if arquivos_txt:
-                                    arquivo_texto = os.path.join(caminho_item, arquivos_txt[0])
-
-                        if arquivo_texto:
-                            # Formata o nome do roteiro
-                            nome_roteiro = item.replace("_", " ").title()
-
-                            # Verifica o status do vídeo
-                            arquivo_status = os.path.join(caminho_item, "video_status.json")
-                            indicador = "⚪ "  # Padrão: novo/pendente
-
-                            if os.path.exists(arquivo_status):
-                                try:
-                                    with open(arquivo_status, 'r', encoding='utf-8') as f:
-                                        status = json.load(f)
-                                        video_postado = status.get("video_postado", False)
-
-                                        if video_postado:
-                                            indicador = "✅ "  # Postado
-                                except:
-                                    pass  # Mantém indicador padrão em caso de erro
-
-                            nome_com_status = f"{indicador}{nome_roteiro}"
-                            roteiros_com_status.append(nome_com_status)
-                            self.roteiros_disponiveis[nome_roteiro] = arquivo_texto
-
-                if roteiros_com_status:
-                    # Atualiza o combobox mestre
-                    nomes_ordenados = sorted(roteiros_com_status)
-                    self.combo_roteiro_mestre['values'] = nomes_ordenados
-
-                    self.atualizar_status(f"✅ {len(nomes_ordenados)} roteiro(s) encontrado(s)")
-                else:
-                    self.atualizar_status("⚠️ Nenhum arquivo .txt ou .srt encontrado")
-                    self.label_pasta_mestre.config(text=f"⚠️ Pasta sem arquivos: {pasta_roteiros}")
-
+                # Subpastas com arquivos .txt, pelo índice da biblioteca da raiz
+                # (só as pastas alteradas desde a última varredura são examinadas)
+                varredura = VarreduraBiblioteca(
+                    self.obter_biblioteca(raiz), raiz, self.pastas, marcadores.roteiro, marcadores.versao, completo,
+                    self.profundidade_maxima
+                )
+                varredura.iniciar()
             except Exception as e:
                 self.atualizar_status(f"❌ Erro ao listar roteiros: {str(e)}")
-        else:
-            self.pasta_roteiros = ""
-            self.label_pasta_mestre.config(text="❌ Pasta não encontrada!")
-            self.atualizar_status("❌ Pasta não encontrada")
-
+                continue
+            self.varreduras[raiz] = varredura
+            if not manter_lista or raiz not in self.roteiros_por_raiz:
+                self.roteiros_por_raiz[raiz] = varredura.encontrados
+
+        # Roteiro aberto numa das raízes buscadas: marcadores.json pode ter mudado
+        if self.pasta_raiz_selecionada and normalizar_raiz(self.pasta_raiz_selecionada) in raizes:
+            self.carregar_marcadores_pasta()
+
+        self.montar_lista_roteiros()
+        if self.varreduras:
+            self.btn_cancelar_busca.config(state=tk.NORMAL)
+            self.atualizar_status("🔍 Buscando roteiros...")
+            if not self.varredura_after:
+                self.varredura_after = self.root.after(50, self.receber_busca_roteiros)
+
+    def receber_busca_roteiros(self):
+        """Acrescenta ao combobox os roteiros que as buscas já encontraram"""
+        self.varredura_after = None
+
+        novos, concluidas = False, []
+        for raiz, varredura in list(self.varreduras.items()):
+            while True:
+                try:
+                    tipo, dados = varredura.eventos.get_nowait()
+                except queue.Empty:
+                    break
+                if tipo == 'lote':
+                    varredura.encontrados.extend(dados)
+                    novos = True
+                else:
+                    del self.varreduras[raiz]
+                    concluidas.append((raiz, tipo, dados))
+                    break
 
-    def carregar_arquivo(self, caminho):
-        """Carrega e processa o arquivo selecionado"""
         try:
-            with open(caminho, 'r', encoding='utf-8') as file:
-                self.texto_completo = file.read()
+            erros = []
+            for raiz, tipo, dados in concluidas:
+                if tipo == 'erro':
+                    erros.append(f"{raiz}: {dados}")
+                else:
+                    if tipo == 'fim' and dados is not None:  # None: só pastas alteradas
+                        self.percursos_raiz[raiz] = dados
+                        log.debug("Busca em %s: %d pasta(s) visitada(s), %d ignorada(s), %d no limite de profundidade",
+                                  raiz, dados.visitadas, dados.ignoradas, dados.no_limite)
+                    # Lista final pelo índice (sem as pastas que foram removidas)
+                    self.roteiros_por_raiz[raiz] = self.obter_biblioteca(raiz).roteiros(raiz)
+                    self.iniciar_observador(raiz)
+
+            total = self.montar_lista_roteiros() if novos or concluidas else len(self.indice_roteiros)
+
+            if self.varreduras:
+                self.atualizar_status(f"🔍 Buscando roteiros... {total} encontrado(s)")
+                self.varredura_after = self.root.after(50, self.receber_busca_roteiros)
+                return
 
-            self.arquivo_atual = caminho
+            self.btn_cancelar_busca.config(state=tk.DISABLED)
+            if erros:
+                self.atualizar_status(f"❌ Erro ao listar roteiros: {erros[-1]}")
+            elif total:
+                self.atualizar_status(f"✅ {total} roteiro(s) encontrado(s){self.resumo_percurso()}")
+            elif concluidas:
+                self.atualizar_status("⚠️ Nenhum arquivo .txt ou .srt encontrado")
+                self.label_pasta_mestre.config(text="⚠️ Pastas sem arquivos")
+        except Exception as e:
+            self.atualizar_status(f"❌ Erro ao listar roteiros: {str(e)}")
+
+    def resumo_percurso(self):
+        """Pastas visitadas/ignoradas nas últimas buscas, para a barra de status"""
+        percursos = [self.percursos_raiz[raiz] for raiz in self.raizes if raiz in self.percursos_raiz]
+        if not percursos:
+            return ""
+        resumo = (f" | {sum(p.visitadas for p in percursos)} pasta(s) visitada(s), "
+                  f"{sum(p.ignoradas for p in percursos)} ignorada(s)")
+        no_limite = sum(p.no_limite for p in percursos)
+        if no_limite:
+            resumo += f", {no_limite} além da profundidade máxima"
+        return resumo
+
+    def cancelar_busca_roteiros(self, silencioso=False):
+        """Interrompe as buscas de roteiros em andamento (mantém o que já foi listado)"""
+        if self.varredura_after:
+            self.root.after_cancel(self.varredura_after)
+            self.varredura_after = None
+        if not self.varreduras:
+            return
 
-            # Processa o texto e identifica seções
-            self.identificar_secoes()
+        for varredura in self.varreduras.values():
+            varredura.cancelar()
+        self.varreduras = {}
+        self.btn_cancelar_busca.config(state=tk.DISABLED)
+        if not silencioso:
+            self.atualizar_status(f"⏹️ Busca cancelada: {len(self.indice_roteiros)} roteiro(s) listado(s)")
+
+    def montar_lista_roteiros(self):
+        """Preenche o combobox mestre com os roteiros das raízes do filtro de canal
+
+        Junta os Roteiros de cada raiz (índice único, sem repetir pastas)
+        e os arquivos soltos de cada raiz. Não mexe no roteiro
+        selecionado. Retorna o número de roteiros.
+        """
+        raizes = [self.canal_filtro] if self.canal_filtro else self.raizes
+        self.indice_roteiros = IndiceRoteiros(
+            (roteiro for raiz in raizes for roteiro in self.roteiros_por_raiz.get(raiz, ())), raizes
+        )
 
-            # Carrega o histórico ANTES de criar os botões
-            self.carregar_historico()
+        # Arquivos .txt DIRETAMENTE na pasta raiz viram um "roteiro virtual"
+        # (a própria pasta; seções e palavras não são contadas)
+        for raiz in raizes:
+            if raiz not in self.roteiros_por_raiz:
+                continue
+            try:
+                arquivos_txt_raiz = self.pastas.arquivos(raiz, ('.txt', '.srt'))
+            except OSError:
+                continue
+            if arquivos_txt_raiz:
+                nome_roteiro = f"📁 {nome_canal(raiz, self.raizes)} ({len(arquivos_txt_raiz)} arquivos)"
+                entradas_texto = [self.pastas.entrada(raiz, nome) for nome in NOMES_TEXTO_NARRADO]
+                arquivo_texto = next((entrada.path for entrada in entradas_texto if entrada), "")
+                self.indice_roteiros.adicionar(
+                    nome_roteiro, Roteiro(raiz, nome_roteiro, arquivo_texto, False, None, None), raiz
+                )
 
-            # Cria botões para cada seção (agora com histórico carregado)
-            self.criar_botoes_secoes()
+        self.combo_roteiro_mestre['values'] = self.indice_roteiros.rotulos()
 
-            # Limpa a área de texto
-            self.text_area.config(state=tk.NORMAL)
-            self.text_area.delete(1.0, tk.END)
-            self.text_area.insert(1.0, "👈 Selecione uma seção ao lado para visualizar")
-            self.text_area.config(state=tk.DISABLED)
+        # O indicador do roteiro selecionado pode ter mudado (ex.: marcado como postado)
+        if self.pasta_roteiro_atual and self.combo_roteiro_mestre.get():
+            rotulo = self.indice_roteiros.rotulo_da_pasta(self.pasta_roteiro_atual)
+            if rotulo:
+                self.combo_roteiro_mestre.set(rotulo)
 
-            self.atualizar_status(f"✅ Roteiro carregado: {len(self.secoes)} seção(ões) identificada(s)")
+        return len(self.indice_roteiros)
+
+    def iniciar_observador(self, raiz):
+        """Passa a observar uma pasta raiz (subpastas novas/removidas, arquivos salvos)"""
+        if raiz in self.observadores:
+            return
+
+        try:
+            observador = criar_observador(raiz, profundidade_maxima=self.profundidade_maxima)
+            observador.iniciar()
+        except Exception as e:
+            log.warning("Observador da pasta %s indisponível: %s", raiz, e)
+            return
+        self.observadores[raiz] = observador
+        self.vigiar_arquivo_atual()
+        if not self.observador_after:
+            self.observador_after = self.root.after(300, self.processar_eventos_pasta)
+
+    def parar_observador(self, raiz=None):
+        """Para o observador de uma raiz (ou de todas)"""
+        raizes = list(self.observadores) if raiz is None else [raiz]
+        for raiz in raizes:
+            observador = self.observadores.pop(raiz, None)
+            if observador:
+                observador.parar()
+        if not self.observadores and self.observador_after:
+            self.root.after_cancel(self.observador_after)
+            self.observador_after = None
+
+    def vigiar_arquivo_atual(self):
+        """Só o observador da raiz do roteiro aberto vigia o texto narrado"""
+        raiz_atual = normalizar_raiz(self.pasta_raiz_selecionada) if self.pasta_raiz_selecionada else ""
+        for raiz, observador in self.observadores.items():
+            observador.vigiar_arquivo(self.arquivo_atual if raiz == raiz_atual else None)
+
+    def processar_eventos_pasta(self):
+        """Consome os eventos dos observadores (agrupados a cada 300 ms)"""
+        self.observador_after = None
+        if not self.observadores:
+            return
+
+        mudou = arquivo_salvo = False
+        for raiz, observador in list(self.observadores.items()):
+            alteradas, removidas = set(), set()
+            raiz_modificada = False
+            while True:
+                try:
+                    tipo, caminho = observador.eventos.get_nowait()
+                except queue.Empty:
+                    break
+                if tipo == 'arquivo_modificado':
+                    arquivo_salvo = caminho == os.path.normpath(self.arquivo_atual) or arquivo_salvo
+                    alteradas.add(os.path.dirname(caminho))
+                elif tipo == 'raiz_modificada':
+                    raiz_modificada = True
+                elif tipo == 'pasta_removida':
+                    removidas.add(caminho)
+                    alteradas.discard(caminho)
+                else:
+                    alteradas.add(caminho)
+                    removidas.discard(caminho)
 
+            if alteradas or removidas or raiz_modificada:
+                try:
+                    self.aplicar_eventos_pasta(raiz, alteradas, removidas, raiz_modificada)
+                    mudou = True
+                except Exception as e:
+                    log.exception("Erro ao atualizar a lista de roteiros de %s", raiz)
+
+        if mudou:
+            self.montar_lista_roteiros()
+
+        # Texto narrado aberto salvo por um editor: recarrega só as seções alteradas
+        if arquivo_salvo and self.analise_roteiro:
+            self.recarregar_secoes_roteiro()
+
+        self.observador_after = self.root.after(300, self.processar_eventos_pasta)
+
+    def aplicar_eventos_pasta(self, raiz, alteradas, removidas, raiz_modificada):
+        """Atualiza o índice da raiz só nas pastas afetadas, sem varrer tudo de novo
+
+        Pastas de roteiro já listadas são examinadas (ou removidas) uma a
+        uma, numa thread (VarreduraBiblioteca com alvos). Pasta nova, pasta intermediária (ex.: ano/mês) ou arquivos
+        soltos na raiz mudam a árvore: a raiz é revalidada pelo mtime de
+        cada pasta numa busca em segundo plano (a raiz pode ser grande ou
+        estar na rede; a lista atual fica no combobox até a busca acabar).
+        Com uma busca da raiz ainda em andamento ela é reiniciada, para não
+        examinar pastas nas duas threads ao mesmo tempo.
+        """
+        self.pastas.invalidar(raiz)
+        for caminho in alteradas | removidas:
+            self.pastas.invalidar(caminho)
+            self.pastas.invalidar(os.path.dirname(caminho))
+
+        conhecidas = {os.path.normcase(os.path.normpath(roteiro.pasta))
+                      for roteiro in self.roteiros_por_raiz.get(raiz, ())}
+        desconhecidas = any(os.path.normcase(caminho) not in conhecidas for caminho in alteradas | removidas)
+        if raiz in self.varreduras or raiz_modificada or desconhecidas:
+            # Arquivos soltos, estrutura nova ou eventos perdidos: revalida a raiz numa thread
+            self.buscar_pasta_roteiros(raizes=[raiz], manter_lista=True)
+        else:
+            # Só pastas de roteiro já listadas: examinadas numa thread (o texto narrado
+            # pode ser grande), sem percorrer a raiz
+            marcadores = self.marcadores_raiz.get(raiz) or carregar_marcadores(raiz)
+            alvos = tuple(
+                [relativo for relativo in (caminho_relativo(raiz, caminho) for caminho in caminhos) if relativo]
+                for caminhos in (alteradas, removidas)
+            )
+            varredura = VarreduraBiblioteca(
+                self.obter_biblioteca(raiz), raiz, self.pastas, marcadores.roteiro, marcadores.versao, alvos=alvos
+            )
+            varredura.iniciar()
+            self.varreduras[raiz] = varredura
+            if not self.varredura_after:
+                self.varredura_after = self.root.after(50, self.receber_busca_roteiros)
+
+        # Arquivos da pasta aberta mudaram: atualiza a árvore da aba Visualizar
+        pasta_atual = os.path.normpath(self.pasta_roteiro_atual) if self.pasta_roteiro_atual else ""
+        if pasta_atual and pasta_atual in alteradas and hasattr(self, 'mapa_arquivos'):
+            listados = {info['nome'] for info in self.mapa_arquivos.values() if info['tipo'] == 'arquivo'}
+            try:
+                atuais = {entrada.name for entrada in self.pastas.arquivos(pasta_atual, ('.txt', '.srt'))}
+            except OSError:
+                atuais = set()
+            if atuais != listados:
+                self.carregar_arquivos_roteiro()
+
+    def carregar_arquivo(self, caminho):
+        """Carrega e processa o arquivo selecionado
+
+        As seções são lidas em fluxo: os primeiros botões aparecem antes
+        do arquivo terminar de ser lido.
+        """
+        # Interrompe a leitura de um roteiro anterior ainda em andamento
+        self.cancelar_carga_secoes()
+
+        try:
+            documento = self.documentos.abrir(caminho)
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar arquivo:\n{str(e)}")
             self.atualizar_status(f"❌ Erro: {str(e)}")
+            return
 
-    def identificar_secoes(self):
-        """Identifica as seções no texto usando marcadores padrão"""
+        self.arquivo_atual = caminho
+        self.vigiar_arquivo_atual()
         self.secoes = {}
 
-        # Padrões para identificar seções
-        padroes = [
-            r'^OPENING\s*[-–—]\s*(.+)$',
-            r'^CHAPTER\s+(\w+)\s*[-–—]\s*(.+)$',
-            r'^ACT\s+(\w+)\s*[-–—]\s*(.+)$',
-            r'^ATO\s+(\w+)\s*[-–—]\s*(.+)$',
-            r'^CLOSING\s*[-–—]\s*(.+)$',
-            r'^EPILOGUE\s*[-–—]\s*(.+)$',
-            r'^CONCLUSION\s*[-–—]\s*(.+)$'
-        ]
-
-        linhas = self.texto_completo.split('\n')
-        secao_atual = None
-        texto_secao = []
-        indice_secao = 0
-        inicio_atual = 0
-
-        # Primeira passada - identificar títulos de seções
-        for i, linha in enumerate(linhas):
-            linha_limpa = linha.strip()
-
-            # Verifica se é um título de seção
-            secao_encontrada = False
-            for padrao in padroes:
-                match = re.match(padrao, linha_limpa, re.IGNORECASE)
-                if match:
-                    # Se já havia uma seção sendo processada, salva ela
-                    if secao_atual and texto_secao:
-                        self.secoes[indice_secao] = {
-                            'titulo': secao_atual,
-                            'texto': '\n'.join(texto_secao).strip(),
-                            'linha_inicio': inicio_atual
-                        }
-                        indice_secao += 1
-
-                    # Inicia nova seção
-                    secao_atual = linha_limpa
-                    texto_secao = [linha]
-                    inicio_atual = i
-                    secao_encontrada = True
-                    break
+        # Carrega o histórico ANTES de criar os botões
+        self.carregar_historico()
+        self.adotar_historico_legado()
+
+        # Limpa botões anteriores
+        for widget in self.frame_botoes.winfo_children():
+            widget.destroy()
+        self.botoes_secoes = {}
 
-            # Se não é um título de seção, adiciona ao texto da seção atual
-            if not secao_encontrada and secao_atual:
-                texto_secao.append(linha)
+        # Limpa a área de texto
+        self.text_area.config(state=tk.NORMAL)
+        self.text_area.delete(1.0, tk.END)
+        self.text_area.insert(1.0, "👈 Selecione uma seção ao lado para visualizar")
+        self.text_area.config(state=tk.DISABLED)
 
-        # Salva a última seção
-        if secao_atual and texto_secao:
-            self.secoes[indice_secao] = {
-                'titulo': secao_atual,
-                'texto': '\n'.join(texto_secao).strip(),
-                'linha_inicio': inicio_atual
-            }
+        # Arquivo já lido e sem mudanças: reaproveita as seções detectadas
+        if 'analise_roteiro' in documento.cache:
+            self.analise_roteiro = documento.cache['analise_roteiro']
+            self.secoes = dict(enumerate(self.analise_roteiro.secoes))
+            if not self.secoes:
+                self.dividir_por_blocos(documento.linhas())
+            self.associar_historico()
+            self.criar_botoes_secoes()
+            self.atualizar_status(f"✅ Roteiro carregado: {len(self.secoes)} seção(ões) identificada(s)")
+            return
 
-        # Se não encontrou seções com os padrões, divide por blocos vazios
-        if not self.secoes:
-            self.dividir_por_blocos()
+        self.carga_secoes = (documento, secoes_em_fluxo(documento.linhas(), self.marcadores.roteiro))
+        self.atualizar_status("🔍 Lendo roteiro...")
+        self.carregar_proximas_secoes()
 
-    def dividir_por_blocos(self):
-        """Divide o texto em blocos quando não há marcadores claros"""
-        blocos = self.texto_completo.split('\n\n\n')
+    def carregar_proximas_secoes(self):
+        """Cria os botões das seções já lidas e agenda a leitura do restante"""
+        self.carga_secoes_after = None
+        documento, gerador = self.carga_secoes
+        limite = time.perf_counter() + 0.05  # Devolve o controle ao Tk a cada 50ms
 
-        for i, bloco in enumerate(blocos):
-            if bloco.strip():
-                # Pega as primeiras palavras como título
-                primeiras_palavras = ' '.join(bloco.strip().split()[:5])
-                if len(primeiras_palavras) > 50:
-                    primeiras_palavras = primeiras_palavras[:50] + "..."
+        try:
+            for secao in gerador:
+                indice = len(self.secoes)
+                self.secoes[indice] = secao
+                self.criar_botao_secao(indice)
+
+                if time.perf_counter() > limite:
+                    self.atualizar_status(f"🔍 Lendo roteiro... {len(self.secoes)} seção(ões)")
+                    self.carga_secoes_after = self.root.after(1, self.carregar_proximas_secoes)
+                    return
+
+            # Guarda o estado para o recarregamento incremental
+            self.analise_roteiro = AnaliseIncremental(self.marcadores.roteiro)
+            self.analise_roteiro.registrar(documento, self.secoes.values())
+            documento.cache['analise_roteiro'] = self.analise_roteiro
+
+            # Se não encontrou seções com os padrões, divide por blocos vazios
+            if not self.secoes:
+                self.dividir_por_blocos(documento.linhas())
+                self.associar_historico()
+                self.criar_botoes_secoes()
+            elif self.associar_historico():
+                self.criar_botoes_secoes()
 
-                self.secoes[i] = {
-                    'titulo': f"Bloco {i+1}: {primeiras_palavras}",
-                    'texto': bloco.strip(),
-                    'linha_inicio': 0
-                }
+            self.atualizar_status(f"✅ Roteiro carregado: {len(self.secoes)} seção(ões) identificada(s)")
+
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao carregar arquivo:\n{str(e)}")
+            self.atualizar_status(f"❌ Erro: {str(e)}")
+
+        self.cancelar_carga_secoes()
+
+    def cancelar_carga_secoes(self):
+        """Interrompe a leitura em fluxo do roteiro (se houver)"""
+        if getattr(self, 'carga_secoes_after', None):
+            self.root.after_cancel(self.carga_secoes_after)
+            self.carga_secoes_after = None
+
+        if getattr(self, 'carga_secoes', None):
+            documento, gerador = self.carga_secoes
+            gerador.close()
+            self.carga_secoes = None
+
+    def dividir_por_blocos(self, linhas):
+        """Divide o texto (linhas do documento) em blocos quando não há marcadores claros"""
+        # Um passe pelas linhas; gap e tamanho máximo vêm do marcadores.json
+        self.secoes = dict(enumerate(blocos_em_fluxo(linhas, **self.marcadores.blocos)))
 
     def criar_botoes_secoes(self):
         """Cria botões para cada seção identificada"""
         # Limpa botões anteriores
         for widget in self.frame_botoes.winfo_children():
             widget.destroy()
+        self.botoes_secoes = {}
 
         if not self.secoes:
             # Mostra mensagem se não há seções
@@ -1811,81 +2608,91 @@ Obrigado por usar o Script Copier Universal! 🚀
 
         # Cria novo botão para cada seção
         for indice in sorted(self.secoes.keys()):
-            secao = self.secoes[indice]
+            self.criar_botao_secao(indice)
+
+    def criar_botao_secao(self, indice, antes=None):
+        """Cria o botão de uma seção no painel da esquerda (antes do frame indicado, se houver)"""
+        secao = self.secoes[indice]
 
-            # Conta palavras
-            num_palavras = len(secao['texto'].split())
+        # Conta palavras
+        num_palavras = secao.palavras
 
-            # Cria frame para o botão
-            frame_btn = tk.Frame(self.frame_botoes, bg=self.bg_color)
+        # Cria frame para o botão
+        frame_btn = tk.Frame(self.frame_botoes, bg=self.bg_color)
+        if antes is not None:
+            frame_btn.pack(fill=tk.X, pady=3, padx=5, before=antes)
+        else:
             frame_btn.pack(fill=tk.X, pady=3, padx=5)
 
-            # Prepara o título do botão - agora sem cortar
-            titulo_btn = secao['titulo'][:60]
-            if len(secao['titulo']) > 60:
-                titulo_btn += "..."
-
-            # Verifica se foi copiado
-            roteiro_nome = self.roteiro_atual if self.roteiro_atual else ""
-            foi_copiado = self.secao_foi_copiada(roteiro_nome, secao['titulo'])
-            info_copia = self.get_info_copia(roteiro_nome, secao['titulo'])
-
-            # Define ícone e cor baseado no status
-            if foi_copiado:
-                icone = "✓"
-                cor_btn = self.green_copied  # Verde bem clarinho para copiado
-                cor_fg = self.fg_color  # Texto preto
-            else:
-                icone = "📄"
-                cor_btn = self.button_bg
-                cor_fg = self.fg_color
-
-            # Botão principal compacto
-            btn = tk.Button(
-                frame_btn,
-                text=f"{icone} {titulo_btn}",
-                command=lambda idx=indice: self.exibir_secao(idx),
-                bg=cor_btn,
-                fg=cor_fg,
-                font=(self.font_family, 9, "bold" if foi_copiado else "normal"),
-                relief=tk.FLAT,
-                anchor="w",
-                padx=10,
-                pady=6,
-                cursor="hand2",
-                wraplength=340,  # Quebra texto em múltiplas linhas
-                justify=tk.LEFT,
-                borderwidth=0
-            )
-            btn.pack(fill=tk.X, side=tk.TOP)
+        # Prepara o título do botão - agora sem cortar
+        titulo_btn = secao.titulo[:60]
+        if len(secao.titulo) > 60:
+            titulo_btn += "..."
+
+        # Verifica se foi copiado
+        roteiro = self.roteiro_atual if self.roteiro_atual else ""
+        info_copia = self.get_info_copia(roteiro, secao.titulo)
+        foi_copiado = info_copia is not None
+
+        # Define ícone e cor baseado no status
+        if foi_copiado:
+            icone = "✓"
+            cor_btn = self.green_copied  # Verde bem clarinho para copiado
+            cor_fg = self.fg_color  # Texto preto
+        else:
+            icone = "📄"
+            cor_btn = self.button_bg
+            cor_fg = self.fg_color
+
+        # Botão principal compacto
+        btn = tk.Button(
+            frame_btn,
+            text=f"{icone} {titulo_btn}",
+            command=lambda idx=indice: self.exibir_secao(idx),
+            bg=cor_btn,
+            fg=cor_fg,
+            font=(self.font_family, 9, "bold" if foi_copiado else "normal"),
+            relief=tk.FLAT,
+            anchor="w",
+            padx=10,
+            pady=6,
+            cursor="hand2",
+            wraplength=340,  # Quebra texto em múltiplas linhas
+            justify=tk.LEFT,
+            borderwidth=0
+        )
+        btn.pack(fill=tk.X, side=tk.TOP)
 
-            # Tooltip com título completo e informações de cópia
-            tooltip_text = secao['titulo']
-            if info_copia:
-                tooltip_text += f"\n\n✓ Copiado {info_copia['contador']}x"
-                tooltip_text += f"\nÚltima cópia: {info_copia['ultima_copia']}"
+        # Tooltip com título completo e informações de cópia
+        tooltip_text = secao.titulo
+        if info_copia:
+            tooltip_text += f"\n\n✓ Copiado {info_copia['contador']}x"
+            tooltip_text += f"\nÚltima cópia: {info_copia['ultima_copia']}"
 
-            self.criar_tooltip(btn, tooltip_text)
+        self.criar_tooltip(btn, tooltip_text)
 
-            # Label com contagem de palavras e status
-            status_text = f"   {num_palavras} palavras"
-            if info_copia:
-                status_text += f" • Copiado {info_copia['contador']}x"
+        # Label com contagem de palavras e status
+        status_text = f"   {num_palavras} palavras"
+        if info_copia:
+            status_text += f" • Copiado {info_copia['contador']}x"
 
-            tk.Label(
-                frame_btn,
-                text=status_text,
-                bg=self.bg_color,
-                fg="#4CAF50" if foi_copiado else "#888888",
-                font=("Arial", 8, "bold" if foi_copiado else "normal")
-            ).pack(anchor="w", padx=5)
+        tk.Label(
+            frame_btn,
+            text=status_text,
+            bg=self.bg_color,
+            fg="#4CAF50" if foi_copiado else "#888888",
+            font=("Arial", 8, "bold" if foi_copiado else "normal")
+        ).pack(anchor="w", padx=5)
+
+        # Efeitos hover (mantém cor original se copiado)
+        hover_color = self.green_hover if foi_copiado else self.button_hover
+        normal_color = cor_btn
 
-            # Efeitos hover (mantém cor original se copiado)
-            hover_color = self.green_hover if foi_copiado else self.button_hover
-            normal_color = cor_btn
+        btn.bind("<Enter>", lambda e, b=btn, hc=hover_color: b.config(bg=hc))
+        btn.bind("<Leave>", lambda e, b=btn, nc=normal_color: b.config(bg=nc))
 
-            btn.bind("<Enter>", lambda e, b=btn, hc=hover_color: b.config(bg=hc))
-            btn.bind("<Leave>", lambda e, b=btn, nc=normal_color: b.config(bg=nc))
+        self.botoes_secoes[secao] = (frame_btn, btn)
+        return frame_btn
 
     def criar_tooltip(self, widget, text):
         """Cria tooltip ao passar o mouse"""
@@ -1926,16 +2733,16 @@ Obrigado por usar o Script Copier Universal! 🚀
         # Atualiza área de texto
         self.text_area.config(state=tk.NORMAL)
         self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(1.0, secao['texto'])
+        self.text_area.insert(1.0, secao.texto)
 
         # Atualiza labels
-        titulo_display = secao['titulo'][:60]
-        if len(secao['titulo']) > 60:
+        titulo_display = secao.titulo[:60]
+        if len(secao.titulo) > 60:
             titulo_display += "..."
         self.label_secao_atual.config(text=f"📝 {titulo_display}")
 
-        num_palavras = len(secao['texto'].split())
-        num_caracteres = len(secao['texto'])
+        num_palavras = secao.palavras
+        num_caracteres = secao.caracteres
         self.label_palavras.config(text=f"({num_palavras} palavras | {num_caracteres} caracteres)")
 
         # Habilita botão de copiar
@@ -1944,7 +2751,7 @@ Obrigado por usar o Script Copier Universal! 🚀
         # Guarda índice da seção atual
         self.secao_atual_indice = indice
 
-        self.atualizar_status(f"✅ Seção carregada: {secao['titulo'][:40]}...")
+        self.atualizar_status(f"✅ Seção carregada: {secao.titulo[:40]}...")
 
     def copiar_texto_atual(self):
         """Copia o texto exibido para a área de transferência"""
@@ -1957,15 +2764,15 @@ Obrigado por usar o Script Copier Universal! 🚀
                 self.root.update()
 
                 # Registra no histórico
-                roteiro_nome = self.roteiro_atual if self.roteiro_atual else ""
+                roteiro = self.roteiro_atual if self.roteiro_atual else ""
                 secao = self.secoes[self.secao_atual_indice]
-                self.registrar_copia(roteiro_nome, secao['titulo'])
+                self.registrar_copia(roteiro, secao.titulo, secao.impressao)
 
                 # Atualiza os botões para mostrar o indicador
                 self.criar_botoes_secoes()
 
                 # Mostra quantas vezes foi copiado
-                info = self.get_info_copia(roteiro_nome, secao['titulo'])
+                info = self.get_info_copia(roteiro, secao.titulo)
                 contador = info['contador'] if info else 1
 
                 self.atualizar_status(f"Texto copiado! (Copiado {contador}x)")
@@ -1988,13 +2795,14 @@ Obrigado por usar o Script Copier Universal! 🚀
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
             filetypes=[("Arquivo de Texto", "*.txt"), ("Todos os arquivos", "*.*")],
-            initialfile=f"{secao['titulo'][:30].replace(':', '').replace('/', '')}.txt"
+            initialfile=f"{secao.titulo[:30].replace(':', '').replace('/', '')}.txt"
         )
 
         if filename:
             try:
                 with open(filename, 'w', encoding='utf-8') as file:
-                    file.write(secao['texto'])
+                    file.write(secao.texto)
+                self.pastas.invalidar(os.path.dirname(filename))
                 self.atualizar_status(f"✅ Seção salva em: {os.path.basename(filename)}")
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao salvar:\n{str(e)}")
@@ -2006,137 +2814,136 @@ Obrigado por usar o Script Copier Universal! 🚀
         if self.pasta_raiz_selecionada and os.path.exists(self.pasta_raiz_selecionada):
             # IMPORTANTE: Normaliza o caminho para evitar barras mistas
             pasta_normalizada = os.path.normpath(self.pasta_raiz_selecionada)
-            arquivo = os.path.join(pasta_normalizada, "historico.json")
+            arquivo = os.path.join(pasta_normalizada, NOME_ARQUIVO_HISTORICO)
             return os.path.normpath(arquivo)  # Normaliza o caminho completo
         return None
 
     def carregar_historico(self):
-        """Carrega o histórico de cópias do arquivo JSON local"""
+        """Abre o histórico de cópias da pasta raiz (historico.db)"""
         arquivo = self.obter_arquivo_historico()
-        print(f"\n=== DEBUG CARREGAR ===")
-        print(f"Arquivo histórico: {arquivo}")
-        print(f"Pasta raiz: {self.pasta_raiz_selecionada}")
+        log.debug("Carregar histórico: %s (raiz %s)", arquivo, self.pasta_raiz_selecionada)
 
-        if not arquivo:
-            print("AVISO: Arquivo é None!")
-            self.historico_copias = {}
+        # Mesma raiz: o banco já está aberto; só relê as seções (cópias de outros apps)
+        if self.historico and arquivo and os.path.normcase(self.historico.caminho_db) == os.path.normcase(arquivo):
+            self.historico.recarregar()
             return
 
-        try:
-            if os.path.exists(arquivo):
-                print(f"Arquivo EXISTE! Carregando...")
-                with open(arquivo, 'r', encoding='utf-8') as f:
-                    self.historico_copias = json.load(f)
-                print(f"Histórico CARREGADO: {len(self.historico_copias)} roteiros")
-                print(f"Conteúdo: {self.historico_copias}")
-            else:
-                print(f"Arquivo NÃO EXISTE ainda")
-                self.historico_copias = {}
-        except Exception as e:
-            print(f"ERRO ao carregar histórico: {e}")
-            self.historico_copias = {}
-
-    def salvar_historico(self):
-        """Salva o histórico de cópias no arquivo JSON local"""
-        arquivo = self.obter_arquivo_historico()
-        print(f"\n=== DEBUG SALVAR ===")
-        print(f"Arquivo: {arquivo}")
-        print(f"Histórico tem {len(self.historico_copias)} roteiros")
+        if self.historico:
+            perdidas = self.historico.fechar()
+            if perdidas:
+                self.atualizar_status(f"⚠️ {perdidas} cópia(s) não gravada(s) no histórico anterior")
+            self.historico = None
 
         if not arquivo:
-            print("ERRO: Arquivo é None - não pode salvar!")
+            log.warning("Sem pasta raiz: histórico não carregado")
             return
 
-        try:
-            # Garante que o diretório existe
-            pasta_historico = os.path.dirname(arquivo)
-            print(f"Pasta destino: {pasta_historico}")
-
-            if not os.path.exists(pasta_historico):
-                print(f"Pasta não existe, criando...")
-                os.makedirs(pasta_historico, exist_ok=True)
+        # historico_copias.json das versões antigas (na pasta do app, com todas as raízes)
+        pasta_app = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(__file__))
 
-            # Salva o histórico
-            print(f"Salvando histórico com {len(self.historico_copias)} roteiros...")
-            print(f"Conteúdo a salvar: {self.historico_copias}")
+        try:
+            self.historico = HistoricoCopias(
+                arquivo,
+                legados=[os.path.join(pasta_app, NOME_ARQUIVO_HISTORICO_LEGADO)]
+            )
+            log.info("Histórico aberto: %s", arquivo)
+        except Exception:
+            log.exception("Erro ao abrir o histórico %s", arquivo)
+            self.historico = None
+
+    def adotar_historico_legado(self):
+        """Histórico gravado pelo nome do roteiro (versões anteriores) passa para a pasta dele"""
+        if not self.historico or not self.roteiro_atual or not self.nome_roteiro_atual:
+            return
+        try:
+            self.historico.adotar_legado(self.roteiro_atual, self.nome_roteiro_atual)
+        except Exception:
+            log.exception("Erro ao passar o histórico de %r para a pasta", self.nome_roteiro_atual)
 
-            with open(arquivo, 'w', encoding='utf-8') as f:
-                json.dump(self.historico_copias, f, indent=2, ensure_ascii=False)
+    def salvar_historico(self):
+        """Grava no historico.db as cópias ainda na fila; False (com aviso) se alguma não foi gravada"""
+        if not self.historico:
+            log.warning("Nenhum histórico aberto: nada a salvar")
+            return True
 
-            print(f"✅ Arquivo SALVO com sucesso!")
+        log.debug("Salvando histórico em %s", self.historico.caminho_db)
+        try:
+            if self.historico.salvar():
+                return True
+            erro = self.historico.erro or "banco ocupado"
+        except Exception as e:
+            log.exception("Erro ao salvar o histórico %s", self.historico.caminho_db)
+            erro = str(e)
+
+        pendentes = self.historico.nao_gravadas()
+        self.atualizar_status(f"⚠️ {pendentes} cópia(s) ainda não gravada(s) no histórico")
+        messagebox.showwarning(
+            "Histórico",
+            f"{pendentes} cópia(s) ainda não foram gravadas no histórico:\n{erro}\n\n"
+            "Elas continuam na fila e são gravadas assim que o banco responder."
+        )
+        return False
 
-            # Verifica se foi salvo mesmo
-            if os.path.exists(arquivo):
-                tamanho = os.path.getsize(arquivo)
-                print(f"✅ Arquivo confirmado: {tamanho} bytes")
-            else:
-                print(f"❌ ERRO: Arquivo não existe após salvar!")
+    def registrar_copia(self, roteiro, secao_titulo, impressao=None):
+        """Registra uma cópia no histórico (na memória; gravada em lote numa thread)
 
-        except PermissionError as e:
-            print(f"❌ ERRO DE PERMISSÃO: {e}")
-        except Exception as e:
-            print(f"❌ ERRO AO SALVAR: {e}")
-            import traceback
-            traceback.print_exc()
-
-    def registrar_copia(self, roteiro_nome, secao_titulo):
-        """Registra uma cópia no histórico"""
-        print(f"\n=== DEBUG REGISTRAR CÓPIA ===")
-        print(f"Roteiro: {roteiro_nome}")
-        print(f"Seção: {secao_titulo}")
-
-        if roteiro_nome not in self.historico_copias:
-            print(f"Primeira vez que copia deste roteiro")
-            self.historico_copias[roteiro_nome] = {}
-
-        agora = datetime.now()
-
-        if secao_titulo in self.historico_copias[roteiro_nome]:
-            # Incrementa contador
-            contador_anterior = self.historico_copias[roteiro_nome][secao_titulo]['contador']
-            self.historico_copias[roteiro_nome][secao_titulo]['contador'] += 1
-            self.historico_copias[roteiro_nome][secao_titulo]['ultima_copia'] = agora.strftime("%Y-%m-%d %H:%M:%S")
-            print(f"Incrementado de {contador_anterior} para {self.historico_copias[roteiro_nome][secao_titulo]['contador']}")
-        else:
-            # Primeira cópia
-            self.historico_copias[roteiro_nome][secao_titulo] = {
-                'primeira_copia': agora.strftime("%Y-%m-%d %H:%M:%S"),
-                'ultima_copia': agora.strftime("%Y-%m-%d %H:%M:%S"),
-                'contador': 1
-            }
-            print(f"Primeira cópia desta seção!")
+        roteiro é a pasta do roteiro relativa à raiz (self.roteiro_atual).
+        """
+        if not self.historico:
+            log.error("Nenhum histórico aberto: cópia de %r / %r não registrada", roteiro, secao_titulo)
+            return
 
-        print(f"Total de seções neste roteiro: {len(self.historico_copias[roteiro_nome])}")
+        try:
+            info = self.historico.registrar(roteiro, secao_titulo, impressao,
+                                            os.path.basename(self.arquivo_atual) or None)
+        except Exception:
+            log.exception("Erro ao registrar a cópia de %r / %r", roteiro, secao_titulo)
+            return
+        log.debug("Cópia registrada: %r / %r (contador %d)", roteiro, secao_titulo, info['contador'])
 
         # Marca que há mudanças não salvas
         self.historico_modificado = True
 
-        self.salvar_historico()
+    def associar_historico(self):
+        """Passa o histórico de seções com título ou texto alterado para os ids atuais
 
-    def secao_foi_copiada(self, roteiro_nome, secao_titulo):
-        """Verifica se uma seção já foi copiada"""
-        if roteiro_nome in self.historico_copias:
-            return secao_titulo in self.historico_copias[roteiro_nome]
-        return False
+        Retorna True se alguma seção mudou de id (botões a recriar).
+        """
+        if not self.historico or not self.secoes:
+            return False
+        try:
+            return self.historico.associar(self.roteiro_atual or "", os.path.basename(self.arquivo_atual),
+                                           self.secoes.values()) > 0
+        except Exception:
+            log.exception("Erro ao reassociar o histórico de %r", self.roteiro_atual)
+            return False
+
+    def secao_foi_copiada(self, roteiro, secao_titulo):
+        """Verifica se uma seção já foi copiada (roteiro: pasta relativa à raiz)"""
+        return self.get_info_copia(roteiro, secao_titulo) is not None
 
-    def get_info_copia(self, roteiro_nome, secao_titulo):
-        """Retorna informações sobre as cópias de uma seção"""
-        if self.secao_foi_copiada(roteiro_nome, secao_titulo):
-            return self.historico_copias[roteiro_nome][secao_titulo]
+    def get_info_copia(self, roteiro, secao_titulo):
+        """Retorna informações sobre as cópias de uma seção (roteiro: pasta relativa à raiz)"""
+        if self.historico:
+            return self.historico.info(roteiro, secao_titulo)
         return None
 
     def limpar_historico_roteiro_atual(self):
         """Limpa o histórico do roteiro atual"""
-        roteiro_nome = self.roteiro_atual
-        if roteiro_nome and roteiro_nome in self.historico_copias:
+        roteiro = self.roteiro_atual
+        if roteiro and self.historico and self.historico.tem_roteiro(roteiro):
             resultado = messagebox.askyesno(
                 "Limpar Memória",
-                f"Deseja limpar o histórico de cópias do roteiro '{roteiro_nome}'?\n\n"
+                f"Deseja limpar o histórico de cópias do roteiro '{self.nome_roteiro_atual or roteiro}'?\n\n"
                 f"Todas as marcações de seções copiadas serão removidas."
             )
             if resultado:
-                del self.historico_copias[roteiro_nome]
-                self.salvar_historico()
+                try:
+                    self.historico.limpar(roteiro)
+                except Exception as e:
+                    log.exception("Erro ao limpar o histórico de %r", roteiro)
+                    messagebox.showerror("Erro", f"Histórico não foi limpo:\n{e}")
+                    return
                 # Recarrega os botões para atualizar indicadores
                 self.criar_botoes_secoes()
                 self.atualizar_status("✅ Histórico limpo com sucesso!")
@@ -2149,8 +2956,13 @@ Obrigado por usar o Script Copier Universal! 🚀
             "Esta ação não pode ser desfeita!"
         )
         if resultado:
-            self.historico_copias = {}
-            self.salvar_historico()
+            if self.historico:
+                try:
+                    self.historico.limpar()
+                except Exception as e:
+                    log.exception("Erro ao limpar o histórico")
+                    messagebox.showerror("Erro", f"Histórico não foi limpo:\n{e}")
+                    return
             # Recarrega os botões para atualizar indicadores
             self.criar_botoes_secoes()
             self.atualizar_status("✅ Todo histórico foi limpo!")
@@ -2428,48 +3240,40 @@ Obrigado por usar o Script Copier Universal! 🚀
         if not roteiro_nome:
             return
 
-        # Remove indicadores de status do nome para comparação
-        roteiro_limpo = roteiro_nome.replace("⚪ ", "").replace("🎬 ", "").replace("✅ ", "")
-        self.roteiro_atual = roteiro_limpo
-
-        # Encontra a pasta do roteiro
-        if not self.pasta_roteiros:
+        # Rótulo → roteiro pelo índice montado na busca (sem consultar o disco)
+        roteiro = self.indice_roteiros.roteiro(roteiro_nome)
+        if roteiro is None:
             return
 
-        self.pasta_roteiro_atual = ""
-
-        # Verifica se é o "roteiro virtual" da própria pasta raiz (quando há arquivos diretos)
-        if roteiro_limpo in self.roteiros_disponiveis:
-            caminho_associado = self.roteiros_disponiveis[roteiro_limpo]
-            # Se o caminho é uma PASTA (não um arquivo específico)
-            if os.path.isdir(caminho_associado):
-                self.pasta_roteiro_atual = caminho_associado
-            else:
-                # É um arquivo específico, pega a pasta dele
-                self.pasta_roteiro_atual = os.path.dirname(caminho_associado)
+        # Histórico, cache de seções e marcadores passam a ser os da raiz do roteiro
+        raiz = self.indice_roteiros.raiz(roteiro_nome)
+        if self.pasta_roteiros != raiz:
+            self.pasta_raiz_selecionada = self.pasta_roteiros = raiz
+            self.carregar_marcadores_pasta()
+
+        # Chave do histórico: a pasta relativa à raiz (dois roteiros com o mesmo nome
+        # em pastas diferentes não se misturam); "." para os arquivos soltos na raiz
+        self.roteiro_atual = caminho_relativo(raiz, roteiro.pasta) or os.curdir
+        self.nome_roteiro_atual = roteiro.nome  # Nome sem indicador de status
+        self.pasta_roteiro_atual = roteiro.pasta
+
+        # Descarta os documentos de outros roteiros
+        self.cancelar_carga_secoes()
+        self.documentos.fechar_fora_de(self.pasta_roteiro_atual)
+
+        # Atualiza label de pasta (com os números do índice, se houver)
+        if roteiro.secoes is not None:
+            self.label_pasta_mestre.config(
+                text=f"📂 {self.pasta_roteiro_atual}  |  {roteiro.secoes} seção(ões) | {roteiro.palavras} palavras"
+            )
         else:
-            # Procura por subpasta com nome correspondente
-            for item in self.listar_arquivos_incluindo_ocultos(self.pasta_roteiros):
-                item_formatado = item.replace("_", " ").title()
-                if item_formatado == roteiro_limpo:
-                    self.pasta_roteiro_atual = os.path.join(self.pasta_roteiros, item)
-                    break
-
-        if not self.pasta_roteiro_atual or not os.path.exists(self.pasta_roteiro_atual):
-            return
-
-        # Atualiza label de pasta
-        self.label_pasta_mestre.config(text=f"📂 {self.pasta_roteiro_atual}")
+            self.label_pasta_mestre.config(text=f"📂 {self.pasta_roteiro_atual}")
 
         # Atualizar Aba 1: Copiar Seções (apenas se houver arquivo de texto narrado)
         arquivo_texto_narrado = None
-        arquivo_novo = os.path.join(self.pasta_roteiro_atual, "02_Texto_Narrado.txt")
-        if os.path.exists(arquivo_novo):
-            arquivo_texto_narrado = arquivo_novo
-        else:
-            arquivo_antigo = os.path.join(self.pasta_roteiro_atual, "03_Texto_Narrado.txt")
-            if os.path.exists(arquivo_antigo):
-                arquivo_texto_narrado = arquivo_antigo
+        nome_arquivo = os.path.normcase(os.path.basename(roteiro.arquivo_texto))
+        if any(nome_arquivo == os.path.normcase(nome) for nome in NOMES_TEXTO_NARRADO):
+            arquivo_texto_narrado = roteiro.arquivo_texto
 
         if arquivo_texto_narrado:
             self.carregar_arquivo(arquivo_texto_narrado)
@@ -2651,17 +3455,30 @@ Obrigado por usar o Script Copier Universal! 🚀
 
             with open(arquivo_status, 'w', encoding='utf-8') as f:
                 json.dump(status, f, indent=2, ensure_ascii=False)
+            self.pastas.invalidar(self.pasta_roteiro_atual)
 
             if mostrar_mensagem:
                 messagebox.showinfo("Sucesso", f"Informações salvas!\nData: {agora.strftime('%d/%m/%Y às %H:%M')}")
 
-            # Atualizar lista de roteiros para mostrar indicadores
-            self.buscar_pasta_roteiros()
+            # O status foi regravado no lugar (o mtime da pasta pode não mudar)
+            raiz = normalizar_raiz(self.pasta_roteiros)
+            biblioteca = self.obter_biblioteca(raiz)
+            relativo = caminho_relativo(raiz, self.pasta_roteiro_atual)
+            if relativo:
+                biblioteca.examinar(raiz, relativo, self.pastas, self.marcadores.roteiro, self.marcadores.versao)
+
+            # Atualiza os indicadores pelo índice, sem varrer a pasta raiz de novo
+            biblioteca.salvar()
+            if raiz in self.roteiros_por_raiz:
+                self.roteiros_por_raiz[raiz] = biblioteca.roteiros(raiz)
+            self.montar_lista_roteiros()
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao salvar: {str(e)}")
 
 def main():
+    # Necessário para o pool de processos no executável (PyInstaller)
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ScriptCopier(root)
     root.mainloop()
@@ -0,0 +1,107 @@
+"""
+Análise paralela dos arquivos de uma pasta de roteiro
+
+A detecção de seções de cada arquivo roda em um pool de processos (a
+regex não libera o GIL, então threads não ajudariam). Os resultados
+chegam por uma fila, que a interface consome aos poucos com root.after,
+sem travar a janela. Lotes pequenos são analisados direto, pois abrir
+o pool custaria mais do que economiza.
+"""
+
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+from documentos import Documento
+from secoes import carregar_marcadores, secoes_em_fluxo
+
+
+# Abaixo disso a análise é feita direto, sem o pool
+MINIMO_BYTES_PARALELO = 1024 * 1024
+
+
+def vale_paralelizar(tamanhos):
+    """True se os arquivos (tamanhos em bytes) justificam usar o pool
+
+    Conta só o volume: a pré-carga manda no máximo alguns arquivos, e um
+    único texto grande já travaria a janela se fosse analisado direto.
+    """
+    return sum(tamanhos) >= MINIMO_BYTES_PARALELO
+
+
+def analisar_estrutura(caminho, pasta_raiz):
+    """Seções de estrutura do arquivo como linhas [tipo, titulo, linha_inicio, linha_fim, palavras]
+
+    Roda no processo do pool: devolve só dados simples (o texto fica no
+    arquivo e só é lido quando a seção é exibida).
+    """
+    detector = carregar_marcadores(pasta_raiz).estrutura
+    documento = Documento(caminho)
+    try:
+        return [
+            [s.tipo, s.titulo, s.linha_inicio, s.linha_fim, s.palavras]
+            for s in secoes_em_fluxo(documento.linhas(), detector)
+        ]
+    finally:
+        documento.fechar()
+
+
+class AnaliseParalela:
+    """Pool de processos reaproveitado entre as cargas de pasta"""
+
+    def __init__(self, trabalhadores=None):
+        # Deixa um núcleo livre para a interface
+        self.trabalhadores = trabalhadores or max(1, (os.cpu_count() or 2) - 1)
+        self.resultados = queue.Queue()  # (geracao, caminho, secoes, erro)
+        self._pool = None
+        self._futuros = []
+        self._geracao = 0
+
+    def iniciar(self, caminhos, pasta_raiz):
+        """Envia os arquivos ao pool (cancela a análise anterior, se houver)"""
+        self.cancelar()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.trabalhadores)
+
+        geracao = self._geracao
+        for caminho in caminhos:
+            futuro = self._pool.submit(analisar_estrutura, caminho, pasta_raiz)
+            futuro.add_done_callback(
+                lambda f, caminho=caminho: self._concluido(geracao, caminho, f)
+            )
+            self._futuros.append(futuro)
+
+    def _concluido(self, geracao, caminho, futuro):
+        # Chamado na thread do pool: só enfileira
+        if futuro.cancelled():
+            return
+        erro = futuro.exception()
+        self.resultados.put((geracao, caminho, None if erro else futuro.result(), erro))
+
+    def prontos(self):
+        """Resultados já recebidos da análise atual: lista de (caminho, secoes, erro)"""
+        prontos = []
+        while True:
+            try:
+                geracao, caminho, secoes, erro = self.resultados.get_nowait()
+            except queue.Empty:
+                return prontos
+            if geracao == self._geracao:
+                prontos.append((caminho, secoes, erro))
+
+    @property
+    def pendentes(self):
+        return sum(1 for futuro in self._futuros if not futuro.done()) + self.resultados.qsize()
+
+    def cancelar(self):
+        """Descarta a análise atual (resultados que ainda chegarem são ignorados)"""
+        for futuro in self._futuros:
+            futuro.cancel()
+        self._futuros = []
+        self._geracao += 1
+
+    def fechar(self):
+        self.cancelar()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
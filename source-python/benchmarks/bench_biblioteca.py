@@ -0,0 +1,52 @@
+"""
+Benchmark do índice de roteiros (biblioteca.db)
+
+Mede a primeira varredura de uma raiz com 2.000 roteiros (examina todas
+as pastas) e as seguintes, que só conferem o mtime de cada pasta.
+
+Uso:
+    python benchmarks/bench_biblioteca.py [pastas]
+"""
+
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_listagem import criar_raiz
+from biblioteca import BibliotecaRoteiros, NOME_ARQUIVO_BIBLIOTECA
+from secoes import DETECTOR_ROTEIRO
+from sistema_arquivos import ListagemPastas
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    raiz = criar_raiz(total)
+    caminho_db = os.path.join(raiz, NOME_ARQUIVO_BIBLIOTECA)
+    try:
+        biblioteca = BibliotecaRoteiros(caminho_db)
+        inicio = time.perf_counter()
+        roteiros = biblioteca.atualizar(raiz, ListagemPastas(), DETECTOR_ROTEIRO)
+        primeira = time.perf_counter() - inicio
+        biblioteca.fechar()
+
+        # App reaberto: índice em disco, listagens sem cache
+        medidas = []
+        for _ in range(3):
+            inicio = time.perf_counter()
+            biblioteca = BibliotecaRoteiros(caminho_db)
+            assert biblioteca.atualizar(raiz, ListagemPastas(), DETECTOR_ROTEIRO) == roteiros
+            medidas.append(time.perf_counter() - inicio)
+            biblioteca.fechar()
+
+        print(f"{total} pastas de roteiro, {len(roteiros)} com texto")
+        print(f"  primeira varredura: {primeira * 1000:8.1f} ms")
+        print(f"  reabrindo a raiz:   {min(medidas) * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(raiz, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
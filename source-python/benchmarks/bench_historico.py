@@ -0,0 +1,85 @@
+"""
+Benchmark do histórico de cópias
+
+Com um histórico de 500 roteiros x 20 seções, compara o custo de cada
+cópia regravando o historico.json inteiro (como antes) e registrando no
+historico.db (fila em memória; o lote é gravado numa thread), o tempo
+para gravar a fila, o tempo para abrir o banco (com a importação do
+historico.json na primeira vez) e o de uma consulta get_info_copia.
+
+Uso:
+    python benchmarks/bench_historico.py [roteiros] [cópias]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from historico import HistoricoCopias, NOME_ARQUIVO_HISTORICO, NOME_ARQUIVO_HISTORICO_JSON
+
+
+def criar_historico(roteiros, secoes=20):
+    info = {'primeira_copia': "2024-01-01 10:00:00", 'ultima_copia': "2024-01-02 10:00:00", 'contador': 2}
+    return {f"Roteiro {r}": {f"CHAPTER {s} - Título da seção {s}": dict(info) for s in range(secoes)}
+            for r in range(roteiros)}
+
+
+def main():
+    roteiros = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    copias = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    pasta = tempfile.mkdtemp(prefix="bench_historico_")
+    caminho = os.path.join(pasta, NOME_ARQUIVO_HISTORICO_JSON)
+    caminho_db = os.path.join(pasta, NOME_ARQUIVO_HISTORICO)
+    try:
+        dados = criar_historico(roteiros)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, indent=2, ensure_ascii=False)
+        print(f"{roteiros} roteiros, historico.json com {os.path.getsize(caminho) / 1024:.0f} KB")
+
+        # Antes: o dicionário inteiro regravado a cada cópia
+        inicio = time.perf_counter()
+        for i in range(copias):
+            dados["Roteiro 0"]["CHAPTER 0 - Título da seção 0"]['contador'] += 1
+            with open(caminho, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, indent=2, ensure_ascii=False)
+        regravando = (time.perf_counter() - inicio) / copias
+
+        inicio = time.perf_counter()
+        historico = HistoricoCopias(caminho_db)
+        importar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for i in range(copias):
+            historico.registrar(f"Roteiro {i % roteiros}", f"CHAPTER {i % 20} - Título da seção {i % 20}")
+        banco = (time.perf_counter() - inicio) / copias
+        inicio = time.perf_counter()
+        historico.descarregar()
+        descarregar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for i in range(copias):
+            historico.info(f"Roteiro {i % roteiros}", f"CHAPTER {i % 20} - Título da seção {i % 20}")
+        consulta = (time.perf_counter() - inicio) / copias
+        historico.fechar()
+
+        inicio = time.perf_counter()
+        HistoricoCopias(caminho_db).fechar()
+        abrir = time.perf_counter() - inicio
+
+        print(f"  por cópia, regravando o JSON: {regravando * 1000:8.3f} ms")
+        print(f"  por cópia, historico.db:      {banco * 1000:8.3f} ms")
+        print(f"  gravar a fila ({copias} cópias):  {descarregar * 1000:8.1f} ms")
+        print(f"  get_info_copia:               {consulta * 1000:8.3f} ms")
+        print(f"  abrir (importando o JSON):    {importar * 1000:8.1f} ms")
+        print(f"  abrir (já importado):         {abrir * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark da listagem de pastas
+
+Monta uma pasta raiz temporária com 1.000 pastas de roteiro e compara a
+varredura de buscar_pasta_roteiros feita do jeito antigo (listagem via
+"cmd /c dir" no Windows / os.listdir, mais um isdir/exists por item) com
+a ListagemPastas (os.scandir), na primeira varredura e com o cache.
+
+Uso:
+    python benchmarks/bench_listagem.py [pastas]
+"""
+
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sistema_arquivos
+from sistema_arquivos import ListagemPastas
+
+
+def listar_antigo(caminho):
+    """listar_arquivos_incluindo_ocultos original"""
+    try:
+        if platform.system() == 'Windows':
+            cmd = f'cmd /c "dir /b /a "{caminho}""'
+            result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
+            if result.returncode == 0:
+                items = result.stdout.strip().split('\n')
+                return [item.strip() for item in items if item.strip()]
+            else:
+                return os.listdir(caminho)
+        else:
+            return os.listdir(caminho)
+    except Exception:
+        return os.listdir(caminho) if os.path.exists(caminho) else []
+
+
+def varredura_antiga(raiz):
+    """Laço original de buscar_pasta_roteiros (só a parte de sistema de arquivos)"""
+    roteiros = {}
+    for item in listar_antigo(raiz):
+        caminho_item = os.path.join(raiz, item)
+        if os.path.isdir(caminho_item):
+            arquivo_texto = None
+            if os.path.exists(os.path.join(caminho_item, "02_Texto_Narrado.txt")):
+                arquivo_texto = os.path.join(caminho_item, "02_Texto_Narrado.txt")
+            elif os.path.exists(os.path.join(caminho_item, "03_Texto_Narrado.txt")):
+                arquivo_texto = os.path.join(caminho_item, "03_Texto_Narrado.txt")
+            else:
+                arquivos_txt = [f for f in listar_antigo(caminho_item) if f.endswith(('.txt', '.srt'))]
+                if arquivos_txt:
+                    arquivo_texto = os.path.join(caminho_item, arquivos_txt[0])
+            if arquivo_texto:
+                roteiros[item] = (arquivo_texto, os.path.exists(os.path.join(caminho_item, "video_status.json")))
+    return roteiros
+
+
+def varredura_nova(raiz, pastas):
+    """Mesma varredura com a ListagemPastas"""
+    roteiros = {}
+    for subpasta in pastas.subpastas(raiz):
+        caminho_item = subpasta.path
+        arquivo_texto = None
+        if pastas.existe(caminho_item, "02_Texto_Narrado.txt"):
+            arquivo_texto = os.path.join(caminho_item, "02_Texto_Narrado.txt")
+        elif pastas.existe(caminho_item, "03_Texto_Narrado.txt"):
+            arquivo_texto = os.path.join(caminho_item, "03_Texto_Narrado.txt")
+        else:
+            arquivos_txt = [e.name for e in pastas.listar(caminho_item) if e.name.endswith(('.txt', '.srt'))]
+            if arquivos_txt:
+                arquivo_texto = os.path.join(caminho_item, arquivos_txt[0])
+        if arquivo_texto:
+            roteiros[subpasta.name] = (arquivo_texto, pastas.existe(caminho_item, "video_status.json"))
+    return roteiros
+
+
+def criar_raiz(total_pastas):
+    """Pasta raiz com total_pastas roteiros (formatos novo, antigo e livre)"""
+    raiz = tempfile.mkdtemp(prefix="bench_listagem_")
+    for i in range(total_pastas):
+        pasta = os.path.join(raiz, f"ROTEIRO_{i:04d}")
+        os.mkdir(pasta)
+        nome = ("02_Texto_Narrado.txt", "03_Texto_Narrado.txt", "notas.txt")[i % 3]
+        for arquivo in (nome, "01_Roteiro_Estruturado.txt", "05_Titulo_Descricao.txt", "video_status.json"):
+            with open(os.path.join(pasta, arquivo), 'w', encoding='utf-8') as f:
+                f.write("{}")
+
+    # Data antiga: o cache não relista pastas alteradas há menos de 2s
+    antigo = time.time() - 3600
+    for pasta in [raiz] + [os.path.join(raiz, p) for p in os.listdir(raiz)]:
+        os.utime(pasta, (antigo, antigo))
+    return raiz
+
+
+def medir(funcao, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    raiz = criar_raiz(total)
+    try:
+        pastas = ListagemPastas()
+        assert varredura_antiga(raiz) == varredura_nova(raiz, pastas)
+
+        antes = medir(lambda: varredura_antiga(raiz))
+        fria = medir(lambda: varredura_nova(raiz, ListagemPastas()))
+        quente = medir(lambda: varredura_nova(raiz, pastas))
+
+        # Cache já vencido: confere o mtime de cada pasta (um stat) sem relistar
+        sistema_arquivos._VALIDADE_NS = 0
+        revalidando = medir(lambda: varredura_nova(raiz, pastas))
+
+        print(f"{total} pastas de roteiro ({platform.system()})")
+        print(f"  antes (listagem + stat por item): {antes * 1000:8.1f} ms")
+        print(f"  scandir (primeira varredura):     {fria * 1000:8.1f} ms  ({antes / fria:.1f}x)")
+        print(f"  scandir (cache, conferindo mtime): {revalidando * 1000:7.1f} ms  ({antes / revalidando:.1f}x)")
+        print(f"  scandir (cache recém-conferido):  {quente * 1000:8.1f} ms  ({antes / quente:.1f}x)")
+    finally:
+        shutil.rmtree(raiz, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark do motor de seções
+
+Compara o laço antigo (re.match linha a linha contra cada padrão) com o
+detector compilado de passe único, em roteiros sintéticos grandes, e a
+memória retida pelos dicts antigos (texto copiado por seção) contra os
+registros Secao (apenas offsets para o buffer).
+
+Uso:
+    python benchmarks/bench_secoes.py [linhas ...]
+"""
+
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from secoes import DETECTOR_ROTEIRO, DETECTOR_ESTRUTURA
+
+
+PADROES_ANTIGOS_ROTEIRO = [
+    r'^OPENING\s*[-–—]\s*(.+)$',
+    r'^CHAPTER\s+(\w+)\s*[-–—]\s*(.+)$',
+    r'^ACT\s+(\w+)\s*[-–—]\s*(.+)$',
+    r'^ATO\s+(\w+)\s*[-–—]\s*(.+)$',
+    r'^CLOSING\s*[-–—]\s*(.+)$',
+    r'^EPILOGUE\s*[-–—]\s*(.+)$',
+    r'^CONCLUSION\s*[-–—]\s*(.+)$'
+]
+
+PADROES_ANTIGOS_ESTRUTURA = [
+    r'^(?:ATO|ACT)\s+([IVX\d]+)',
+    r'^(?:PARTE|PART)\s+([IVX\d]+)',
+    r'^(?:CAPÍTULO|CAPITULO|CHAPTER|CAP\.?)\s+([IVX\d]+)',
+    r'^(?:CENA|SCENE)\s+([IVX\d]+)',
+    r'^(?:HOOK|ABERTURA|OPENING)',
+    r'^(?:CONCLUS[ÃA]O|CLOSING|ENCERRAMENTO)',
+    r'^(?:EPÍLOGO|EPILOGO|EPILOGUE)'
+]
+
+
+def antigo_roteiro(texto):
+    """Laço original de identificar_secoes (apenas títulos)"""
+    titulos = []
+    for linha in texto.split('\n'):
+        linha_limpa = linha.strip()
+        for padrao in PADROES_ANTIGOS_ROTEIRO:
+            if re.match(padrao, linha_limpa, re.IGNORECASE):
+                titulos.append(linha_limpa)
+                break
+    return titulos
+
+
+def antigo_estrutura(texto):
+    """Laço original de detectar_secoes_arquivo / analisar_estrutura (apenas títulos)"""
+    titulos = []
+    for linha in texto.split('\n'):
+        linha_limpa = linha.strip()
+        if not linha_limpa or re.match(r'^[=\-▓━╔╗║╚═]{3,}$', linha_limpa):
+            continue
+        linha_para_analise = re.sub(r'\s*[▓▓▓━\-=]+\s*$', '', linha_limpa)
+        for padrao in PADROES_ANTIGOS_ESTRUTURA:
+            if re.match(padrao, linha_para_analise, re.IGNORECASE):
+                titulos.append(linha_para_analise)
+                break
+    return titulos
+
+
+def antigo_secoes_dict(texto):
+    """identificar_secoes original: um dict com o texto copiado por seção"""
+    secoes = {}
+    linhas = texto.split('\n')
+    titulo, texto_secao, indice = None, [], 0
+    for linha in linhas:
+        linha_limpa = linha.strip()
+        for padrao in PADROES_ANTIGOS_ROTEIRO:
+            if re.match(padrao, linha_limpa, re.IGNORECASE):
+                if titulo:
+                    secoes[indice] = {'titulo': titulo, 'texto': '\n'.join(texto_secao).strip()}
+                    indice += 1
+                titulo, texto_secao = linha_limpa, [linha]
+                break
+        else:
+            if titulo:
+                texto_secao.append(linha)
+    if titulo:
+        secoes[indice] = {'titulo': titulo, 'texto': '\n'.join(texto_secao).strip()}
+    return secoes
+
+
+def memoria_retida(funcao, texto):
+    """Bytes que continuam alocados pelo resultado (sem contar o buffer)"""
+    tracemalloc.start()
+    resultado = funcao(texto)
+    retido, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return retido
+
+
+def gerar_roteiro(total_linhas):
+    """Gera um roteiro sintético com um título a cada ~60 linhas"""
+    paragrafo = "Nos dias antes do dilúvio, a maldade do homem havia se multiplicado sobre a Terra."
+    linhas = ["OPENING - O DILÚVIO: JULGAMENTO E REDENÇÃO", ""]
+    capitulo = 1
+    while len(linhas) < total_linhas:
+        if len(linhas) % 60 == 0:
+            marcador = f"ACT {capitulo} - PARTE" if capitulo % 5 == 0 else f"CHAPTER {capitulo} - TÍTULO"
+            linhas.extend(["", "━━━━━━━━━━━━━━━━", marcador, ""])
+            capitulo += 1
+        else:
+            linhas.append(paragrafo if len(linhas) % 7 else "")
+    linhas.append("CONCLUSION - O ARCO-ÍRIS DA PROMESSA")
+    return '\n'.join(linhas)
+
+
+def medir(funcao, texto, repeticoes=3):
+    """Melhor tempo entre algumas repetições"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [20_000, 100_000, 500_000]
+
+    print(f"{'linhas':>10} | {'parser':<10} | {'antes (linhas/s)':>18} | {'depois (linhas/s)':>18} | {'ganho':>6}")
+    print("-" * 76)
+
+    for total in tamanhos:
+        texto = gerar_roteiro(total)
+        linhas = texto.count('\n') + 1
+
+        casos = [
+            ('roteiro', antigo_roteiro, lambda t: DETECTOR_ROTEIRO.secoes(t)),
+            ('estrutura', antigo_estrutura, lambda t: DETECTOR_ESTRUTURA.secoes(t)),
+        ]
+        for nome, antigo, novo in casos:
+            # Confere que os dois caminhos encontram os mesmos títulos
+            assert antigo(texto) == [secao.titulo for secao in novo(texto)], nome
+
+            antes = linhas / medir(antigo, texto)
+            depois = linhas / medir(novo, texto)
+            print(f"{linhas:>10} | {nome:<10} | {antes:>18,.0f} | {depois:>18,.0f} | {depois / antes:>5.1f}x")
+
+    print()
+    print(f"{'linhas':>10} | {'dicts (KB)':>12} | {'Secao (KB)':>12} | {'redução':>8}")
+    print("-" * 52)
+
+    for total in tamanhos:
+        texto = gerar_roteiro(total)
+        antes = memoria_retida(antigo_secoes_dict, texto)
+        depois = memoria_retida(lambda t: DETECTOR_ROTEIRO.secoes(t), texto)
+        print(f"{texto.count(chr(10)) + 1:>10} | {antes / 1024:>12,.0f} | {depois / 1024:>12,.0f} | {antes / depois:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark da varredura numa pasta de rede (latência simulada)
+
+Cada stat, listagem e abertura de arquivo espera alguns milissegundos,
+como uma ida e volta a um servidor SMB. Compara a primeira varredura e
+a seguinte com uma pasta conferida por vez e com o limite padrão de
+pastas simultâneas por compartilhamento.
+
+Uso:
+    python benchmarks/bench_sondagem.py [pastas] [latência em ms]
+"""
+
+import builtins
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sistema_arquivos
+from bench_listagem import criar_raiz
+from biblioteca import BibliotecaRoteiros
+from secoes import DETECTOR_ROTEIRO
+from sistema_arquivos import ListagemPastas
+
+
+def com_latencia(funcao, segundos):
+    def chamar(*args, **kwargs):
+        time.sleep(segundos)
+        return funcao(*args, **kwargs)
+    return chamar
+
+
+def varrer(raiz, caminho_db):
+    biblioteca = BibliotecaRoteiros(caminho_db)
+    inicio = time.perf_counter()
+    roteiros = biblioteca.atualizar(raiz, ListagemPastas(), DETECTOR_ROTEIRO)
+    tempo = time.perf_counter() - inicio
+    biblioteca.fechar()
+    return len(roteiros), tempo
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 2.0) / 1000
+    raiz = criar_raiz(total)
+    originais = os.stat, os.scandir, builtins.open
+    try:
+        os.stat = com_latencia(os.stat, latencia)
+        os.scandir = com_latencia(os.scandir, latencia)
+        builtins.open = com_latencia(builtins.open, latencia)
+
+        print(f"{total} pastas, {latencia * 1000:.1f} ms por ida e volta")
+        padrao = sistema_arquivos.SONDAGENS_POR_COMPARTILHAMENTO
+        for simultaneas in (1, padrao):
+            sistema_arquivos.SONDAGENS_POR_COMPARTILHAMENTO = simultaneas
+            sistema_arquivos._limites.clear()
+            caminho_db = os.path.join(raiz, f"biblioteca_{simultaneas}.db")
+            encontrados, primeira = varrer(raiz, caminho_db)
+            _, seguinte = varrer(raiz, caminho_db)
+            print(f"  {simultaneas:2d} por compartilhamento: primeira {primeira * 1000:8.1f} ms, "
+                  f"seguinte {seguinte * 1000:8.1f} ms ({encontrados} roteiros)")
+    finally:
+        os.stat, os.scandir, builtins.open = originais
+        shutil.rmtree(raiz, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+"""
+Índice persistente dos roteiros de uma pasta raiz
+
+Guarda em SQLite (biblioteca.db, na pasta raiz) uma linha por subpasta,
+pelo caminho relativo à raiz: arquivo de texto narrado, status do vídeo,
+número de seções e de palavras, e os mtimes usados para saber se algo
+mudou. Numa nova varredura só as pastas com mtime diferente são
+examinadas de novo; as outras custam um stat.
+
+As subpastas são percorridas em profundidade (ex.: ano/mês/roteiro) até
+o limite do PercursoPastas, sem entrar nas pastas ignoradas nem dentro
+das pastas de roteiro (as que têm arquivo de texto).
+
+Editar um arquivo no lugar não muda o mtime da pasta: quem altera um
+arquivo (ex.: salvar_info_video) chama examinar() para a pasta, e a
+varredura completa confere também os mtimes dos arquivos.
+
+A varredura pode rodar numa thread (atualizar_em_lotes) enquanto a
+interface consulta o índice: a conexão é compartilhada e cada operação
+segura a trava da biblioteca.
+
+Cada pasta (stat, leitura do texto e do video_status.json) é conferida
+num pool de threads, com um limite de pastas simultâneas por
+compartilhamento: numa pasta de rede a varredura passa a depender da
+banda, não da soma das idas e voltas ao servidor.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from registro import obter_logger
+from secoes import VERSAO_PARSER
+from sistema_arquivos import (
+    PROFUNDIDADE_PADRAO, PercursoPastas, carregar_regras_ignorar, limite_compartilhamento
+)
+
+
+NOME_ARQUIVO_BIBLIOTECA = "biblioteca.db"
+
+# Arquivo de texto narrado, em ordem de preferência (formato novo, antigo)
+NOMES_TEXTO_NARRADO = ("02_Texto_Narrado.txt", "03_Texto_Narrado.txt")
+NOME_ARQUIVO_STATUS = "video_status.json"
+
+# Pastas alteradas há menos que isso são examinadas de novo na próxima
+# varredura (mtime de baixa resolução em alguns sistemas de arquivos)
+_MARGEM_MTIME_NS = 2_000_000_000
+
+# Threads do pool que confere as pastas (compartilhado por todas as raízes;
+# o limite por compartilhamento está em sistema_arquivos)
+SONDAGENS_SIMULTANEAS = 16
+_PASTAS_POR_TAREFA = 16  # Pastas conferidas em sequência por tarefa do pool
+
+log = obter_logger("biblioteca")
+
+# pasta e arquivo_texto são caminhos completos; alterado é o mtime (ns) mais
+# recente entre pasta, texto e status (None nos roteiros montados pela interface)
+Roteiro = namedtuple('Roteiro', 'pasta nome arquivo_texto postado secoes palavras alterado', defaults=(None,))
+
+
+def nome_roteiro(nome_pasta):
+    """Nome exibido do roteiro a partir do nome da pasta (ou do caminho relativo)"""
+    return os.path.basename(nome_pasta).replace("_", " ").title()
+
+
+def _mtime(caminho):
+    try:
+        return os.stat(caminho).st_mtime_ns
+    except OSError:
+        return 0
+
+
+_executor = None
+_trava_executor = threading.Lock()
+
+
+def _executor_sondagem():
+    global _executor
+    with _trava_executor:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(SONDAGENS_SIMULTANEAS, thread_name_prefix="sondagem")
+        return _executor
+
+
+class BibliotecaRoteiros:
+    """Índice em SQLite das subpastas de roteiro de uma pasta raiz"""
+
+    def __init__(self, caminho_db):
+        self.caminho_db = caminho_db
+        self.trava = threading.RLock()
+        self.conexao = sqlite3.connect(caminho_db, check_same_thread=False)
+        self.conexao.execute("""
+            CREATE TABLE IF NOT EXISTS roteiros (
+                pasta TEXT PRIMARY KEY,
+                nome TEXT NOT NULL,
+                arquivo_texto TEXT NOT NULL,
+                postado INTEGER NOT NULL,
+                secoes INTEGER NOT NULL,
+                palavras INTEGER NOT NULL,
+                mtime_pasta INTEGER NOT NULL,
+                mtime_texto INTEGER NOT NULL,
+                mtime_status INTEGER NOT NULL,
+                versao TEXT NOT NULL
+            )
+        """)
+        self.conexao.commit()
+
+    def atualizar(self, raiz, pastas, detector, versao=VERSAO_PARSER, completo=False, percurso=None):
+        """Revalida o índice e retorna os Roteiros da raiz
+
+        pastas é a ListagemPastas do app. Só as subpastas cujo mtime mudou
+        (ou com versão de marcadores diferente) são examinadas; com
+        completo=True também são conferidos os mtimes do texto e do status.
+        percurso é o PercursoPastas a usar (padrão: profundidade padrão e
+        regras do .scriptcopierignore da raiz).
+        """
+        for _ in self.atualizar_em_lotes(raiz, pastas, detector, versao, completo, percurso=percurso):
+            pass
+        return self.roteiros(raiz)
+
+    def atualizar_em_lotes(self, raiz, pastas, detector, versao=VERSAO_PARSER, completo=False,
+                           cancelar=None, tamanho_lote=50, percurso=None):
+        """Como atualizar(), mas gera os Roteiros em lotes conforme as pastas são conferidas
+
+        cancelar é um threading.Event: se for acionado a varredura para
+        no próximo item. O que já foi examinado fica gravado, mas as
+        pastas removidas só saem do índice numa varredura que termina.
+        """
+        if percurso is None:
+            percurso = PercursoPastas(raiz, pastas, PROFUNDIDADE_PADRAO, carregar_regras_ignorar(raiz))
+
+        with self.trava:
+            linhas = {
+                linha[0]: linha
+                for linha in self.conexao.execute(
+                    "SELECT pasta, mtime_pasta, mtime_texto, mtime_status, versao, arquivo_texto, "
+                    "nome, postado, secoes, palavras FROM roteiros"
+                )
+            }
+
+        presentes = set()
+        lote = []
+        pendentes = set()  # Futures dos grupos de pastas sendo conferidos no pool
+        prontos = queue.Queue()  # Futures concluídos
+        limite = limite_compartilhamento(raiz)
+        executor = _executor_sondagem()
+
+        def enviar(grupo):
+            futuro = executor.submit(self._sondar, limite, raiz, grupo, pastas, detector, versao, completo)
+            pendentes.add(futuro)
+            futuro.add_done_callback(prontos.put)
+
+        try:
+            while True:
+                # As pastas são conferidas em grupos nas threads do pool; só
+                # se desce numa pasta depois, se não for uma pasta de roteiro
+                grupo = []
+                for relativo, subpasta in percurso:
+                    presentes.add(relativo)
+                    percurso.podar()
+                    grupo.append((relativo, linhas.get(relativo)))
+                    if len(grupo) >= _PASTAS_POR_TAREFA:
+                        enviar(grupo)
+                        grupo = []
+                if grupo:
+                    enviar(grupo)
+
+                if cancelar is not None and cancelar.is_set():
+                    with self.trava:
+                        self.conexao.commit()
+                    return
+                if not pendentes:
+                    break
+
+                try:
+                    futuro = prontos.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                pendentes.discard(futuro)
+                for relativo, roteiro in futuro.result():
+                    if os.path.basename(roteiro.arquivo_texto):  # Só pastas com arquivo de texto
+                        lote.append(roteiro)
+                    else:
+                        percurso.descer(relativo, os.path.join(raiz, relativo))
+
+                if len(lote) >= tamanho_lote:
+                    with self.trava:
+                        self.conexao.commit()
+                    yield lote
+                    lote = []
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+
+        # Pastas apagadas ou renomeadas
+        removidas = [(pasta,) for pasta in linhas if pasta not in presentes]
+        with self.trava:
+            self.conexao.executemany("DELETE FROM roteiros WHERE pasta = ?", removidas)
+            self.conexao.commit()
+        if lote:
+            yield lote
+
+    def _sondar(self, limite, raiz, grupo, pastas, detector, versao, completo):
+        """Confere um grupo de pastas pelo mtime e examina as que mudaram (roda no pool)
+
+        grupo é uma lista de (relativo, linha do índice ou None); retorna
+        [(relativo, Roteiro)]. Uma pasta que não pôde ser lida fica de fora
+        (e continua no índice como estava), sem parar o grupo.
+        """
+        resultado = []
+        for relativo, linha in grupo:
+            caminho = os.path.join(raiz, relativo)
+            with limite:
+                if linha and linha[1] == _mtime(caminho) and linha[4] == versao and (
+                        not completo or self._arquivos_iguais(caminho, linha)):
+                    roteiro = self._roteiro(raiz, linha[0], *linha[5:], max(linha[1:4]))
+                else:
+                    try:
+                        roteiro = self.examinar(raiz, relativo, pastas, detector, versao)
+                    except OSError as e:
+                        log.warning("Pasta %s ignorada: %s", caminho, e)
+                        continue
+            resultado.append((relativo, roteiro))
+        return resultado
+
+    def _arquivos_iguais(self, caminho_pasta, linha):
+        mtime_texto, mtime_status, _, arquivo_texto = linha[2:6]
+        if arquivo_texto and _mtime(os.path.join(caminho_pasta, arquivo_texto)) != mtime_texto:
+            return False
+        return _mtime(os.path.join(caminho_pasta, NOME_ARQUIVO_STATUS)) == mtime_status
+
+    def examinar(self, raiz, nome_pasta, pastas, detector, versao=VERSAO_PARSER):
+        """Examina uma subpasta (caminho relativo à raiz), grava a linha dela no índice (sem commit) e retorna o Roteiro
+
+        OSError se a pasta não puder ser listada (apagada, sem permissão).
+        """
+        caminho_pasta = os.path.join(raiz, nome_pasta)
+        mtime_pasta = alterado = _mtime(caminho_pasta)
+        if time.time_ns() - mtime_pasta < _MARGEM_MTIME_NS:
+            mtime_pasta = 0  # Alterada agora: não confia no mtime na próxima vez
+
+        # Texto narrado: formato novo, antigo ou o primeiro .txt/.srt
+        arquivo_texto = ""
+        for nome in NOMES_TEXTO_NARRADO:
+            entrada = pastas.entrada(caminho_pasta, nome)
+            if entrada is not None:
+                arquivo_texto = entrada.name
+                break
+        else:
+            for entrada in pastas.listar(caminho_pasta):
+                if entrada.name.endswith(('.txt', '.srt')):
+                    arquivo_texto = entrada.name
+                    break
+
+        secoes = palavras = mtime_texto = 0
+        if arquivo_texto:
+            caminho_texto = os.path.join(caminho_pasta, arquivo_texto)
+            mtime_texto = _mtime(caminho_texto)
+            try:
+                with open(caminho_texto, 'r', encoding='utf-8', errors='replace') as f:
+                    texto = f.read()
+                secoes = sum(1 for _ in detector.marcadores(texto))
+                palavras = len(texto.split())
+            except OSError as e:
+                log.warning("Erro ao ler %s: %s", caminho_texto, e)
+
+        postado = False
+        caminho_status = os.path.join(caminho_pasta, NOME_ARQUIVO_STATUS)
+        mtime_status = _mtime(caminho_status)
+        if mtime_status:
+            try:
+                with open(caminho_status, 'r', encoding='utf-8') as f:
+                    postado = bool(json.load(f).get("video_postado", False))
+            except Exception:
+                pass  # Mantém como não postado em caso de erro
+
+        with self.trava:
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO roteiros VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (nome_pasta, nome_roteiro(nome_pasta), arquivo_texto, postado, secoes, palavras,
+                 mtime_pasta, mtime_texto, mtime_status, versao)
+            )
+        return self._roteiro(raiz, nome_pasta, arquivo_texto, nome_roteiro(nome_pasta), postado, secoes, palavras,
+                             max(alterado, mtime_texto, mtime_status))
+
+    @staticmethod
+    def _roteiro(raiz, pasta, arquivo_texto, nome, postado, secoes, palavras, alterado):
+        return Roteiro(os.path.join(raiz, pasta), nome, os.path.join(raiz, pasta, arquivo_texto),
+                       bool(postado), secoes, palavras, alterado)
+
+    def remover(self, nome_pasta):
+        """Tira uma subpasta apagada ou renomeada do índice, com as de dentro dela (sem commit)"""
+        prefixo = nome_pasta + os.sep
+        with self.trava:
+            self.conexao.execute(
+                "DELETE FROM roteiros WHERE pasta = ? OR substr(pasta, 1, ?) = ?",
+                (nome_pasta, len(prefixo), prefixo)
+            )
+
+    def roteiros(self, raiz):
+        """Roteiros do índice (só pastas com arquivo de texto), pelo nome"""
+        with self.trava:
+            return [
+                self._roteiro(raiz, *linha)
+                for linha in self.conexao.execute(
+                    "SELECT pasta, arquivo_texto, nome, postado, secoes, palavras, "
+                    "max(mtime_pasta, mtime_texto, mtime_status) FROM roteiros "
+                    "WHERE arquivo_texto != '' ORDER BY nome"
+                )
+            ]
+
+    def salvar(self):
+        with self.trava:
+            self.conexao.commit()
+
+    def fechar(self):
+        with self.trava:
+            self.conexao.commit()
+            self.conexao.close()
+
+
+class IndiceRoteiros:
+    """Rótulos do combobox ↔ Roteiros ↔ pastas, montado a cada varredura
+
+    Aceita roteiros de várias raízes (canais). O rótulo é o nome com o
+    indicador de status ("✅ "/"⚪ "). Pastas diferentes com o mesmo nome
+    exibido (ex.: ROT_A e rot_a, a mesma pasta em dois canais ou em dois
+    anos) recebem o nome da pasta entre parênteses, e também os das
+    pastas de cima enquanto coincidirem, para cada rótulo apontar para
+    uma só. A mesma pasta
+    vinda de duas raízes aparece uma vez só. raizes são as pastas raiz
+    registradas, para achar o canal de roteiros em subpastas (ano/mês).
+    """
+
+    def __init__(self, roteiros=(), raizes=()):
+        self._por_rotulo = {}  # {rótulo: Roteiro}
+        self._por_pasta = {}  # {pasta normalizada: rótulo}
+        self._raizes = {}  # {rótulo: raiz do roteiro}
+        # Mais longas primeiro: uma raiz dentro de outra fica com os seus roteiros
+        self._raizes_registradas = sorted(
+            ((os.path.normcase(os.path.normpath(raiz)) + os.sep, raiz) for raiz in raizes), reverse=True
+        )
+
+        unicos = {}
+        for roteiro in roteiros:
+            unicos.setdefault(os.path.normcase(os.path.normpath(roteiro.pasta)), roteiro)
+        roteiros = list(unicos.values())
+
+        # Rótulos iguais ganham a pasta, depois as de cima, até ficarem únicos
+        partes = [os.path.normpath(roteiro.pasta).split(os.sep) for roteiro in roteiros]
+        niveis = [0] * len(roteiros)
+        while True:
+            rotulos = []
+            for roteiro, pasta, nivel in zip(roteiros, partes, niveis):
+                rotulo = f"{'✅ ' if roteiro.postado else '⚪ '}{roteiro.nome}"
+                if nivel:
+                    rotulo += f" ({'/'.join(pasta[-nivel:])})"
+                rotulos.append(rotulo)
+            contagem = {}
+            for rotulo in rotulos:
+                contagem[rotulo] = contagem.get(rotulo, 0) + 1
+            repetidos = [i for i, rotulo in enumerate(rotulos)
+                         if contagem[rotulo] > 1 and niveis[i] < len(partes[i])]
+            if not repetidos:
+                break
+            for i in repetidos:
+                niveis[i] += 1
+
+        for rotulo, roteiro in zip(rotulos, roteiros):
+            self.adicionar(rotulo, roteiro)
+
+    def adicionar(self, rotulo, roteiro, raiz=None):
+        """Inclui um roteiro; a raiz padrão é a registrada que contém a pasta (ou a pasta acima)"""
+        pasta = os.path.normcase(os.path.normpath(roteiro.pasta))
+        self._por_rotulo[rotulo] = roteiro
+        self._por_pasta[pasta] = rotulo
+        if raiz is None:
+            raiz = next((registrada for prefixo, registrada in self._raizes_registradas
+                         if pasta.startswith(prefixo)), os.path.dirname(roteiro.pasta))
+        self._raizes[rotulo] = raiz
+
+    def roteiro(self, rotulo):
+        """Roteiro do rótulo escolhido no combobox (None se não estiver no índice)"""
+        return self._por_rotulo.get(rotulo)
+
+    def raiz(self, rotulo):
+        """Pasta raiz (canal) do roteiro do rótulo"""
+        return self._raizes.get(rotulo)
+
+    def rotulo_da_pasta(self, pasta):
+        """Rótulo atual do roteiro de uma pasta (o indicador de status pode ter mudado)"""
+        return self._por_pasta.get(os.path.normcase(os.path.normpath(pasta)))
+
+    def rotulos(self):
+        return sorted(self._por_rotulo)
+
+    def __len__(self):
+        return len(self._por_rotulo)
+
+
+class VarreduraBiblioteca:
+    """Roda atualizar_em_lotes numa thread e entrega os resultados por uma fila
+
+    Eventos (tipo, dados): ('lote', [Roteiro]) e, no fim, um de
+    ('fim', PercursoPastas), ('cancelada', None) ou ('erro', mensagem).
+    O percurso do 'fim' traz quantas pastas foram visitadas e puladas.
+    Cada varredura tem a própria fila: quem cancela uma e começa outra só
+    descarta o objeto antigo.
+
+    Com alvos=(alteradas, removidas), caminhos relativos à raiz, só essas
+    pastas são examinadas (ou tiradas do índice), sem percorrer a raiz;
+    o 'fim' vem com None no lugar do percurso.
+    """
+
+    def __init__(self, biblioteca, raiz, pastas, detector, versao=VERSAO_PARSER, completo=False,
+                 profundidade_maxima=PROFUNDIDADE_PADRAO, alvos=None):
+        self.eventos = queue.Queue()
+        self.encontrados = []  # Roteiros já recebidos por quem consome a fila
+        self._cancelar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._executar,
+            args=(biblioteca, raiz, pastas, detector, versao, completo, profundidade_maxima, alvos),
+            name="varredura", daemon=True
+        )
+
+    def iniciar(self):
+        self._thread.start()
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    def _executar(self, biblioteca, raiz, pastas, detector, versao, completo, profundidade_maxima, alvos):
+        if alvos is not None:
+            self._examinar_alvos(biblioteca, raiz, pastas, detector, versao, *alvos)
+            return
+        try:
+            # As regras são lidas aqui: a raiz pode estar num compartilhamento lento
+            percurso = PercursoPastas(raiz, pastas, profundidade_maxima, carregar_regras_ignorar(raiz))
+            for lote in biblioteca.atualizar_em_lotes(raiz, pastas, detector, versao, completo,
+                                                      self._cancelar, percurso=percurso):
+                self.eventos.put(('lote', lote))
+        except Exception as e:
+            self.eventos.put(('erro', str(e)))
+            return
+        if self._cancelar.is_set():
+            self.eventos.put(('cancelada', None))
+        else:
+            self.eventos.put(('fim', percurso))
+
+    def _examinar_alvos(self, biblioteca, raiz, pastas, detector, versao, alteradas, removidas):
+        try:
+            for relativo in removidas:
+                biblioteca.remover(relativo)
+            lote = []
+            for relativo in alteradas:
+                if self._cancelar.is_set():
+                    break
+                if not os.path.isdir(os.path.join(raiz, relativo)):
+                    continue
+                try:
+                    lote.append(biblioteca.examinar(raiz, relativo, pastas, detector, versao))
+                except OSError as e:
+                    log.warning("Pasta %s ignorada: %s", os.path.join(raiz, relativo), e)
+            biblioteca.salvar()
+        except Exception as e:
+            self.eventos.put(('erro', str(e)))
+            return
+        if lote:
+            self.eventos.put(('lote', lote))
+        self.eventos.put(('cancelada' if self._cancelar.is_set() else 'fim', None))
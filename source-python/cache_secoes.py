@@ -0,0 +1,118 @@
+"""
+Cache persistente das seções detectadas
+
+Guarda em SQLite (na pasta raiz, ao lado do historico.db) as seções de
+cada arquivo: tipo, título, faixa de linhas e contagem de palavras. A
+chave é (caminho, tamanho, mtime_ns, versão do parser + marcadores), então arquivos
+que não mudaram são carregados do cache sem serem lidos.
+
+Entradas sem uso há muito tempo são descartadas, e o cache é podado
+quando passa do limite de tamanho. A data de uso das entradas lidas fica
+em memória e é gravada junto com o próximo salvar(): uma consulta nunca
+abre transação de escrita.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+from secoes import Secao, VERSAO_PARSER
+
+
+NOME_ARQUIVO_CACHE = "cache_secoes.db"
+
+# Política de descarte
+DIAS_SEM_USO = 30
+LIMITE_BYTES = 32 * 1024 * 1024
+
+
+class CacheSecoes:
+    """Cache em SQLite das seções de cada arquivo de uma pasta raiz"""
+
+    def __init__(self, caminho_db, versao=VERSAO_PARSER, dias_sem_uso=DIAS_SEM_USO, limite_bytes=LIMITE_BYTES):
+        self.caminho_db = caminho_db
+        self.versao = versao  # Muda com o parser e com o marcadores.json
+        self._acessados = {}  # {(caminho, perfil): quando} gravados só no salvar()
+        self.conexao = sqlite3.connect(caminho_db)
+        self.conexao.execute("""
+            CREATE TABLE IF NOT EXISTS arquivos (
+                caminho TEXT NOT NULL,
+                perfil TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                versao TEXT NOT NULL,
+                acessado REAL NOT NULL,
+                secoes TEXT NOT NULL,
+                PRIMARY KEY (caminho, perfil)
+            )
+        """)
+        self.conexao.commit()
+        self.descartar_antigos(dias_sem_uso, limite_bytes)
+
+    def buscar(self, caminho, perfil, info=None):
+        """Seções do arquivo se o cache ainda vale para ele, senão None
+
+        info pode ser um os.stat_result já obtido (evita outro stat).
+        """
+        info = info or os.stat(caminho)
+        linha = self.conexao.execute(
+            "SELECT tamanho, mtime_ns, versao, secoes FROM arquivos WHERE caminho = ? AND perfil = ?",
+            (caminho, perfil)
+        ).fetchone()
+
+        if not linha or linha[:3] != (info.st_size, info.st_mtime_ns, self.versao):
+            return None
+
+        # Só leitura aqui: um UPDATE abriria uma transação de escrita que trava
+        # o banco para outra instância até o próximo salvar()
+        self._acessados[(caminho, perfil)] = time.time()
+        return [
+            Secao.sem_texto(tipo, titulo, linha_inicio, linha_fim, palavras)
+            for tipo, titulo, linha_inicio, linha_fim, palavras in json.loads(linha[3])
+        ]
+
+    def guardar(self, caminho, perfil, secoes, info=None):
+        """Guarda as seções detectadas para o arquivo no estado atual"""
+        info = info or os.stat(caminho)
+        dados = json.dumps(
+            [[s.tipo, s.titulo, s.linha_inicio, s.linha_fim, s.palavras] for s in secoes],
+            ensure_ascii=False
+        )
+        self.conexao.execute(
+            "INSERT OR REPLACE INTO arquivos VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (caminho, perfil, info.st_size, info.st_mtime_ns, self.versao, time.time(), dados)
+        )
+
+    def salvar(self):
+        """Grava as alterações pendentes (uma transação por carga de pasta)"""
+        if self._acessados:
+            self.conexao.executemany(
+                "UPDATE arquivos SET acessado = ? WHERE caminho = ? AND perfil = ?",
+                [(quando, caminho, perfil) for (caminho, perfil), quando in self._acessados.items()]
+            )
+            self._acessados.clear()
+        self.conexao.commit()
+
+    def descartar_antigos(self, dias_sem_uso, limite_bytes):
+        """Remove entradas sem uso e, se preciso, as menos usadas até caber no limite"""
+        self.conexao.execute(
+            "DELETE FROM arquivos WHERE acessado < ? OR versao != ?",
+            (time.time() - dias_sem_uso * 86400, self.versao)
+        )
+
+        total = self.conexao.execute("SELECT COALESCE(SUM(LENGTH(secoes)), 0) FROM arquivos").fetchone()[0]
+        if total > limite_bytes:
+            for caminho, perfil, tamanho in self.conexao.execute(
+                "SELECT caminho, perfil, LENGTH(secoes) FROM arquivos ORDER BY acessado"
+            ).fetchall():
+                self.conexao.execute("DELETE FROM arquivos WHERE caminho = ? AND perfil = ?", (caminho, perfil))
+                total -= tamanho
+                if total <= limite_bytes:
+                    break
+
+        self.conexao.commit()
+
+    def fechar(self):
+        self.salvar()
+        self.conexao.close()
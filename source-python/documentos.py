@@ -0,0 +1,166 @@
+"""
+Camada de leitura de arquivos via mmap
+
+Ao abrir, o arquivo é mapeado em memória só para montar o índice dos
+offsets de início de cada linha; depois o mapa e o arquivo são fechados
+(no Windows um mapa aberto impede o editor de salvar o arquivo). Ficam
+só os offsets e o tamanho/mtime. O texto completo só é decodificado
+quando é exibido, e trechos por número de linha são lidos com um seek
+direto no offset, sem reler o arquivo inteiro.
+"""
+
+import mmap
+import os
+import re
+from array import array
+from collections import OrderedDict
+
+
+_RE_QUEBRA = re.compile(rb'\n')
+
+
+class Documento:
+    """Arquivo de texto indexado por linha (offsets via mmap, lido sob demanda)"""
+
+    def __init__(self, caminho, encoding='utf-8'):
+        self.caminho = caminho
+        self.encoding = encoding
+
+        info = os.stat(caminho)
+        self.tamanho = info.st_size
+        self.mtime_ns = info.st_mtime_ns
+
+        self._inicios = self._indexar()
+        self._texto = None
+        self._palavras = None
+        self.cache = {}  # Resultados derivados (ex.: seções já detectadas)
+
+    def atualizado(self):
+        """True se o arquivo em disco ainda é o mesmo que foi indexado"""
+        try:
+            info = os.stat(self.caminho)
+        except OSError:
+            return False
+        return info.st_size == self.tamanho and info.st_mtime_ns == self.mtime_ns
+
+    def _indexar(self):
+        """Offsets do início de cada linha, com o arquivo mapeado só durante a varredura"""
+        inicios = array('q', [0])
+        if not self.tamanho:  # mmap não aceita arquivo vazio
+            return inicios
+        with open(self.caminho, 'rb') as arquivo:
+            with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                inicios.extend(match.end() for match in _RE_QUEBRA.finditer(mapa))
+        return inicios
+
+    @property
+    def inicios_linhas(self):
+        """Offsets (em bytes) do início de cada linha"""
+        return self._inicios
+
+    @property
+    def total_linhas(self):
+        return len(self.inicios_linhas)
+
+    @property
+    def texto(self):
+        """Texto completo (decodificado uma única vez)"""
+        if self._texto is None:
+            self._texto = self.decodificar(0, self.tamanho)
+        return self._texto
+
+    @property
+    def palavras(self):
+        if self._palavras is None:
+            self._palavras = len(self.texto.split())
+        return self._palavras
+
+    def trecho(self, linha_inicio, linha_fim):
+        """Texto das linhas linha_inicio..linha_fim (inclusive), lido direto do offset"""
+        inicios = self.inicios_linhas
+        linha_inicio = max(0, linha_inicio)
+        if linha_inicio >= len(inicios):
+            return ""
+
+        inicio = inicios[linha_inicio]
+        fim = inicios[linha_fim + 1] if linha_fim + 1 < len(inicios) else self.tamanho
+        texto = self.decodificar(inicio, max(inicio, fim))
+        return texto[:-1] if texto.endswith('\n') else texto
+
+    def linhas(self):
+        """Gera as linhas do arquivo (com a quebra no fim), decodificando uma a uma"""
+        if not self.tamanho:
+            return
+        with open(self.caminho, 'rb') as arquivo:
+            # Até o tamanho indexado: as linhas batem com inicios_linhas
+            restante = self.tamanho
+            for linha in arquivo:
+                linha = linha[:restante]
+                restante -= len(linha)
+                yield linha.decode(self.encoding).replace('\r\n', '\n')
+                if restante <= 0:
+                    break
+
+    def decodificar(self, inicio, fim):
+        """Decodifica a faixa de bytes [inicio, fim) do arquivo"""
+        # Mesmo resultado de open(..., 'r'): CRLF vira LF
+        return self.bytes(inicio, fim).decode(self.encoding).replace('\r\n', '\n')
+
+    def bytes(self, inicio, fim):
+        """Bytes crus da faixa [inicio, fim) do arquivo (aberto só para a leitura)"""
+        if fim <= inicio:
+            return b''
+        with open(self.caminho, 'rb') as arquivo:
+            arquivo.seek(inicio)
+            return arquivo.read(fim - inicio)
+
+    def fechar(self):
+        """Descarta o texto decodificado (o arquivo já não fica aberto)"""
+        self._texto = None
+
+
+class DocumentosAbertos:
+    """Cache dos documentos abertos, reaberto quando o arquivo muda em disco"""
+
+    def __init__(self, limite=16):
+        self.limite = limite
+        self._documentos = OrderedDict()
+
+    def abrir(self, caminho):
+        """Retorna o Documento do caminho, reaproveitando o índice se nada mudou"""
+        caminho = os.path.normpath(caminho)
+        documento = self._documentos.get(caminho)
+
+        if documento is not None:
+            if documento.atualizado():
+                self._documentos.move_to_end(caminho)
+                return documento
+            self.fechar(caminho)
+
+        documento = Documento(caminho)
+        self._documentos[caminho] = documento
+
+        # Descarta os menos usados
+        while len(self._documentos) > self.limite:
+            _, antigo = self._documentos.popitem(last=False)
+            antigo.fechar()
+
+        return documento
+
+    def fechar(self, caminho):
+        documento = self._documentos.pop(os.path.normpath(caminho), None)
+        if documento is not None:
+            documento.fechar()
+
+    def fechar_fora_de(self, pasta):
+        """Fecha os documentos que não estão dentro da pasta"""
+        pasta = os.path.normcase(os.path.normpath(pasta))
+        for caminho in list(self._documentos):
+            if os.path.normcase(os.path.dirname(caminho)) != pasta:
+                self.fechar(caminho)
+
+    def fechar_todos(self):
+        """Descarta todos os documentos (libera a memória do texto decodificado)"""
+        for documento in self._documentos.values():
+            documento.fechar()
+        self._documentos.clear()
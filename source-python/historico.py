@@ -0,0 +1,564 @@
+"""
+Histórico de cópias em SQLite
+
+Cada pasta raiz tem um historico.db com duas tabelas: copias (um evento
+por cópia: roteiro, seção, quando e de qual máquina) e secoes_copiadas
+(primeira/última cópia e contador de cada (roteiro, seção)). A chave é o
+par de ids de identidade.py (inteiros da pasta do roteiro, relativa à
+raiz, e do título da seção normalizados), então "Capítulo 1 - Início" e
+"CAPITULO 1: INICIO" são a mesma seção, e cada consulta é um acesso a
+dicionário pela chave. Versões anteriores usavam o nome do roteiro no
+lugar da pasta: adotar_legado() passa esse histórico para a pasta na
+primeira vez que o roteiro é aberto.
+
+Cada seção copiada guarda também a impressão digital do texto e o
+arquivo de onde foi copiada. Ao abrir um arquivo, associar() procura, para
+as seções sem histórico, um registro órfão do mesmo arquivo (título
+corrigido, texto um pouco mudado) e passa o histórico para o id novo.
+
+As cópias não esperam o disco: registrar() atualiza as seções do roteiro
+em memória (lidas do banco na primeira consulta) e põe a cópia na fila de
+uma thread, que grava num lote só as cópias chegadas até JANELA_GRAVACAO
+sem novidade (ou ESPERA_MAXIMA desde a primeira). Cada lote é uma
+transação (eventos + contador = contador + 1): entra inteiro ou não
+entra, e dois apps abertos na mesma raiz não apagam as cópias um do
+outro. Um lote que falha (banco ocupado, compartilhamento fora do ar)
+volta para a fila e é tentado de novo com espera dobrando até
+ESPERA_MAXIMA_ERRO. descarregar() espera a fila ser gravada; salvar(),
+resumo(), limpar() e fechar() esperam no máximo TEMPO_DESCARREGAR, e o
+que ficar para trás aparece em nao_gravadas() e erro.
+
+Em disco local o banco usa WAL; numa pasta de rede (onde o WAL não
+funciona entre máquinas) usa o journal tradicional, com as travas de
+arquivo do compartilhamento. Quem encontra o banco ocupado espera até
+TEMPO_ESPERA.
+
+Na primeira abertura são importados o historico.json da raiz (com o
+historico.jsonl das versões anteriores) e o historico_copias.json antigo,
+da pasta do app. Os arquivos antigos ficam onde estão; a tabela migracoes
+registra o que já foi importado.
+"""
+
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from identidade import codificar_impressao, decodificar_impressao, id_pasta, id_titulo, reassociar
+from registro import obter_logger
+from sistema_arquivos import em_rede
+
+
+NOME_ARQUIVO_HISTORICO = "historico.db"
+
+# Formatos anteriores, importados na primeira abertura
+NOME_ARQUIVO_HISTORICO_JSON = "historico.json"  # Na raiz (+ historico.jsonl)
+NOME_ARQUIVO_JOURNAL = "historico.jsonl"
+NOME_ARQUIVO_HISTORICO_LEGADO = "historico_copias.json"  # Na pasta do app, de todas as raízes
+
+# Versão do esquema do banco (PRAGMA user_version); 0 = chaves por texto
+VERSAO_BANCO = 1
+
+# Segundos esperando outro app liberar o banco
+TEMPO_ESPERA = 10
+
+# Gravação em lote: segundos sem cópia nova antes de gravar, e espera
+# máxima desde a primeira cópia do lote (cópias seguidas sem parar)
+JANELA_GRAVACAO = 0.5
+ESPERA_MAXIMA = 3.0
+
+# Lote que falhou: espera antes de tentar de novo (dobra a cada falha, até o máximo)
+ESPERA_MAXIMA_ERRO = 60.0
+
+# Segundos que salvar/resumo/limpar/fechar esperam a fila ser gravada
+TEMPO_DESCARREGAR = TEMPO_ESPERA + 5
+
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+log = obter_logger("historico")
+
+
+def ler_historico_json(caminho, journal=None):
+    """Histórico {roteiro: {seção: info}} de um arquivo JSON, mais o journal (historico.jsonl) se dado"""
+    copias = {}
+    sequencia_snapshot = 0
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            copias = json.load(f)
+        sequencia_snapshot = copias.pop("__journal_seq__", 0)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, AttributeError) as e:
+        log.error("Erro ao ler %s: %s", caminho, e)
+        copias = {}
+
+    for arquivo in ((journal + ".antigo", journal) if journal else ()):
+        try:
+            with open(arquivo, 'rb') as f:
+                linhas = f.read().splitlines()
+        except OSError:
+            continue
+        for linha in linhas:
+            try:
+                registro = json.loads(linha)
+                if registro['seq'] <= sequencia_snapshot:
+                    continue
+            except (ValueError, KeyError, TypeError):
+                continue  # Linha incompleta ou inválida
+            if registro.get('op') == 'copia':
+                info = copias.setdefault(registro['roteiro'], {}).get(registro['secao'])
+                if info:
+                    info['contador'] += 1
+                    info['ultima_copia'] = registro['em']
+                else:
+                    copias[registro['roteiro']][registro['secao']] = {
+                        'primeira_copia': registro['em'], 'ultima_copia': registro['em'], 'contador': 1
+                    }
+            elif registro.get('op') == 'limpar':
+                if 'roteiro' in registro:
+                    copias.pop(registro['roteiro'], None)
+                else:
+                    copias.clear()
+    return copias
+
+
+class HistoricoCopias:
+    """Histórico de cópias de uma pasta raiz (historico.db)
+
+    legados são historico_copias.json antigos a importar. O arquivo antigo
+    tinha todas as raízes juntas e é importado inteiro: os roteiros de
+    outras raízes ficam no banco sem atrapalhar (só entram no resumo).
+    Filtrar pela lista de roteiros perderia os que a busca ainda não
+    tivesse encontrado, e a importação só acontece uma vez.
+    """
+
+    def __init__(self, caminho_db, legados=()):
+        self.caminho_db = caminho_db
+        self.maquina = socket.gethostname()
+        self.wal = not em_rede(caminho_db)
+        self.trava = threading.RLock()  # Conexão da interface e seções em memória
+        self.conexao = self._conectar()
+        self._secoes = {}  # {id roteiro: {id seção: info}} já lidos do banco, com as mudanças ainda na fila
+
+        # Fila da thread de gravação
+        self._condicao = threading.Condition()
+        self._fila = []  # ('copia' | 'reassociar', id roteiro, ...)
+        self._nao_gravadas = Counter()  # {id roteiro: mudanças na fila ou sendo gravadas}
+        self._primeira = self._ultima = 0.0  # Chegada da primeira/última mudança da fila (monotonic)
+        self._urgente = False  # descarregar(): grava sem esperar a janela
+        self._fechando = False
+        self._falhas = 0  # Lotes seguidos que falharam
+        self._proxima_tentativa = 0.0  # Depois de uma falha, não grava antes disso (monotonic)
+        self.erro = None  # Mensagem da última falha de gravação (None depois de um lote gravado)
+
+        with self._transacao(self.conexao):
+            # Dentro da transação: dois apps abrindo juntos não atualizam o esquema duas vezes
+            versao = self.conexao.execute("PRAGMA user_version").fetchone()[0]
+            if versao < VERSAO_BANCO:
+                self._criar_tabelas()
+
+        pasta = os.path.dirname(caminho_db)
+        self._migrar(os.path.join(pasta, NOME_ARQUIVO_HISTORICO_JSON), journal=os.path.join(pasta, NOME_ARQUIVO_JOURNAL))
+        for legado in legados:
+            self._migrar(legado)
+
+        self._gravador = threading.Thread(target=self._gravar_em_fundo, name="historico", daemon=True)
+        self._gravador.start()
+
+    def _conectar(self):
+        conexao = sqlite3.connect(self.caminho_db, timeout=TEMPO_ESPERA, check_same_thread=False,
+                                  isolation_level=None)
+        if self.wal:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+        else:
+            conexao.execute("PRAGMA journal_mode=DELETE")
+        return conexao
+
+    @contextlib.contextmanager
+    def _transacao(self, conexao):
+        """Transação que já trava o banco para escrita (BEGIN IMMEDIATE)"""
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+        conexao.execute("COMMIT")
+
+    def _criar_tabelas(self):
+        """Cria o esquema atual; um banco da versão 0 (chaves por texto) é convertido"""
+        conexao = self.conexao
+        antigo = conexao.execute("SELECT 1 FROM sqlite_master WHERE name = 'secoes_copiadas'").fetchone()
+        if antigo:
+            conexao.execute("ALTER TABLE secoes_copiadas RENAME TO secoes_copiadas_v0")
+            conexao.execute("ALTER TABLE copias ADD COLUMN roteiro_id INTEGER")
+            conexao.execute("ALTER TABLE copias ADD COLUMN secao_id INTEGER")
+
+        conexao.execute("""
+            CREATE TABLE IF NOT EXISTS copias (
+                id INTEGER PRIMARY KEY,
+                roteiro TEXT NOT NULL,
+                secao TEXT NOT NULL,
+                em TEXT NOT NULL,
+                maquina TEXT NOT NULL,
+                roteiro_id INTEGER,
+                secao_id INTEGER
+            )
+        """)
+        conexao.execute("CREATE INDEX IF NOT EXISTS copias_secao ON copias (roteiro_id, secao_id)")
+        conexao.execute("""
+            CREATE TABLE secoes_copiadas (
+                roteiro_id INTEGER NOT NULL,
+                secao_id INTEGER NOT NULL,
+                roteiro TEXT NOT NULL,
+                secao TEXT NOT NULL,
+                arquivo TEXT,
+                impressao TEXT,
+                primeira_copia TEXT NOT NULL,
+                ultima_copia TEXT NOT NULL,
+                contador INTEGER NOT NULL,
+                PRIMARY KEY (roteiro_id, secao_id)
+            ) WITHOUT ROWID
+        """)
+        conexao.execute("CREATE TABLE IF NOT EXISTS migracoes (arquivo TEXT PRIMARY KEY, em TEXT NOT NULL)")
+
+        if antigo:
+            # Títulos que só diferiam em maiúsculas/acentos/pontuação viram uma seção só
+            conexao.create_function("id_titulo", 1, id_titulo, deterministic=True)
+            conexao.execute("""
+                INSERT INTO secoes_copiadas (roteiro_id, secao_id, roteiro, secao,
+                                             primeira_copia, ultima_copia, contador)
+                SELECT id_titulo(roteiro), id_titulo(secao), roteiro, secao,
+                       min(primeira_copia), max(ultima_copia), sum(contador)
+                FROM secoes_copiadas_v0 GROUP BY 1, 2
+            """)
+            conexao.execute("UPDATE copias SET roteiro_id = id_titulo(roteiro), secao_id = id_titulo(secao)")
+            conexao.execute("DROP TABLE secoes_copiadas_v0")
+            log.info("Histórico convertido para ids de seção: %s", self.caminho_db)
+        conexao.execute(f"PRAGMA user_version = {VERSAO_BANCO}")
+
+    def _migrar(self, caminho, journal=None):
+        """Importa um histórico JSON antigo (uma vez por arquivo)"""
+        if not os.path.exists(caminho):
+            return
+        chave = os.path.normcase(os.path.abspath(caminho))
+        with self._transacao(self.conexao):
+            # Dentro da transação: outro app abrindo junto não importa de novo
+            if self.conexao.execute("SELECT 1 FROM migracoes WHERE arquivo = ?", (chave,)).fetchone():
+                return
+            copias = ler_historico_json(caminho, journal)
+            linhas = [
+                (id_titulo(roteiro), id_titulo(secao), roteiro, secao,
+                 info['primeira_copia'], info['ultima_copia'], info['contador'])
+                for roteiro, secoes in copias.items()
+                for secao, info in secoes.items()
+            ]
+            self.conexao.executemany("""
+                INSERT INTO secoes_copiadas (roteiro_id, secao_id, roteiro, secao,
+                                             primeira_copia, ultima_copia, contador)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (roteiro_id, secao_id) DO UPDATE SET
+                    primeira_copia = min(primeira_copia, excluded.primeira_copia),
+                    ultima_copia = max(ultima_copia, excluded.ultima_copia),
+                    contador = contador + excluded.contador
+            """, linhas)
+            self.conexao.execute("INSERT INTO migracoes (arquivo, em) VALUES (?, ?)",
+                                 (chave, datetime.now().strftime(FORMATO_DATA)))
+        log.info("Histórico importado de %s: %d seções", caminho, len(linhas))
+
+    def _secoes_roteiro(self, id_roteiro):
+        """Seções copiadas do roteiro (lidas do banco na primeira vez)"""
+        with self.trava:
+            secoes = self._secoes.get(id_roteiro)
+            if secoes is None:
+                secoes = self._secoes[id_roteiro] = {
+                    id_secao: {
+                        'primeira_copia': primeira, 'ultima_copia': ultima, 'contador': contador,
+                        'titulo': titulo, 'arquivo': arquivo, 'impressao': decodificar_impressao(impressao)
+                    }
+                    for id_secao, titulo, arquivo, impressao, primeira, ultima, contador in self.conexao.execute(
+                        "SELECT secao_id, secao, arquivo, impressao, primeira_copia, ultima_copia, contador "
+                        "FROM secoes_copiadas WHERE roteiro_id = ?",
+                        (id_roteiro,)
+                    )
+                }
+            return secoes
+
+    def _enfileirar(self, id_roteiro, mudanca):
+        with self._condicao:
+            agora = time.monotonic()
+            if not self._fila:
+                self._primeira = agora
+            self._ultima = agora
+            self._fila.append(mudanca)
+            self._nao_gravadas[id_roteiro] += 1
+            self._condicao.notify_all()
+
+    def registrar(self, roteiro, secao, impressao=None, arquivo=None, quando=None):
+        """Registra uma cópia e retorna o info atualizado da seção (gravada depois, em lote)
+
+        impressao é a impressão digital do texto copiado e arquivo o nome
+        do arquivo de onde veio (usados por associar()).
+        """
+        em = (quando or datetime.now()).strftime(FORMATO_DATA)
+        id_roteiro, id_secao = id_pasta(roteiro), id_titulo(secao)
+        with self.trava:
+            secoes = self._secoes_roteiro(id_roteiro)
+            info = secoes.get(id_secao)
+            if info:
+                info['contador'] += 1
+                info['ultima_copia'] = max(info['ultima_copia'], em)
+            else:
+                info = secoes[id_secao] = {'primeira_copia': em, 'ultima_copia': em, 'contador': 1,
+                                           'impressao': ()}
+            info['titulo'] = secao
+            info['arquivo'] = arquivo or info.get('arquivo')
+            info['impressao'] = impressao or info['impressao']
+
+        self._enfileirar(id_roteiro, ('copia', id_roteiro, id_secao, roteiro, secao, arquivo,
+                                      codificar_impressao(impressao), em))
+        return info
+
+    def associar(self, roteiro, arquivo, secoes):
+        """Passa o histórico de seções renomeadas/editadas para os ids atuais; retorna quantas
+
+        secoes são as Secao do arquivo aberto. Só entram os registros que
+        não batem com nenhuma delas e foram copiados desse arquivo (ou
+        vieram de um histórico antigo, sem arquivo).
+        """
+        id_roteiro = id_pasta(roteiro)
+        with self.trava:
+            registros = self._secoes_roteiro(id_roteiro)
+            if not registros:
+                return 0
+            atuais = {}
+            for secao in secoes:
+                atuais.setdefault(secao.id, secao)
+            orfas = {
+                id_secao: (info['titulo'], info['impressao'])
+                for id_secao, info in registros.items()
+                if id_secao not in atuais and info.get('arquivo') in (None, arquivo)
+            }
+            if not orfas:
+                return 0
+            novas = {
+                id_secao: (secao.titulo, lambda secao=secao: secao.impressao)
+                for id_secao, secao in atuais.items() if id_secao not in registros
+            }
+
+            pares = reassociar(novas, orfas)
+            for id_antigo, id_novo in pares:
+                secao = atuais[id_novo]
+                impressao = secao.impressao
+                info = registros[id_novo] = registros.pop(id_antigo)
+                log.info("Histórico de %r: %r passa a ser %r", roteiro, info['titulo'], secao.titulo)
+                info['titulo'] = secao.titulo
+                info['arquivo'] = arquivo
+                info['impressao'] = impressao or info['impressao']
+                self._enfileirar(id_roteiro, ('reassociar', id_roteiro, id_antigo, id_novo, secao.titulo,
+                                              arquivo, codificar_impressao(impressao)))
+        return len(pares)
+
+    def _gravar_mudancas(self, conexao, lote):
+        for mudanca in lote:
+            if mudanca[0] == 'copia':
+                _, id_roteiro, id_secao, roteiro, secao, arquivo, impressao, em = mudanca
+                conexao.execute(
+                    "INSERT INTO copias (roteiro, secao, em, maquina, roteiro_id, secao_id) VALUES (?, ?, ?, ?, ?, ?)",
+                    (roteiro, secao, em, self.maquina, id_roteiro, id_secao)
+                )
+                conexao.execute("""
+                    INSERT INTO secoes_copiadas (roteiro_id, secao_id, roteiro, secao, arquivo, impressao,
+                                                 primeira_copia, ultima_copia, contador)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
+                    ON CONFLICT (roteiro_id, secao_id) DO UPDATE SET
+                        secao = excluded.secao,
+                        arquivo = coalesce(excluded.arquivo, arquivo),
+                        impressao = coalesce(excluded.impressao, impressao),
+                        ultima_copia = max(ultima_copia, excluded.ultima_copia),
+                        contador = contador + 1
+                """, (id_roteiro, id_secao, roteiro, secao, arquivo, impressao, em, em))
+            else:
+                _, id_roteiro, id_antigo, id_novo, secao, arquivo, impressao = mudanca
+                # Se outro app já criou o id novo, os dois registros são somados
+                conexao.execute("""
+                    INSERT INTO secoes_copiadas (roteiro_id, secao_id, roteiro, secao, arquivo, impressao,
+                                                 primeira_copia, ultima_copia, contador)
+                    SELECT roteiro_id, ?, roteiro, ?, ?, coalesce(?, impressao),
+                           primeira_copia, ultima_copia, contador
+                    FROM secoes_copiadas WHERE roteiro_id = ? AND secao_id = ?
+                    ON CONFLICT (roteiro_id, secao_id) DO UPDATE SET
+                        primeira_copia = min(primeira_copia, excluded.primeira_copia),
+                        ultima_copia = max(ultima_copia, excluded.ultima_copia),
+                        contador = contador + excluded.contador
+                """, (id_novo, secao, arquivo, impressao, id_roteiro, id_antigo))
+                conexao.execute("DELETE FROM secoes_copiadas WHERE roteiro_id = ? AND secao_id = ?",
+                                (id_roteiro, id_antigo))
+                conexao.execute("UPDATE copias SET secao_id = ? WHERE roteiro_id = ? AND secao_id = ?",
+                                (id_novo, id_roteiro, id_antigo))
+
+    def _gravar_em_fundo(self):
+        conexao = self._conectar()
+        while True:
+            with self._condicao:
+                while not self._fila and not self._fechando:
+                    self._condicao.wait()
+                if not self._fila:
+                    break
+                # Espera as cópias pararem de chegar (ou alguém pedir a gravação)
+                while not (self._urgente or self._fechando):
+                    espera = max(min(self._ultima + JANELA_GRAVACAO, self._primeira + ESPERA_MAXIMA),
+                                 self._proxima_tentativa) - time.monotonic()
+                    if espera <= 0:
+                        break
+                    self._condicao.wait(espera)
+                lote, self._fila = self._fila, []
+
+            try:
+                with self._transacao(conexao):
+                    self._gravar_mudancas(conexao, lote)
+            except sqlite3.Error as e:
+                log.error("Erro ao gravar %d mudança(s) em %s: %s", len(lote), self.caminho_db, e)
+                with self._condicao:
+                    self.erro = str(e)
+                    if self._fechando:
+                        # Continuam contadas em nao_gravadas(), para fechar() avisar
+                        log.error("App fechando: %d mudança(s) não gravada(s)", len(lote))
+                        continue
+                    # Banco ocupado ou compartilhamento fora do ar: tenta de novo mais tarde
+                    self._fila[:0] = lote
+                    self._falhas += 1
+                    espera = min(JANELA_GRAVACAO * 2 ** self._falhas, ESPERA_MAXIMA_ERRO)
+                    self._proxima_tentativa = time.monotonic() + espera
+                    self._urgente = False  # Um descarregar() novo tenta já, sem esperar
+                    log.warning("Nova tentativa de gravar o histórico em %.1f s", espera)
+                    continue
+            else:
+                log.debug("%d mudança(s) gravada(s) em %s", len(lote), self.caminho_db)
+            with self._condicao:
+                self._falhas = 0
+                self._proxima_tentativa = 0.0
+                self.erro = None
+                self._nao_gravadas.subtract(mudanca[1] for mudanca in lote)
+                self._nao_gravadas = +self._nao_gravadas  # Descarta os zerados
+                if not self._fila:
+                    self._urgente = False
+                self._condicao.notify_all()
+        conexao.close()
+
+    def descarregar(self, tempo_limite=None):
+        """Grava já as mudanças na fila e espera terminar; False se passou do tempo_limite"""
+        with self._condicao:
+            self._urgente = True
+            self._proxima_tentativa = 0.0
+            self._condicao.notify_all()
+            return self._condicao.wait_for(lambda: not self._nao_gravadas, tempo_limite)
+
+    def nao_gravadas(self):
+        """Mudanças ainda na fila (ou que não puderam ser gravadas ao fechar)"""
+        with self._condicao:
+            return sum(self._nao_gravadas.values())
+
+    def recarregar(self):
+        """Esquece as seções em memória (relidas do banco, com as cópias de outros apps)"""
+        with self._condicao:
+            pendentes = set(self._nao_gravadas)
+        with self.trava:
+            for id_roteiro in list(self._secoes):
+                if id_roteiro not in pendentes:
+                    del self._secoes[id_roteiro]
+
+    def info(self, roteiro, secao):
+        """{primeira_copia, ultima_copia, contador, ...} da seção, ou None se nunca foi copiada"""
+        return self._secoes_roteiro(id_pasta(roteiro)).get(id_titulo(secao))
+
+    def tem_roteiro(self, roteiro):
+        return bool(self._secoes_roteiro(id_pasta(roteiro)))
+
+    def adotar_legado(self, roteiro, nome):
+        """Passa para a chave roteiro (pasta) o histórico gravado pelo nome; True se passou algo
+
+        Só quando a pasta ainda não tem histórico (nem cópias na fila) e o
+        nome tem: dois roteiros com o mesmo nome ficam com o histórico
+        antigo só no primeiro aberto, como era antes.
+        """
+        id_roteiro, id_nome = id_pasta(roteiro), id_titulo(nome)
+        if id_roteiro == id_nome:
+            return False  # Pasta na raiz com o mesmo nome: já é a mesma chave
+        with self._condicao:
+            if id_nome in self._nao_gravadas:
+                return False
+        with self.trava:
+            if self._secoes_roteiro(id_roteiro) or not self._secoes_roteiro(id_nome):
+                return False
+            with self._transacao(self.conexao):
+                # Dentro da transação: outro app pode ter gravado na pasta ou adotado antes
+                if self.conexao.execute("SELECT 1 FROM secoes_copiadas WHERE roteiro_id = ?",
+                                        (id_roteiro,)).fetchone():
+                    return False
+                movidas = self.conexao.execute(
+                    "UPDATE secoes_copiadas SET roteiro_id = ?, roteiro = ? WHERE roteiro_id = ?",
+                    (id_roteiro, roteiro, id_nome)
+                ).rowcount
+                self.conexao.execute("UPDATE copias SET roteiro_id = ?, roteiro = ? WHERE roteiro_id = ?",
+                                     (id_roteiro, roteiro, id_nome))
+            self._secoes.pop(id_roteiro, None)
+            self._secoes.pop(id_nome, None)
+        log.info("Histórico de %r passado para a pasta %r: %d seções", nome, roteiro, movidas)
+        return movidas > 0
+
+    def resumo(self):
+        """(roteiros, seções) com alguma cópia (sem as que ainda não foram gravadas)"""
+        self.descarregar(TEMPO_DESCARREGAR)
+        with self.trava:
+            return self.conexao.execute(
+                "SELECT count(DISTINCT roteiro_id), count(*) FROM secoes_copiadas"
+            ).fetchone()
+
+    def limpar(self, roteiro=None):
+        """Apaga o histórico de um roteiro (ou de todos), depois de gravar a fila
+
+        Se a fila não for gravada a tempo, nada é apagado (sqlite3.OperationalError):
+        as cópias ainda na fila voltariam depois.
+        """
+        if not self.descarregar(TEMPO_DESCARREGAR):
+            raise sqlite3.OperationalError(
+                f"{self.nao_gravadas()} cópia(s) ainda não gravada(s): {self.erro or 'banco ocupado'}"
+            )
+        with self.trava:
+            with self._transacao(self.conexao):
+                if roteiro is None:
+                    self.conexao.execute("DELETE FROM copias")
+                    self.conexao.execute("DELETE FROM secoes_copiadas")
+                else:
+                    self.conexao.execute("DELETE FROM copias WHERE roteiro_id = ?", (id_pasta(roteiro),))
+                    self.conexao.execute("DELETE FROM secoes_copiadas WHERE roteiro_id = ?", (id_pasta(roteiro),))
+            if roteiro is None:
+                self._secoes.clear()
+            else:
+                self._secoes.pop(id_pasta(roteiro), None)
+
+    def salvar(self):
+        """Grava a fila e passa o WAL para o arquivo principal; False se algo ficou na fila"""
+        gravou = self.descarregar(TEMPO_DESCARREGAR)
+        with self.trava:
+            self.conexao.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return gravou
+
+    def fechar(self, tempo_limite=TEMPO_DESCARREGAR):
+        """Grava a fila (espera até tempo_limite) e fecha o banco; retorna quantas mudanças se perderam"""
+        with self._condicao:
+            self._fechando = True
+            self._condicao.notify_all()
+        self._gravador.join(tempo_limite)
+        if self._gravador.is_alive():
+            log.error("Histórico %s: gravação não terminou em %s s", self.caminho_db, tempo_limite)
+        with self.trava:
+            self.conexao.close()
+        return self.nao_gravadas()
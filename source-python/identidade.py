@@ -0,0 +1,144 @@
+"""
+Identidade estável das seções (e dos roteiros) no histórico de cópias
+
+O id de uma seção é um inteiro de 64 bits derivado do título normalizado
+(sem acentos, maiúsculas, pontuação nem espaços repetidos): "CHAPTER 1 -
+The World" e "Chapter 1: the world" são a mesma seção. O roteiro é a
+pasta relativa à raiz, normalizada parte a parte: "2025/Rot A" e
+"2025_Rot_A" são pastas diferentes.
+
+A impressão digital do conteúdo serve para reencontrar uma seção cujo
+título mudou (ex.: erro de digitação corrigido): um hash deslizante
+(Rabin-Karp) percorre o texto em janelas de PALAVRAS_JANELA palavras e
+ficam os TAMANHO_IMPRESSAO menores valores (bottom-k). Duas impressões
+estimam a fração de trechos em comum (Jaccard), então o texto pode mudar
+um pouco e a seção continua sendo reconhecida.
+"""
+
+import hashlib
+import re
+import unicodedata
+import zlib
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+
+PALAVRAS_JANELA = 4
+TAMANHO_IMPRESSAO = 32
+
+# Limiares para reassociar um registro órfão a uma seção nova
+SEMELHANCA_TITULO = 0.85  # Só o título (registros sem impressão)
+SEMELHANCA_CONTEUDO = 0.8  # Só o conteúdo (título reescrito)
+SEMELHANCA_AMBOS = 0.5  # Título e conteúdo, cada um
+
+_PRIMO = (1 << 61) - 1
+_BASE = 1_000_003
+_RE_NAO_ALFANUMERICO = re.compile(r'[\W_]+')
+_RE_SEPARADOR_PASTA = re.compile(r'[\\/]+')
+
+
+def _normalizar(texto):
+    decomposto = unicodedata.normalize('NFKD', texto)
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return _RE_NAO_ALFANUMERICO.sub(' ', sem_acentos.casefold()).strip()
+
+
+@lru_cache(maxsize=4096)
+def normalizar_titulo(titulo):
+    """Título sem acentos, em minúsculas, só com letras/números separados por um espaço
+
+    Com cache: só para títulos e nomes (textos longos vão direto para _normalizar).
+    """
+    return _normalizar(titulo)
+
+
+def _id(chave):
+    """Inteiro de 64 bits com sinal (cabe no INTEGER do SQLite)"""
+    resumo = hashlib.blake2b(chave.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(resumo, 'big', signed=True)
+
+
+@lru_cache(maxsize=4096)
+def id_titulo(titulo):
+    """Id do título normalizado"""
+    return _id(normalizar_titulo(titulo))
+
+
+@lru_cache(maxsize=4096)
+def id_pasta(pasta):
+    """Id da pasta do roteiro (relativa à raiz, com / ou \\ entre as partes), cada parte normalizada à parte
+
+    Numa pasta só é o id_titulo do nome, a chave das versões que usavam o nome do roteiro.
+    """
+    return _id('/'.join(normalizar_titulo(parte) for parte in _RE_SEPARADOR_PASTA.split(pasta) if parte))
+
+
+def impressao_texto(texto):
+    """Impressão digital do conteúdo: tupla ordenada com os menores hashes das janelas de palavras"""
+    palavras = [zlib.crc32(palavra.encode('utf-8')) for palavra in _normalizar(texto).split()]
+    if not palavras:
+        return ()
+    janela = min(PALAVRAS_JANELA, len(palavras))
+    peso_saida = pow(_BASE, janela - 1, _PRIMO)
+
+    valor = 0
+    for palavra in palavras[:janela]:
+        valor = (valor * _BASE + palavra) % _PRIMO
+    hashes = {valor}
+    for i in range(janela, len(palavras)):
+        valor = ((valor - palavras[i - janela] * peso_saida) * _BASE + palavras[i]) % _PRIMO
+        hashes.add(valor)
+    return tuple(sorted(hashes)[:TAMANHO_IMPRESSAO])
+
+
+def semelhanca_conteudo(a, b):
+    """Fração estimada de trechos em comum entre duas impressões (0 a 1)"""
+    if not a or not b:
+        return 0.0
+    menores = sorted(set(a) | set(b))[:TAMANHO_IMPRESSAO]
+    comuns = set(a) & set(b)
+    return sum(1 for valor in menores if valor in comuns) / len(menores)
+
+
+def semelhanca_titulo(a, b):
+    return SequenceMatcher(None, _normalizar(a), _normalizar(b)).ratio()
+
+
+def codificar_impressao(impressao):
+    """Impressão como texto (coluna do SQLite)"""
+    return ' '.join(format(valor, 'x') for valor in impressao) if impressao else None
+
+
+def decodificar_impressao(texto):
+    return tuple(int(valor, 16) for valor in texto.split()) if texto else ()
+
+
+def reassociar(novas, orfas):
+    """Pares (id órfão, seção nova) que são a mesma seção com título e/ou texto alterados
+
+    novas: {id: (título, função que devolve a impressão)} das seções sem
+    histórico; orfas: {id: (título, impressão)} dos registros que não
+    batem com nenhuma seção atual. Cada órfão fica com no máximo uma
+    seção, a de maior semelhança.
+    """
+    candidatos = []
+    for id_nova, (titulo_nova, obter_impressao) in novas.items():
+        impressao_nova = None
+        for id_orfa, (titulo_orfa, impressao_orfa) in orfas.items():
+            titulo = semelhanca_titulo(titulo_nova, titulo_orfa)
+            if impressao_orfa:
+                if impressao_nova is None:
+                    impressao_nova = obter_impressao() or ()  # Só calcula se houver com quem comparar
+                conteudo = semelhanca_conteudo(impressao_nova, impressao_orfa)
+                if conteudo >= SEMELHANCA_CONTEUDO or (conteudo >= SEMELHANCA_AMBOS and titulo >= SEMELHANCA_AMBOS):
+                    candidatos.append((conteudo + titulo, id_orfa, id_nova))
+            elif titulo >= SEMELHANCA_TITULO:
+                candidatos.append((titulo, id_orfa, id_nova))
+
+    pares = []
+    usados = set()
+    for _, id_orfa, id_nova in sorted(candidatos, reverse=True):
+        if id_orfa not in usados and id_nova not in usados:
+            usados.update((id_orfa, id_nova))
+            pares.append((id_orfa, id_nova))
+    return pares
@@ -0,0 +1,150 @@
+"""
+Motor de legendas .srt
+
+Os cues são guardados em arrays compactos: tempos de início/fim em
+milissegundos e offsets do texto de cada cue dentro de um único buffer
+(o texto do arquivo). Nenhum objeto é criado por cue, então arquivos de
+várias horas, com dezenas de milhares de cues, ocupam poucos bytes por
+cue. Buscas por tempo e por linha são feitas com busca binária.
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+_TEMPO = r'(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})'
+
+# Linha de tempo de um cue: "00:01:02,500 --> 00:01:04,000"
+_RE_TEMPOS = re.compile(rf'^[^\S\n]*{_TEMPO}[^\S\n]*-->[^\S\n]*{_TEMPO}[^\n]*(?:\n|\Z)', re.MULTILINE)
+
+# Texto do cue: linhas não vazias até a linha em branco, a próxima linha de
+# tempo ou o número do próximo cue (arquivos sem linha em branco entre cues)
+_RE_TEXTO = re.compile(
+    rf'(?:(?![^\S\n]*{_TEMPO}[^\S\n]*-->)'
+    rf'(?![^\S\n]*\d+[^\S\n]*\n[^\S\n]*{_TEMPO}[^\S\n]*-->)'
+    rf'[^\S\n]*\S[^\n]*(?:\n|\Z))*'
+)
+
+# Tempo digitado pelo usuário: "1:02:03,500", "02:03", "02:03.5" ou "123" (segundos)
+_RE_TEMPO_USUARIO = re.compile(r'^(?:(?:(\d+):)?(\d+):)?(\d+)(?:[,.](\d{1,3}))?$')
+
+
+def _ms(horas, minutos, segundos, fracao):
+    return ((int(horas) * 60 + int(minutos)) * 60 + int(segundos)) * 1000 + int(fracao.ljust(3, '0'))
+
+
+def formatar_tempo(ms, separador=','):
+    """Milissegundos no formato do .srt (HH:MM:SS,mmm)"""
+    segundos, ms = divmod(ms, 1000)
+    minutos, segundos = divmod(segundos, 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas:02d}:{minutos:02d}:{segundos:02d}{separador}{ms:03d}"
+
+
+def ler_tempo(texto):
+    """Converte um tempo digitado em milissegundos (ValueError se inválido)"""
+    match = _RE_TEMPO_USUARIO.match(texto.strip())
+    if not match:
+        raise ValueError(f"Tempo inválido: {texto!r} (use HH:MM:SS, MM:SS ou segundos)")
+    horas, minutos, segundos, fracao = match.groups()
+    return _ms(horas or 0, minutos or 0, segundos, fracao or '0')
+
+
+class Legendas:
+    """Cues de um arquivo .srt em arrays (tempos em ms e offsets no texto)"""
+
+    def __init__(self, texto):
+        self.buffer = texto
+        self.inicios = array('q')  # Início de cada cue (ms)
+        self.fins = array('q')     # Fim de cada cue (ms)
+        self.linhas = array('q')   # Linha onde começa o texto de cada cue
+        self._texto_inicio = array('q')
+        self._texto_fim = array('q')
+
+        linha, posicao = 0, 0
+        for match in _RE_TEMPOS.finditer(texto):
+            linha += texto.count('\n', posicao, match.start())
+            posicao = match.start()
+
+            bloco = _RE_TEXTO.match(texto, match.end())
+            fim_texto = bloco.end()
+            while fim_texto > bloco.start() and texto[fim_texto - 1] in '\r\n':
+                fim_texto -= 1
+
+            grupos = match.groups()
+            self.inicios.append(_ms(*grupos[:4]))
+            self.fins.append(_ms(*grupos[4:]))
+            self.linhas.append(linha + 1)  # Marcadores de seção ficam no texto
+            self._texto_inicio.append(bloco.start())
+            self._texto_fim.append(fim_texto)
+
+        # Arquivos fora de ordem são raros, mas a busca binária depende dela
+        self._fora_de_ordem = any(self.inicios[i] > self.inicios[i + 1] for i in range(len(self.inicios) - 1))
+        if self._fora_de_ordem:
+            self._ordenar()
+
+        # Maior fim até cada cue: permite achar cues longos que se sobrepõem
+        self._fim_maximo = array('q')
+        maior = -1
+        for fim in self.fins:
+            maior = max(maior, fim)
+            self._fim_maximo.append(maior)
+
+    def _ordenar(self):
+        ordem = sorted(range(len(self.inicios)), key=self.inicios.__getitem__)
+        for nome in ('inicios', 'fins', 'linhas', '_texto_inicio', '_texto_fim'):
+            valores = getattr(self, nome)
+            setattr(self, nome, array('q', (valores[i] for i in ordem)))
+
+    def __len__(self):
+        return len(self.inicios)
+
+    @property
+    def duracao(self):
+        """Fim do último cue (ms)"""
+        return self._fim_maximo[-1] if self._fim_maximo else 0
+
+    def texto(self, indice):
+        """Texto do cue, sem número nem tempos"""
+        return self.buffer[self._texto_inicio[indice]:self._texto_fim[indice]]
+
+    def indice_em(self, ms):
+        """Índice do cue exibido no tempo ms (None se nenhum)"""
+        i = bisect_right(self.inicios, ms) - 1
+        # Volta só enquanto algum cue anterior ainda pode estar na tela
+        while i >= 0 and self._fim_maximo[i] > ms:
+            if self.fins[i] > ms:
+                return i
+            i -= 1
+        return None
+
+    def entre(self, inicio_ms, fim_ms):
+        """Índices dos cues que aparecem entre inicio_ms e fim_ms"""
+        i = bisect_right(self._fim_maximo, inicio_ms)
+        j = bisect_left(self.inicios, fim_ms)
+        return [k for k in range(i, j) if self.fins[k] > inicio_ms]
+
+    def faixa_linhas(self, linha_inicio, linha_fim):
+        """Cues cujo texto começa entre as linhas (ex.: uma seção detectada)"""
+        if self._fora_de_ordem:
+            # Depois de ordenar por tempo, as linhas deixam de estar em ordem
+            return [k for k in range(len(self.linhas)) if linha_inicio <= self.linhas[k] <= linha_fim]
+        return range(bisect_left(self.linhas, linha_inicio), bisect_right(self.linhas, linha_fim))
+
+    def intervalo(self, indices):
+        """(início, fim) em ms de um conjunto de cues, None se vazio"""
+        if not indices:
+            return None
+        return min(self.inicios[k] for k in indices), max(self.fins[k] for k in indices)
+
+    def texto_cues(self, indices):
+        """Só o texto dos cues, um por linha"""
+        return '\n'.join(self.texto(k) for k in indices)
+
+    def srt_cues(self, indices):
+        """Os cues como um novo .srt, renumerados a partir de 1"""
+        return '\n\n'.join(
+            f"{numero}\n{formatar_tempo(self.inicios[k])} --> {formatar_tempo(self.fins[k])}\n{self.texto(k)}"
+            for numero, k in enumerate(indices, 1)
+        ) + '\n'
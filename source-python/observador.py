@@ -0,0 +1,325 @@
+"""
+Observador da pasta raiz
+
+Roda numa thread e coloca eventos numa fila, que a interface consome com
+root.after. Eventos (tipo, caminho):
+
+    pasta_criada / pasta_removida   subpasta entrou ou saiu da árvore observada
+    pasta_modificada                arquivos criados/apagados/gravados numa subpasta
+    raiz_modificada                 arquivos .txt/.srt soltos na própria raiz mudaram
+    arquivo_modificado              o arquivo vigiado (texto narrado aberto) foi salvo
+
+A árvore observada é a mesma da varredura da biblioteca: subpastas até
+a profundidade máxima, sem as do .scriptcopierignore e sem descer nas
+pastas que têm arquivos de texto (pastas de roteiro).
+
+No Linux usa inotify (via ctypes, sem dependências). Nos outros sistemas
+compara mtimes periodicamente: a raiz, a pasta aberta e o arquivo vigiado
+a cada ciclo, e as demais subpastas em rodízio, para o custo por ciclo
+não crescer com o número de roteiros.
+
+Na raiz só os arquivos de texto importam: os bancos e históricos que o
+próprio app grava ali (biblioteca.db, journals do SQLite) não geram
+eventos, senão cada atualização do índice provocaria outra.
+"""
+
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+
+from sistema_arquivos import (
+    PROFUNDIDADE_PADRAO, ListagemPastas, PercursoPastas, caminho_relativo, carregar_regras_ignorar
+)
+
+
+# Arquivos soltos na raiz que formam o "roteiro virtual"
+EXTENSOES_TEXTO = ('.txt', '.srt')
+
+def criar_observador(raiz, intervalo=1.0, profundidade_maxima=PROFUNDIDADE_PADRAO):
+    """Observador mais eficiente disponível para a raiz"""
+    if sys.platform.startswith('linux'):
+        try:
+            return ObservadorInotify(raiz, profundidade_maxima)
+        except OSError as e:
+            print(f"inotify indisponível ({e}), usando verificação periódica")
+    return ObservadorPeriodico(raiz, intervalo, profundidade_maxima)
+
+
+class _Observador:
+    """Base: thread, fila de eventos, arquivo vigiado e percurso das subpastas"""
+
+    def __init__(self, raiz, profundidade_maxima=PROFUNDIDADE_PADRAO):
+        self.raiz = os.path.normpath(raiz)
+        self.profundidade_maxima = profundidade_maxima
+        self.eventos = queue.Queue()
+        self.arquivo_vigiado = None
+        self._regras = None  # Lidas na thread (a raiz pode estar num compartilhamento lento)
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._executar, name="observador", daemon=True)
+        self._thread.start()
+
+    def vigiar_arquivo(self, caminho):
+        """Passa a avisar quando este arquivo for salvo (None para parar)"""
+        self.arquivo_vigiado = os.path.normpath(caminho) if caminho else None
+
+    def parar(self):
+        self._parar.set()
+
+    def _emitir(self, tipo, caminho):
+        self.eventos.put((tipo, caminho))
+
+    def _percorrer(self, inicio=""):
+        """Gera (caminho, DirEntry, é pasta de roteiro) das subpastas observadas
+
+        inicio (relativo à raiz) limita o percurso ao que está dentro dele.
+        """
+        if self._regras is None:
+            self._regras = carregar_regras_ignorar(self.raiz)
+        pastas = ListagemPastas()
+        percurso = PercursoPastas(self.raiz, pastas, self.profundidade_maxima, self._regras, inicio)
+        for _, entrada in percurso:
+            folha = self._tem_texto(pastas, entrada.path)
+            yield os.path.normpath(entrada.path), entrada, folha
+            if folha:
+                percurso.podar()
+
+    def _ignorada(self, caminho):
+        relativo = caminho_relativo(self.raiz, caminho)
+        return relativo is None or self._regras.ignorar(relativo)
+
+    @staticmethod
+    def _tem_texto(pastas, caminho):
+        try:
+            return bool(pastas.arquivos(caminho, EXTENSOES_TEXTO))
+        except OSError:
+            return False
+
+    def _executar(self):
+        raise NotImplementedError
+
+
+class ObservadorPeriodico(_Observador):
+    """Compara mtimes periodicamente (funciona em qualquer sistema)"""
+
+    POR_CICLO = 256  # Subpastas conferidas por ciclo, em rodízio
+
+    def __init__(self, raiz, intervalo=1.0, profundidade_maxima=PROFUNDIDADE_PADRAO):
+        super().__init__(raiz, profundidade_maxima)
+        self.intervalo = intervalo
+
+    def _executar(self):
+        mtime_raiz = self._mtime(self.raiz)
+        textos = self._textos_raiz()
+        subpastas, folhas = self._arvore()  # {caminho: mtime}, {pastas de roteiro}
+        rodizio = 0
+        arquivo, estado_arquivo = None, None
+
+        while not self._parar.wait(self.intervalo):
+            percorrer = False
+
+            # Raiz: subpastas novas/removidas e arquivos soltos
+            mtime = self._mtime(self.raiz)
+            if mtime != mtime_raiz:
+                mtime_raiz = mtime
+                percorrer = True
+                textos_atuais = self._textos_raiz()
+                if textos_atuais != textos:
+                    textos = textos_atuais
+                    self._emitir('raiz_modificada', self.raiz)
+
+            # Arquivo vigiado: compara mtime e tamanho
+            if self.arquivo_vigiado != arquivo:
+                arquivo, estado_arquivo = self.arquivo_vigiado, self._estado(self.arquivo_vigiado)
+            elif arquivo:
+                estado = self._estado(arquivo)
+                if estado != estado_arquivo:
+                    estado_arquivo = estado
+                    self._emitir('arquivo_modificado', arquivo)
+
+            # Subpastas: a do arquivo vigiado sempre, as outras em rodízio
+            caminhos = list(subpastas)
+            conferir = caminhos[rodizio:rodizio + self.POR_CICLO]
+            rodizio = rodizio + self.POR_CICLO if rodizio + self.POR_CICLO < len(caminhos) else 0
+            if arquivo and os.path.dirname(arquivo) in subpastas:
+                conferir.append(os.path.dirname(arquivo))
+
+            for caminho in conferir:
+                mtime = self._mtime(caminho)
+                if mtime is not None and mtime != subpastas[caminho]:
+                    subpastas[caminho] = mtime
+                    self._emitir('pasta_modificada', caminho)
+                    # Pasta intermediária (ex.: ano/mês): pode ter ganho ou perdido subpastas
+                    percorrer = percorrer or caminho not in folhas
+
+            if percorrer:
+                atuais, folhas = self._arvore()
+                for caminho in atuais.keys() - subpastas.keys():
+                    self._emitir('pasta_criada', caminho)
+                for caminho in subpastas.keys() - atuais.keys():
+                    self._emitir('pasta_removida', caminho)
+                subpastas = {caminho: subpastas.get(caminho, atuais[caminho]) for caminho in atuais}
+
+    def _arvore(self):
+        """Subpastas observadas (com mtime) e quais delas são pastas de roteiro"""
+        subpastas, folhas = {}, set()
+        for caminho, entrada, folha in self._percorrer():
+            try:
+                subpastas[caminho] = entrada.stat().st_mtime_ns
+            except OSError:
+                continue
+            if folha:
+                folhas.add(caminho)
+        return subpastas, folhas
+
+    def _textos_raiz(self):
+        """Arquivos de texto soltos na raiz"""
+        try:
+            with os.scandir(self.raiz) as entradas:
+                return {entrada.name for entrada in entradas
+                        if entrada.name.endswith(EXTENSOES_TEXTO) and not entrada.is_dir()}
+        except OSError:
+            return set()
+
+    @staticmethod
+    def _mtime(caminho):
+        try:
+            return os.stat(caminho).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _estado(caminho):
+        try:
+            info = os.stat(caminho)
+            return info.st_mtime_ns, info.st_size
+        except (OSError, TypeError):
+            return None
+
+
+# Constantes do inotify (linux/inotify.h)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_CLOEXEC = 0o2000000
+_IN_NONBLOCK = 0o4000
+
+_MASCARA = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_ONLYDIR
+_EVENTO = struct.Struct('iIII')
+
+
+class ObservadorInotify(_Observador):
+    """Eventos do kernel (Linux): nenhum custo enquanto nada muda"""
+
+    def __init__(self, raiz, profundidade_maxima=PROFUNDIDADE_PADRAO):
+        super().__init__(raiz, profundidade_maxima)
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+
+        self._pastas = {}  # {wd: caminho}
+        self._watches = {}  # {caminho: wd}
+        self._adicionar(self.raiz)
+
+    def _adicionar(self, caminho):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(caminho), _MASCARA)
+        if wd >= 0:
+            self._pastas[wd] = caminho
+            self._watches[caminho] = wd
+
+    def _adicionar_arvore(self, inicio=""):
+        """Watches nas subpastas observadas (dentro de inicio, relativo à raiz)"""
+        for caminho, _, _ in self._percorrer(inicio):
+            if self._parar.is_set():
+                return
+            self._adicionar(caminho)
+
+    def _remover(self, caminho):
+        """Tira o watch da pasta e das de dentro dela (uma pasta movida continua existindo)"""
+        prefixo = caminho + os.sep
+        for vigiada in [c for c in self._watches if c == caminho or c.startswith(prefixo)]:
+            wd = self._watches.pop(vigiada)
+            self._pastas.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _executar(self):
+        try:
+            # Watches das subpastas aqui, e não no __init__: a árvore pode ser grande
+            self._adicionar_arvore()
+            while not self._parar.is_set():
+                prontos, _, _ = select.select([self._fd], [], [], 0.5)
+                if not prontos:
+                    continue
+                try:
+                    dados = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._interpretar(dados)
+        finally:
+            os.close(self._fd)
+
+    def _interpretar(self, dados):
+        posicao = 0
+        while posicao + _EVENTO.size <= len(dados):
+            wd, mascara, _, tamanho = _EVENTO.unpack_from(dados, posicao)
+            nome = dados[posicao + _EVENTO.size:posicao + _EVENTO.size + tamanho].rstrip(b'\0')
+            posicao += _EVENTO.size + tamanho
+
+            if mascara & _IN_Q_OVERFLOW:
+                # Eventos perdidos: a interface relê a raiz inteira
+                self._emitir('raiz_modificada', self.raiz)
+                continue
+            if mascara & _IN_IGNORED:
+                caminho = self._pastas.pop(wd, None)
+                if caminho is not None and self._watches.get(caminho) == wd:
+                    del self._watches[caminho]
+                continue
+
+            pasta = self._pastas.get(wd)
+            if pasta is None:
+                continue
+            caminho = os.path.join(pasta, os.fsdecode(nome))
+
+            if mascara & _IN_ISDIR and mascara & (_IN_CREATE | _IN_MOVED_TO):
+                # Subpasta nova numa pasta intermediária (não dentro de um roteiro)
+                if pasta == self.raiz or not self._tem_texto(ListagemPastas(), pasta):
+                    if not self._ignorada(caminho):
+                        relativo = caminho_relativo(self.raiz, caminho)
+                        if relativo.count(os.sep) < self.profundidade_maxima:
+                            self._adicionar(caminho)
+                            self._adicionar_arvore(relativo)
+                            self._emitir('pasta_criada', caminho)
+                    continue
+            elif mascara & _IN_ISDIR and mascara & (_IN_DELETE | _IN_MOVED_FROM):
+                # O watch de uma pasta apagada pode já ter saído (IN_IGNORED chega antes)
+                if caminho in self._watches or pasta == self.raiz or not self._tem_texto(ListagemPastas(), pasta):
+                    self._remover(caminho)
+                    self._emitir('pasta_removida', caminho)
+                    continue
+            elif pasta == self.raiz:
+                if caminho.endswith(EXTENSOES_TEXTO):
+                    self._emitir('raiz_modificada', self.raiz)
+                continue
+
+            if pasta == self.raiz:
+                continue
+
+            # Editores salvam no lugar (CLOSE_WRITE) ou por renomeação (MOVED_TO)
+            if caminho == self.arquivo_vigiado and mascara & (_IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE):
+                self._emitir('arquivo_modificado', caminho)
+            self._emitir('pasta_modificada', pasta)
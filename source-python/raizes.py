@@ -0,0 +1,112 @@
+"""
+Pastas raiz registradas (uma por canal)
+
+A lista fica em raizes.json, na pasta de configuração do usuário
+(%APPDATA%\\ScriptCopier no Windows, ~/.scriptcopier nos outros), e é
+lida ao abrir o app. Cada raiz continua com seus próprios arquivos
+(biblioteca.db, historico.db, marcadores.json); aqui só se guarda
+quais pastas fazem parte da biblioteca.
+
+O mesmo arquivo guarda opcionalmente "profundidade_maxima": quantos
+níveis de subpastas (ano/mês/canal/roteiro) a busca percorre, e as
+opções do registro: "log_nivel" (DEBUG, INFO, WARNING, ERROR) e
+"log_arquivo" (true grava também o scriptcopier.log).
+"""
+
+import json
+import os
+
+from registro import NIVEL_PADRAO, NOME_ARQUIVO_LOG, obter_logger
+from sistema_arquivos import PROFUNDIDADE_PADRAO
+
+
+NOME_ARQUIVO_RAIZES = "raizes.json"
+
+log = obter_logger("raizes")
+
+
+def pasta_configuracao():
+    """Pasta de configuração do usuário"""
+    if os.environ.get('APPDATA'):
+        return os.path.join(os.environ['APPDATA'], "ScriptCopier")
+    return os.path.join(os.path.expanduser("~"), ".scriptcopier")
+
+
+def normalizar_raiz(caminho):
+    return os.path.normpath(os.path.abspath(caminho))
+
+
+def mesma_pasta(a, b):
+    """Mesmo diretório, mesmo escrito de outro jeito (maiúsculas, links)"""
+    return os.path.normcase(os.path.realpath(a)) == os.path.normcase(os.path.realpath(b))
+
+
+def adicionar_raiz(raizes, caminho):
+    """Registra uma raiz se ainda não estiver na lista; retorna a raiz (a já registrada, se for a mesma pasta)"""
+    raiz = normalizar_raiz(caminho)
+    for registrada in raizes:
+        if mesma_pasta(registrada, raiz):
+            return registrada
+    raizes.append(raiz)
+    return raiz
+
+
+def nome_canal(raiz, raizes=()):
+    """Nome exibido da raiz: o nome da pasta, com a pasta de cima se houver outra raiz com o mesmo nome"""
+    nome = os.path.basename(raiz) or raiz
+    if any(outra != raiz and os.path.basename(outra) == nome for outra in raizes):
+        return os.path.join(os.path.basename(os.path.dirname(raiz)), nome)
+    return nome
+
+
+def _ler(caminho):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        log.warning("Erro ao ler %s: %s", caminho, e)
+        return {}
+    return dados if isinstance(dados, dict) else {}
+
+
+def carregar_raizes(caminho=None):
+    """Raízes registradas (lista vazia se o arquivo não existir ou estiver inválido)"""
+    dados = _ler(caminho or os.path.join(pasta_configuracao(), NOME_ARQUIVO_RAIZES))
+    raizes = []
+    for raiz in dados.get("raizes", []):
+        if isinstance(raiz, str) and raiz:
+            adicionar_raiz(raizes, raiz)
+    return raizes
+
+
+def carregar_profundidade(caminho=None):
+    """Níveis de subpastas percorridos pela busca (PROFUNDIDADE_PADRAO se não configurado)"""
+    dados = _ler(caminho or os.path.join(pasta_configuracao(), NOME_ARQUIVO_RAIZES))
+    profundidade = dados.get("profundidade_maxima", PROFUNDIDADE_PADRAO)
+    if not isinstance(profundidade, int) or isinstance(profundidade, bool) or profundidade < 1:
+        log.warning("profundidade_maxima inválida (%r), usando %d", profundidade, PROFUNDIDADE_PADRAO)
+        return PROFUNDIDADE_PADRAO
+    return profundidade
+
+
+def carregar_opcoes_registro(caminho=None):
+    """(nível, caminho do arquivo de registro ou None) configurados no raizes.json"""
+    dados = _ler(caminho or os.path.join(pasta_configuracao(), NOME_ARQUIVO_RAIZES))
+    nivel = dados.get("log_nivel", NIVEL_PADRAO)
+    arquivo = os.path.join(pasta_configuracao(), NOME_ARQUIVO_LOG) if dados.get("log_arquivo") is True else None
+    return (nivel if isinstance(nivel, str) else NIVEL_PADRAO), arquivo
+
+
+def salvar_raizes(raizes, caminho=None):
+    """Grava a lista de raízes, mantendo as outras opções do arquivo"""
+    caminho = caminho or os.path.join(pasta_configuracao(), NOME_ARQUIVO_RAIZES)
+    dados = _ler(caminho)
+    dados["raizes"] = raizes
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        log.error("Erro ao salvar %s: %s", caminho, e)
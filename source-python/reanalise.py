@@ -0,0 +1,152 @@
+"""
+Reanálise incremental de roteiros
+
+Guarda hashes de blocos do arquivo (alinhados pelo início e pelo fim)
+da última análise. Ao recarregar, compara os hashes para achar a faixa
+de bytes que mudou e detecta de novo apenas as seções que tocam essa
+faixa. O resultado diz exatamente quais seções entraram, saíram ou
+mudaram, para a interface atualizar só esses botões.
+"""
+
+import hashlib
+import re
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from difflib import SequenceMatcher
+
+from secoes import DETECTOR_ROTEIRO, secoes_em_fluxo
+
+
+TAMANHO_BLOCO = 64 * 1024
+
+# Linhas com a quebra no fim (só '\n' separa linhas, como no arquivo)
+_RE_LINHAS = re.compile(r'[^\n]*\n|[^\n]+')
+
+# secoes: lista nova completa | alteradas: pares (antiga, nova)
+Mudancas = namedtuple('Mudancas', 'secoes adicionadas removidas alteradas')
+
+
+def _hashes_blocos(documento, do_fim=False):
+    """Hash de cada bloco do arquivo, contando a partir do início ou do fim"""
+    tamanho = documento.tamanho
+    hashes = []
+    for i in range(0, tamanho, TAMANHO_BLOCO):
+        if do_fim:
+            inicio, fim = max(0, tamanho - i - TAMANHO_BLOCO), tamanho - i
+        else:
+            inicio, fim = i, min(tamanho, i + TAMANHO_BLOCO)
+        hashes.append(hashlib.blake2b(documento.bytes(inicio, fim), digest_size=8).digest())
+    return hashes
+
+
+def _blocos_iguais(antigos, novos):
+    iguais = 0
+    for antigo, novo in zip(antigos, novos):
+        if antigo != novo:
+            break
+        iguais += 1
+    return iguais
+
+
+class AnaliseIncremental:
+    """Mantém o estado da última análise de um arquivo para reanalisar só o que mudou"""
+
+    def __init__(self, detector=None):
+        self.detector = detector or DETECTOR_ROTEIRO
+        self.secoes = []
+        self.tamanho = 0
+        self.total_linhas = 0
+        self._inicios = []  # Offset em bytes do título de cada seção
+        self._hashes_inicio = []
+        self._hashes_fim = []
+
+    def registrar(self, documento, secoes):
+        """Guarda o estado de uma análise completa feita em outro lugar (ex.: em fluxo)"""
+        self.secoes = list(secoes)
+        self.tamanho = documento.tamanho
+        self.total_linhas = documento.total_linhas
+        self._inicios = [documento.inicios_linhas[secao.linha_inicio] for secao in self.secoes]
+        self._hashes_inicio = _hashes_blocos(documento)
+        self._hashes_fim = _hashes_blocos(documento, do_fim=True)
+
+    def analisar(self, documento):
+        """Análise completa do documento"""
+        self.registrar(documento, secoes_em_fluxo(documento.linhas(), self.detector))
+        return self.secoes
+
+    def reanalisar(self, documento):
+        """Reanalisa só a faixa alterada e retorna as Mudancas (None = nada mudou)"""
+        hashes_inicio = _hashes_blocos(documento)
+        hashes_fim = _hashes_blocos(documento, do_fim=True)
+
+        if documento.tamanho == self.tamanho and hashes_inicio == self._hashes_inicio:
+            return None
+
+        # Faixa alterada: [a, b_antigo) no arquivo antigo, [a, b_novo) no novo
+        prefixo = _blocos_iguais(self._hashes_inicio, hashes_inicio) * TAMANHO_BLOCO
+        sufixo = _blocos_iguais(self._hashes_fim, hashes_fim) * TAMANHO_BLOCO
+        sufixo = min(sufixo, self.tamanho, documento.tamanho)
+        delta = documento.tamanho - self.tamanho
+        b_antigo = self.tamanho - sufixo
+        a = min(prefixo, b_antigo, documento.tamanho - sufixo)
+
+        # Seções afetadas: de i0 (a anterior à primeira que termina em a ou
+        # depois, pois apagar um título aumenta a seção anterior) até antes
+        # de j (primeira cujo título começa depois da faixa)
+        fins = self._inicios[1:] + [self.tamanho]
+        i0 = max(0, bisect_left(fins, a) - 1)
+        j = max(i0, bisect_right(self._inicios, b_antigo))
+
+        # Janela a reanalisar no arquivo novo, alinhada no início de linha
+        inicio = a if i0 == j else min(a, self._inicios[i0])
+        linha_inicio = bisect_right(documento.inicios_linhas, inicio) - 1
+        inicio = documento.inicios_linhas[linha_inicio]
+        fim = self._inicios[j] + delta if j < len(self.secoes) else documento.tamanho
+
+        janela = documento.decodificar(inicio, fim)
+        novas = list(secoes_em_fluxo(_RE_LINHAS.findall(janela), self.detector))
+
+        # As seções seguintes não mudaram: só deslocam as linhas
+        delta_linhas = documento.total_linhas - self.total_linhas
+        seguintes = self.secoes[j:]
+        for secao in seguintes:
+            secao.linha_inicio += delta_linhas
+            secao.linha_fim += delta_linhas
+
+        for secao in novas:
+            secao.linha_inicio += linha_inicio
+            secao.linha_fim += linha_inicio
+        if novas and seguintes:
+            novas[-1].linha_fim = seguintes[0].linha_inicio - 1
+
+        # Compara as seções afetadas antigas com as novas pelo título
+        antigas = self.secoes[i0:j]
+        adicionadas, removidas, alteradas = [], [], []
+        resultado = []
+        comparacao = SequenceMatcher(None, [s.titulo for s in antigas], [s.titulo for s in novas], autojunk=False)
+        for operacao, a1, a2, n1, n2 in comparacao.get_opcodes():
+            if operacao == 'equal':
+                for antiga, nova in zip(antigas[a1:a2], novas[n1:n2]):
+                    if antiga.texto == nova.texto:
+                        # Mantém o mesmo objeto (e o mesmo botão)
+                        antiga.linha_inicio, antiga.linha_fim = nova.linha_inicio, nova.linha_fim
+                        resultado.append(antiga)
+                    else:
+                        alteradas.append((antiga, nova))
+                        resultado.append(nova)
+            else:
+                removidas.extend(antigas[a1:a2])
+                adicionadas.extend(novas[n1:n2])
+                resultado.extend(novas[n1:n2])
+
+        secoes = self.secoes[:i0] + resultado + seguintes
+
+        # Atualiza o estado para a próxima reanálise
+        self.secoes = secoes
+        self.tamanho = documento.tamanho
+        self.total_linhas = documento.total_linhas
+        self._inicios = [documento.inicios_linhas[secao.linha_inicio] for secao in secoes]
+        self._hashes_inicio = hashes_inicio
+        self._hashes_fim = hashes_fim
+
+        return Mudancas(secoes, adicionadas, removidas, alteradas)
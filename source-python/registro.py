@@ -0,0 +1,111 @@
+"""
+Registro (log) do app, com níveis
+
+Usa o logging da biblioteca padrão com o logger "scriptcopier" (cada
+módulo usa um filho: obter_logger("historico") -> "scriptcopier.historico").
+Os argumentos vão separados da mensagem (log.debug("Cópia: %s", secao)):
+abaixo do nível configurado a chamada só compara o nível, sem montar
+texto nenhum. O padrão é WARNING, então o caminho da cópia não gasta nada
+com as mensagens de depuração.
+
+As últimas CAPACIDADE_MEMORIA mensagens ficam em memória (janela
+"📜 Registro" da Ajuda) e vão para o console. Com "log_arquivo": true no
+raizes.json também vão para scriptcopier.log, na pasta de configuração,
+trocado ao passar de TAMANHO_ARQUIVO (guarda ARQUIVOS_ANTIGOS anteriores).
+"""
+
+import logging
+import logging.handlers
+import os
+import sys
+from collections import deque
+
+
+NOME_LOGGER = "scriptcopier"
+NOME_ARQUIVO_LOG = "scriptcopier.log"
+
+NIVEIS = ("DEBUG", "INFO", "WARNING", "ERROR")
+NIVEL_PADRAO = "WARNING"
+
+CAPACIDADE_MEMORIA = 2000  # Mensagens guardadas para a janela de registro
+TAMANHO_ARQUIVO = 1024 * 1024
+ARQUIVOS_ANTIGOS = 3
+
+FORMATO = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+
+def obter_logger(nome):
+    """Logger de um módulo, filho do logger do app"""
+    return logging.getLogger(f"{NOME_LOGGER}.{nome}")
+
+
+class RegistroMemoria(logging.Handler):
+    """Guarda as últimas mensagens (os registros, formatados só ao exibir)"""
+
+    def __init__(self, capacidade=CAPACIDADE_MEMORIA):
+        super().__init__()
+        self.registros = deque(maxlen=capacidade)
+        self.setFormatter(logging.Formatter(FORMATO))
+
+    def emit(self, registro):
+        self.registros.append(registro)
+
+    def linhas(self):
+        return [self.format(registro) for registro in list(self.registros)]
+
+    def limpar(self):
+        self.registros.clear()
+
+
+_memoria = None
+
+
+def configurar_registro(nivel=NIVEL_PADRAO, caminho_arquivo=None):
+    """Liga o registro do app (memória + console, e o arquivo se caminho_arquivo for dado)"""
+    global _memoria
+    logger = logging.getLogger(NOME_LOGGER)
+    logger.propagate = False
+    definir_nivel(nivel)
+    if _memoria is not None:
+        return _memoria
+
+    _memoria = RegistroMemoria()
+    logger.addHandler(_memoria)
+
+    # Sem console no executável (pythonw / PyInstaller --windowed)
+    if sys.stderr is not None:
+        console = logging.StreamHandler(sys.stderr)
+        console.setFormatter(logging.Formatter(FORMATO))
+        logger.addHandler(console)
+
+    if caminho_arquivo:
+        try:
+            os.makedirs(os.path.dirname(caminho_arquivo), exist_ok=True)
+            arquivo = logging.handlers.RotatingFileHandler(
+                caminho_arquivo, maxBytes=TAMANHO_ARQUIVO, backupCount=ARQUIVOS_ANTIGOS,
+                encoding='utf-8', delay=True
+            )
+            arquivo.setFormatter(logging.Formatter(FORMATO))
+            logger.addHandler(arquivo)
+        except OSError as e:
+            logger.error("Arquivo de registro indisponível (%s): %s", caminho_arquivo, e)
+    return _memoria
+
+
+def definir_nivel(nivel):
+    """Muda o nível do registro (nome como "DEBUG" ou número do logging)"""
+    if isinstance(nivel, str):
+        nivel = nivel.upper()
+        if nivel not in NIVEIS:
+            logging.getLogger(NOME_LOGGER).warning("Nível de registro inválido (%r), usando %s", nivel, NIVEL_PADRAO)
+            nivel = NIVEL_PADRAO
+    logging.getLogger(NOME_LOGGER).setLevel(nivel)
+
+
+def nivel_atual():
+    return logging.getLevelName(logging.getLogger(NOME_LOGGER).level)
+
+
+def registro_memoria():
+    """Mensagens guardadas em memória (None se o registro não foi configurado)"""
+    return _memoria
@@ -0,0 +1,193 @@
+"""
+Linha de comando do Script Copier (sem interface gráfica)
+
+Varre as pastas raiz com o mesmo índice do app (biblioteca.db em cada
+raiz) e escreve um roteiro por linha em JSON (JSONL), conforme as pastas
+vão sendo conferidas, e no fim uma linha de resumo. Não importa tkinter:
+roda em servidores sem tela e em tarefas agendadas.
+
+Uso:
+    python scriptcopier_cli.py scan                      # raízes registradas no app
+    python scriptcopier_cli.py scan D:\\Canal1 D:\\Canal2
+    python scriptcopier_cli.py scan --changed-since 2024-06-01
+    python scriptcopier_cli.py scan --secoes --formato json > biblioteca.json
+
+Cada linha de roteiro:
+    {"tipo": "roteiro", "canal": ..., "raiz": ..., "pasta": "2024/03/ROT_A",
+     "nome": ..., "arquivo_texto": ..., "postado": false, "secoes": 12,
+     "palavras": 5400, "alterado_em": "2024-03-02T14:10:05"}
+
+Códigos de saída: 0 = ok, 1 = alguma raiz não pôde ser varrida,
+2 = argumentos inválidos.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from biblioteca import BibliotecaRoteiros, NOME_ARQUIVO_BIBLIOTECA
+from raizes import carregar_profundidade, carregar_raizes, nome_canal, normalizar_raiz
+from secoes import carregar_marcadores
+from sistema_arquivos import ListagemPastas, PercursoPastas, caminho_relativo, carregar_regras_ignorar
+
+
+def ler_data(texto):
+    """Data ISO (2024-06-01, 2024-06-01T08:00) ou segundos desde 1970 -> mtime em ns"""
+    try:
+        return int(float(texto) * 1_000_000_000)
+    except ValueError:
+        pass
+    try:
+        return int(datetime.fromisoformat(texto).timestamp() * 1_000_000_000)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: {texto!r} (use 2024-06-01, 2024-06-01T08:00 ou segundos)")
+
+
+def registro_roteiro(roteiro, raiz, raizes, detector=None):
+    """Linha JSON de um Roteiro do índice (com os títulos das seções se detector for dado)"""
+    registro = {
+        "tipo": "roteiro",
+        "canal": nome_canal(raiz, raizes),
+        "raiz": raiz,
+        "pasta": caminho_relativo(raiz, roteiro.pasta).replace(os.sep, '/'),
+        "nome": roteiro.nome,
+        "arquivo_texto": roteiro.arquivo_texto,
+        "postado": roteiro.postado,
+        "secoes": roteiro.secoes,
+        "palavras": roteiro.palavras,
+        "alterado_em": (datetime.fromtimestamp(roteiro.alterado / 1_000_000_000).isoformat(timespec='seconds')
+                        if roteiro.alterado else None),
+    }
+    if detector is not None:
+        try:
+            with open(roteiro.arquivo_texto, 'r', encoding='utf-8', errors='replace') as f:
+                texto = f.read()
+            registro["lista_secoes"] = [
+                {"tipo": secao.tipo, "titulo": secao.titulo, "palavras": secao.palavras}
+                for secao in detector.secoes(texto)
+            ]
+        except OSError as e:
+            registro["lista_secoes"] = None
+            print(f"Erro ao ler {roteiro.arquivo_texto}: {e}", file=sys.stderr)
+    return registro
+
+
+def varrer(args, saida):
+    """Varre as raízes e escreve os registros; retorna o código de saída"""
+    raizes = [normalizar_raiz(raiz) for raiz in args.raizes] or carregar_raizes()
+    if not raizes:
+        print("Nenhuma pasta raiz: informe as pastas ou registre-as no app.", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    documento = []  # Registros, só com --formato json
+    codigo = 0
+    total = postados = visitadas = ignoradas = 0
+    pastas = ListagemPastas()
+
+    def escrever(registro):
+        if args.formato == 'json':
+            documento.append(registro)
+        else:
+            saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    for raiz in raizes:
+        if not os.path.isdir(raiz):
+            print(f"Pasta não encontrada: {raiz}", file=sys.stderr)
+            codigo = 1
+            continue
+
+        marcadores = carregar_marcadores(raiz)
+        percurso = PercursoPastas(raiz, pastas, args.profundidade, carregar_regras_ignorar(raiz))
+        try:
+            biblioteca = BibliotecaRoteiros(os.path.join(raiz, NOME_ARQUIVO_BIBLIOTECA))
+        except Exception as e:
+            print(f"Erro ao abrir o índice de {raiz}: {e}", file=sys.stderr)
+            codigo = 1
+            continue
+
+        try:
+            for lote in biblioteca.atualizar_em_lotes(raiz, pastas, marcadores.roteiro, marcadores.versao,
+                                                      args.completo, percurso=percurso):
+                for roteiro in lote:
+                    total += 1
+                    postados += roteiro.postado
+                    if args.changed_since and (roteiro.alterado or 0) < args.changed_since:
+                        continue
+                    escrever(registro_roteiro(roteiro, raiz, raizes, marcadores.roteiro if args.secoes else None))
+                saida.flush()
+        except BrokenPipeError:
+            raise
+        except Exception as e:
+            print(f"Erro ao varrer {raiz}: {e}", file=sys.stderr)
+            codigo = 1
+        finally:
+            biblioteca.fechar()
+        visitadas += percurso.visitadas
+        ignoradas += percurso.ignoradas
+
+    resumo = {
+        "tipo": "resumo",
+        "raizes": len(raizes),
+        "roteiros": total,
+        "postados": postados,
+        "pendentes": total - postados,
+        "pastas_visitadas": visitadas,
+        "pastas_ignoradas": ignoradas,
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+    if args.formato == 'json':
+        json.dump({"roteiros": documento, "resumo": resumo}, saida, ensure_ascii=False, indent=2)
+        saida.write("\n")
+    else:
+        escrever(resumo)
+    saida.flush()
+    return codigo
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="scriptcopier", description="Script Copier sem interface gráfica")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    scan = comandos.add_parser("scan", help="varre as pastas raiz e lista os roteiros (JSONL)")
+    scan.add_argument("raizes", nargs="*", metavar="RAIZ",
+                      help="pastas raiz (padrão: as registradas no app)")
+    scan.add_argument("--changed-since", type=ler_data, metavar="DATA",
+                      help="só roteiros alterados desde DATA (ISO ou segundos desde 1970)")
+    scan.add_argument("--completo", action="store_true",
+                      help="confere também os arquivos das pastas que não mudaram")
+    scan.add_argument("--secoes", action="store_true",
+                      help="inclui os títulos das seções (lê cada texto narrado)")
+    scan.add_argument("--profundidade", type=int, default=None, metavar="N",
+                      help="níveis de subpastas percorridos (padrão: o do app)")
+    scan.add_argument("--formato", choices=("jsonl", "json"), default="jsonl",
+                      help="jsonl (uma linha por roteiro, em fluxo) ou json (um documento no fim)")
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if args.profundidade is None:
+        args.profundidade = carregar_profundidade()
+
+    # JSON é UTF-8 mesmo quando o console do Windows usa outra página de código
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8')
+
+    saida = sys.stdout
+    try:
+        # Avisos da varredura (print) vão para stderr, para não misturar com o JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            return varrer(args, saida)
+    except BrokenPipeError:
+        # Saída fechada antes do fim (ex.: "| head"): evita outro erro ao sair
+        os.dup2(os.open(os.devnull, os.O_WRONLY), saida.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,431 @@
+"""
+Motor de detecção de seções do Script Copier Universal
+
+Todos os marcadores (OPENING, ACT, CHAPTER, ...) são compilados em UMA
+única expressão regular com grupos nomeados. O texto é percorrido uma
+única vez com finditer, em vez de testar cada linha contra vários
+padrões separados.
+
+Usado pelas três abas: Copiar Seções, árvore do Visualizar e árvore de
+estrutura. Os marcadores vêm de um registro (padrão + marcadores.json da
+pasta raiz), compilado uma vez por configuração.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from itertools import islice
+
+from identidade import id_titulo, impressao_texto
+from registro import obter_logger
+
+
+# Versão do parser: mude quando a detecção mudar (invalida o cache de seções)
+VERSAO_PARSER = "1"
+
+# Espaço em branco que NÃO atravessa quebra de linha
+_ESP = r'[^\S\n]'
+
+# Nome do arquivo de configuração de marcadores (na pasta raiz)
+NOME_ARQUIVO_MARCADORES = "marcadores.json"
+
+log = obter_logger("secoes")
+
+# Sufixos de título reaproveitados pelos marcadores padrão
+_TRACO_TITULO = rf'{_ESP}*[-–—].*\S'          # "OPENING - Título"
+_NUMERO_TRACO_TITULO = rf'{_ESP}+\w+{_ESP}*[-–—].*\S'  # "CHAPTER 1 - Título"
+_NUMERO = rf'{_ESP}+[IVX\d]+'                   # "ATO IV"
+
+# Registro padrão de marcadores (mesmo formato do marcadores.json)
+#   tipo: nome do tipo de seção | palavras: palavras-chave (texto literal)
+#   titulo: regex do que vem depois da palavra | nivel: hierarquia | icone: ícone na árvore
+# "roteiro" é usado na aba Copiar (exige "MARCADOR - Título" na linha inteira);
+# "estrutura" nas árvores do Visualizar (basta o prefixo).
+REGISTRO_PADRAO = {
+    'roteiro': {
+        'linha_inteira': True,
+        'marcadores': [
+            {'tipo': 'hook', 'palavras': ['OPENING'], 'titulo': _TRACO_TITULO, 'nivel': 1, 'icone': "🎬"},
+            {'tipo': 'capitulo', 'palavras': ['CHAPTER'], 'titulo': _NUMERO_TRACO_TITULO, 'nivel': 2, 'icone': "📖"},
+            {'tipo': 'ato', 'palavras': ['ACT', 'ATO'], 'titulo': _NUMERO_TRACO_TITULO, 'nivel': 1, 'icone': "🎭"},
+            {'tipo': 'conclusao', 'palavras': ['CLOSING', 'CONCLUSION'], 'titulo': _TRACO_TITULO, 'nivel': 1, 'icone': "🏁"},
+            {'tipo': 'epilogo', 'palavras': ['EPILOGUE'], 'titulo': _TRACO_TITULO, 'nivel': 1, 'icone': "📖"},
+        ],
+    },
+    'estrutura': {
+        'limpar_decoracao': True,
+        'marcadores': [
+            {'tipo': 'ato', 'palavras': ['ATO', 'ACT'], 'titulo': _NUMERO, 'nivel': 1, 'icone': "🎭"},
+            {'tipo': 'parte', 'palavras': ['PARTE', 'PART'], 'titulo': _NUMERO, 'nivel': 1, 'icone': "📚"},
+            {'tipo': 'capitulo', 'palavras': ['CAPÍTULO', 'CAPITULO', 'CHAPTER', 'CAP.', 'CAP'], 'titulo': _NUMERO, 'nivel': 2, 'icone': "📖"},
+            {'tipo': 'cena', 'palavras': ['CENA', 'SCENE'], 'titulo': _NUMERO, 'nivel': 3, 'icone': "📖"},
+            {'tipo': 'hook', 'palavras': ['HOOK', 'ABERTURA', 'OPENING'], 'titulo': '', 'nivel': 1, 'icone': "🎬"},
+            {'tipo': 'conclusao', 'palavras': ['CONCLUSÃO', 'CONCLUSAO', 'CLOSING', 'ENCERRAMENTO'], 'titulo': '', 'nivel': 1, 'icone': "🏁"},
+            {'tipo': 'epilogo', 'palavras': ['EPÍLOGO', 'EPILOGO', 'EPILOGUE'], 'titulo': '', 'nivel': 1, 'icone': "📖"},
+        ],
+    },
+    # Divisão por blocos (roteiros sem marcadores)
+    #   intervalo_minimo: linhas em branco seguidas que separam dois blocos
+    #   tamanho_maximo: caracteres por bloco (blocos maiores são quebrados numa linha)
+    'blocos': {
+        'intervalo_minimo': 2,
+        'tamanho_maximo': 20000,
+    },
+}
+
+# Símbolos decorativos no fim do título ("ACT 1 ━━━━")
+_RE_DECORACAO_FINAL = re.compile(r'\s*[▓━\-=]+\s*$')
+
+# Palavras contadas direto no buffer, sem fatiar o texto
+_RE_PALAVRA = re.compile(r'\S+')
+
+# Um título encontrado no texto
+Marcador = namedtuple('Marcador', 'tipo titulo linha inicio fim')
+
+
+class Secao:
+    """Seção do roteiro: apenas offsets para o buffer compartilhado
+
+    O texto só é criado quando a seção é exibida ou copiada. As contagens
+    são calculadas uma vez e guardadas.
+    """
+
+    __slots__ = ('buffer', 'tipo', 'titulo', 'inicio', 'fim',
+                 'linha_inicio', 'linha_fim', '_palavras')
+
+    def __init__(self, buffer, tipo, titulo, inicio, fim, linha_inicio, linha_fim):
+        # Ajusta os offsets para ignorar espaços nas pontas (equivale a strip)
+        while inicio < fim and buffer[inicio].isspace():
+            inicio += 1
+        while fim > inicio and buffer[fim - 1].isspace():
+            fim -= 1
+
+        self.buffer = buffer
+        self.tipo = tipo
+        self.titulo = titulo
+        self.inicio = inicio
+        self.fim = fim
+        self.linha_inicio = linha_inicio
+        self.linha_fim = linha_fim
+        self._palavras = None
+
+    @classmethod
+    def sem_texto(cls, tipo, titulo, linha_inicio, linha_fim, palavras):
+        """Seção conhecida só pelas linhas (ex.: vinda do cache); buffer fica None"""
+        secao = cls.__new__(cls)
+        secao.buffer = None
+        secao.tipo = tipo
+        secao.titulo = titulo
+        secao.inicio = secao.fim = 0
+        secao.linha_inicio = linha_inicio
+        secao.linha_fim = linha_fim
+        secao._palavras = palavras
+        return secao
+
+    @property
+    def texto(self):
+        """Texto da seção (criado sob demanda)"""
+        return self.buffer[self.inicio:self.fim]
+
+    @property
+    def caracteres(self):
+        return self.fim - self.inicio
+
+    @property
+    def palavras(self):
+        if self._palavras is None:
+            self._palavras = sum(1 for _ in _RE_PALAVRA.finditer(self.buffer, self.inicio, self.fim))
+        return self._palavras
+
+    @property
+    def linhas(self):
+        return self.buffer.count('\n', self.inicio, self.fim) + 1
+
+    @property
+    def id(self):
+        """Id estável da seção no histórico de cópias (do título normalizado)"""
+        return id_titulo(self.titulo)
+
+    @property
+    def impressao(self):
+        """Impressão digital do conteúdo (None se a seção não tem o texto)"""
+        return impressao_texto(self.texto) if self.buffer is not None else None
+
+    def __repr__(self):
+        return f"Secao({self.tipo!r}, {self.titulo!r}, {self.inicio}:{self.fim})"
+
+
+class DetectorSecoes:
+    """Detector de seções com todos os marcadores em uma única regex"""
+
+    def __init__(self, marcadores, linha_inteira=False, limpar_decoracao=False):
+        self.definicoes = marcadores
+        self.limpar_decoracao = limpar_decoracao
+
+        # Um grupo nomeado por marcador: m0, m1, ... (tipos podem se repetir)
+        alternativas = '|'.join(
+            f"(?P<m{i}>(?:{'|'.join(re.escape(p) for p in marcador['palavras'])}){marcador.get('titulo', '')})"
+            for i, marcador in enumerate(marcadores)
+        )
+        fim = rf'{_ESP}*$' if linha_inteira else ''
+        self.regex = re.compile(
+            rf'^{_ESP}*(?:{alternativas}){fim}',
+            re.IGNORECASE | re.MULTILINE
+        )
+
+        self._tipos = {f'm{i}': marcador['tipo'] for i, marcador in enumerate(marcadores)}
+        self.icones = {}
+        self.niveis = {}
+        for marcador in marcadores:
+            self.icones.setdefault(marcador['tipo'], marcador.get('icone', "📖"))
+            self.niveis.setdefault(marcador['tipo'], marcador.get('nivel', 1))
+
+    def icone(self, tipo):
+        return self.icones.get(tipo, "📖")
+
+    def marcadores(self, texto):
+        """Percorre o texto uma vez e gera os títulos de seção encontrados"""
+        linha = 0
+        posicao = 0
+        for match in self.regex.finditer(texto):
+            # Regex do usuário com \s pode atravessar linhas: não é um título
+            if '\n' in match.group():
+                continue
+
+            inicio = match.start()
+            linha += texto.count('\n', posicao, inicio)
+            posicao = inicio
+
+            fim = texto.find('\n', match.end())
+            if fim == -1:
+                fim = len(texto)
+
+            yield Marcador(self._tipos[match.lastgroup], self._titulo(texto[inicio:fim]), linha, inicio, fim)
+
+    def identificar_linha(self, linha):
+        """Retorna (tipo, titulo) se a linha for um título de seção, senão None"""
+        match = self.regex.match(linha)
+        if match:
+            return self._tipos[match.lastgroup], self._titulo(linha)
+        return None
+
+    def _titulo(self, linha):
+        titulo = linha.strip()
+        if self.limpar_decoracao:
+            titulo = _RE_DECORACAO_FINAL.sub('', titulo)
+        return titulo
+
+    def secoes(self, texto):
+        """Retorna as seções do texto (o que vem antes do 1º título é ignorado)"""
+        marcadores = list(self.marcadores(texto))
+        total_linhas = texto.count('\n')
+        secoes = []
+
+        for i, marcador in enumerate(marcadores):
+            if i + 1 < len(marcadores):
+                proximo = marcadores[i + 1]
+                fim, linha_fim = proximo.inicio, proximo.linha - 1
+            else:
+                fim, linha_fim = len(texto), total_linhas
+
+            secoes.append(Secao(
+                texto,
+                marcador.tipo,
+                marcador.titulo,
+                marcador.inicio,
+                fim,
+                marcador.linha,
+                linha_fim
+            ))
+
+        return secoes
+
+
+# Registros já compilados, pela hash da configuração
+Marcadores = namedtuple('Marcadores', 'versao roteiro estrutura blocos')
+_marcadores_compilados = {}
+
+
+# Chaves aceitas em cada perfil do marcadores.json
+_CHAVES_PERFIL = {
+    'roteiro': {'marcadores', 'substituir', 'linha_inteira', 'limpar_decoracao'},
+    'estrutura': {'marcadores', 'substituir', 'linha_inteira', 'limpar_decoracao'},
+    'blocos': {'intervalo_minimo', 'tamanho_maximo'},
+}
+
+
+def _validar_marcador(marcador):
+    """ValueError se o marcador do usuário não tem tipo, palavras e título válidos"""
+    if not isinstance(marcador, dict):
+        raise ValueError(f"marcador inválido: {marcador!r}")
+    if not isinstance(marcador.get('tipo'), str):
+        raise ValueError(f"marcador sem \"tipo\": {marcador!r}")
+    palavras = marcador.get('palavras')
+    if not palavras or not isinstance(palavras, list) or not all(isinstance(p, str) and p for p in palavras):
+        raise ValueError(f"marcador {marcador['tipo']!r} sem \"palavras\"")
+    titulo = marcador.get('titulo', '')
+    if not isinstance(titulo, str):
+        raise ValueError(f"marcador {marcador['tipo']!r} com \"titulo\" inválido")
+    try:
+        re.compile(titulo)
+    except re.error as e:
+        raise ValueError(f"marcador {marcador['tipo']!r}: regex do título inválida ({e})")
+
+
+def _mesclar_marcadores(config_usuario):
+    """Registro padrão com o marcadores.json aplicado (ValueError se a configuração é inválida)"""
+    if not isinstance(config_usuario, dict):
+        raise ValueError("o arquivo deve ser um objeto JSON")
+    registro = {perfil: dict(config) for perfil, config in REGISTRO_PADRAO.items()}
+    for perfil, config in config_usuario.items():
+        if perfil not in registro:
+            continue
+        if not isinstance(config, dict):
+            raise ValueError(f"perfil {perfil!r} inválido")
+        desconhecidas = set(config) - _CHAVES_PERFIL[perfil]
+        if desconhecidas:
+            raise ValueError(f"chave(s) desconhecida(s) em {perfil!r}: {', '.join(sorted(desconhecidas))}")
+        marcadores = config.get('marcadores', [])
+        if not isinstance(marcadores, list):
+            raise ValueError(f"\"marcadores\" de {perfil!r} deve ser uma lista")
+        for marcador in marcadores:
+            _validar_marcador(marcador)
+
+        padrao = registro[perfil].get('marcadores')
+        registro[perfil].update({k: v for k, v in config.items() if k != 'substituir'})
+        if padrao is not None:
+            registro[perfil]['marcadores'] = marcadores + ([] if config.get('substituir') else padrao)
+    return registro
+
+
+def _compilar_marcadores(registro):
+    chave = hashlib.sha1(json.dumps(registro, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    if chave not in _marcadores_compilados:
+        _marcadores_compilados[chave] = Marcadores(
+            f"{VERSAO_PARSER}-{chave}",
+            DetectorSecoes(**registro['roteiro']),
+            DetectorSecoes(**registro['estrutura']),
+            registro['blocos']
+        )
+    return _marcadores_compilados[chave]
+
+
+def carregar_marcadores(pasta_raiz=None):
+    """Detectores da pasta raiz: padrão + marcadores.json (se existir)
+
+    No marcadores.json, cada perfil ("roteiro"/"estrutura") pode ter uma
+    lista "marcadores" no formato do REGISTRO_PADRAO. Eles são testados
+    antes dos padrão; com "substituir": true, os padrão são ignorados.
+    A compilação é feita uma vez por configuração. Um marcadores.json
+    inválido (JSON, chaves ou regex) é registrado no log e os padrão valem.
+    """
+    if pasta_raiz:
+        caminho = os.path.join(pasta_raiz, NOME_ARQUIVO_MARCADORES)
+        if os.path.exists(caminho):
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    config_usuario = json.load(f)
+                return _compilar_marcadores(_mesclar_marcadores(config_usuario))
+            except Exception as e:
+                log.warning("Erro ao ler %s: %s (usando marcadores padrão)", caminho, e)
+
+    return _compilar_marcadores(REGISTRO_PADRAO)
+
+
+# Detectores padrão (sem marcadores.json)
+MARCADORES_PADRAO = carregar_marcadores()
+DETECTOR_ROTEIRO = MARCADORES_PADRAO.roteiro
+DETECTOR_ESTRUTURA = MARCADORES_PADRAO.estrutura
+
+
+def secoes_em_fluxo(arquivo, detector=None):
+    """Gera as seções de um arquivo aberto, lendo linha a linha
+
+    Cada seção é entregue assim que o próximo título aparece, então só o
+    texto da seção atual fica em memória. Aceita qualquer iterável de
+    linhas (arquivo aberto, lista, sys.stdin).
+    """
+    detector = detector or DETECTOR_ROTEIRO
+    atual = None  # (tipo, titulo, linha_inicio)
+    partes = []
+    numero = -1
+    linha = ''
+
+    for numero, linha in enumerate(arquivo):
+        marcador = detector.identificar_linha(linha)
+        if marcador:
+            if atual:
+                yield _secao_de_partes(partes, atual, numero - 1)
+            atual = (marcador[0], marcador[1], numero)
+            partes = [linha]
+        elif atual:
+            partes.append(linha)
+
+    if atual:
+        # Mesma contagem de detector.secoes: a quebra final abre uma linha vazia
+        yield _secao_de_partes(partes, atual, numero + linha.endswith('\n'))
+
+
+def _secao_de_partes(partes, atual, linha_fim):
+    """Monta uma Secao com buffer próprio a partir das linhas acumuladas"""
+    tipo, titulo, linha_inicio = atual
+    buffer = ''.join(partes)
+    return Secao(buffer, tipo, titulo, 0, len(buffer), linha_inicio, linha_fim)
+
+
+def blocos_em_fluxo(arquivo, intervalo_minimo=2, tamanho_maximo=20000):
+    """Divide um texto sem marcadores em blocos separados por linhas em branco
+
+    Lê linha a linha (um único passe): intervalo_minimo linhas em branco
+    seguidas (ou só com espaços) fecham o bloco, e um bloco que passaria de
+    tamanho_maximo caracteres é fechado antes da linha que o estouraria.
+    """
+    partes = []
+    tamanho = 0
+    linha_inicio = 0
+    ultima_com_texto = -1
+    vazias = 0
+    total = 0
+
+    for numero, linha in enumerate(arquivo):
+        if not linha.strip():
+            vazias += 1
+            if vazias == max(1, intervalo_minimo) and partes:
+                total += 1
+                yield _bloco(partes, total, linha_inicio, ultima_com_texto)
+                partes, tamanho = [], 0
+            if partes:
+                partes.append(linha)
+                tamanho += len(linha)
+            continue
+
+        if partes and tamanho + len(linha) > tamanho_maximo:
+            total += 1
+            yield _bloco(partes, total, linha_inicio, ultima_com_texto)
+            partes, tamanho = [], 0
+
+        if not partes:
+            linha_inicio = numero
+        partes.append(linha)
+        tamanho += len(linha)
+        ultima_com_texto = numero
+        vazias = 0
+
+    if partes:
+        total += 1
+        yield _bloco(partes, total, linha_inicio, ultima_com_texto)
+
+
+def _bloco(partes, numero, linha_inicio, linha_fim):
+    """Secao do tipo bloco, com título tirado das primeiras palavras"""
+    buffer = ''.join(partes)
+    secao = Secao(buffer, 'bloco', "", 0, len(buffer), linha_inicio, linha_fim)
+
+    # Só o começo do bloco é percorrido para o título
+    primeiras_palavras = ' '.join(m.group() for m in islice(_RE_PALAVRA.finditer(buffer, secao.inicio, secao.fim), 5))
+    if len(primeiras_palavras) > 50:
+        primeiras_palavras = primeiras_palavras[:50] + "..."
+    secao.titulo = f"Bloco {numero}: {primeiras_palavras}"
+    return secao
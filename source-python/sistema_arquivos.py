@@ -0,0 +1,276 @@
+"""
+Listagem de pastas via os.scandir, com cache por pasta
+
+Uma chamada a os.scandir devolve nome, tipo (pasta/arquivo) e, no
+Windows, o stat de cada entrada, sem um subprocesso nem um stat por
+item. Arquivos ocultos também aparecem. A listagem de cada pasta fica
+em cache e só é refeita quando o mtime da pasta muda (criar, apagar ou
+renomear itens muda o mtime da pasta).
+
+Atenção: editar um arquivo não muda o mtime da pasta. Quem precisa do
+tamanho/mtime atual de um arquivo (ex.: cache de seções) deve usar
+os.stat no próprio arquivo.
+
+PercursoPastas desce pelas subpastas (ex.: ano/mês/canal/roteiro) até
+uma profundidade máxima, pulando as pastas do .scriptcopierignore.
+"""
+
+import fnmatch
+import os
+import threading
+import time
+
+
+# Pastas alteradas há menos que isso são relistadas sempre
+# (sistemas de arquivos com mtime de baixa resolução, ex.: FAT = 2s)
+_MARGEM_MTIME_NS = 2_000_000_000
+
+# Listagem conferida há menos que isso é usada sem outro stat da pasta
+# (uma varredura consulta a mesma pasta várias vezes seguidas)
+_VALIDADE_NS = 1_000_000_000
+
+NOME_ARQUIVO_IGNORAR = ".scriptcopierignore"
+
+# Subpastas listadas abaixo da raiz (1 = só as subpastas diretas)
+PROFUNDIDADE_PADRAO = 4
+
+# Pastas examinadas ao mesmo tempo num mesmo compartilhamento/disco
+# (num compartilhamento de rede cada stat/leitura é uma ida e volta)
+SONDAGENS_POR_COMPARTILHAMENTO = 8
+
+# Pastas que nunca têm roteiros (somam-se às do .scriptcopierignore)
+IGNORAR_PADRAO = ("node_modules", ".git", "__pycache__", "$RECYCLE.BIN", "System Volume Information")
+
+# Tipos de sistema de arquivos de rede (Linux, /proc/mounts)
+SISTEMAS_REDE = ("cifs", "smb3", "smbfs", "nfs", "nfs4", "fuse.sshfs", "9p")
+
+
+
+def listar_entradas(pasta):
+    """Entradas da pasta (os.DirEntry) em um único passe, incluindo ocultas"""
+    with os.scandir(pasta) as entradas:
+        return list(entradas)
+
+
+class ListagemPastas:
+    """Cache das listagens de pastas, invalidado pelo mtime de cada pasta"""
+
+    def __init__(self):
+        # {pasta: [mtime_ns, conferida_em_ns, [DirEntry], {nome normalizado: DirEntry}]}
+        self._cache = {}
+
+    def _listagem(self, pasta):
+        chave = os.path.normcase(os.path.normpath(pasta))
+        agora = time.time_ns()
+
+        em_cache = self._cache.get(chave)
+        if em_cache and agora - em_cache[1] < _VALIDADE_NS:
+            return em_cache
+
+        mtime_ns = os.stat(pasta).st_mtime_ns
+        if em_cache and em_cache[0] == mtime_ns and agora - mtime_ns > _MARGEM_MTIME_NS:
+            em_cache[1] = agora
+            return em_cache
+
+        entradas = listar_entradas(pasta)
+        listagem = [mtime_ns, agora, entradas, {os.path.normcase(e.name): e for e in entradas}]
+        self._cache[chave] = listagem
+        return listagem
+
+    def listar(self, pasta):
+        """Todas as entradas da pasta, na ordem do sistema (como os.listdir)"""
+        return self._listagem(pasta)[2]
+
+    def arquivos(self, pasta, extensoes=None):
+        """Arquivos da pasta, opcionalmente só com as extensões dadas"""
+        return [
+            entrada for entrada in self.listar(pasta)
+            if (extensoes is None or entrada.name.endswith(extensoes)) and entrada.is_file()
+        ]
+
+    def subpastas(self, pasta):
+        return [entrada for entrada in self.listar(pasta) if entrada.is_dir()]
+
+    def entrada(self, pasta, nome):
+        """DirEntry do item da pasta (None se não existir), sem stat extra"""
+        return self._listagem(pasta)[3].get(os.path.normcase(nome))
+
+    def existe(self, pasta, nome):
+        return self.entrada(pasta, nome) is not None
+
+    def invalidar(self, pasta=None):
+        """Esquece a listagem de uma pasta (ou de todas), ex.: após criar um arquivo nela"""
+        if pasta is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(os.path.normcase(os.path.normpath(pasta)), None)
+
+
+def caminho_relativo(raiz, caminho):
+    """Caminho de uma pasta relativo à raiz (None se for a própria raiz ou estiver fora dela)"""
+    try:
+        relativo = os.path.relpath(caminho, raiz)
+    except ValueError:
+        return None  # Outro drive (Windows)
+    if relativo == os.curdir or relativo == os.pardir or relativo.startswith(os.pardir + os.sep):
+        return None
+    return relativo
+
+
+def compartilhamento(caminho):
+    """Compartilhamento (\\\\servidor\\pasta), drive ou ponto de montagem onde está o caminho"""
+    drive, _ = os.path.splitdrive(os.path.abspath(caminho))
+    if drive:
+        return os.path.normcase(drive)
+    caminho = os.path.realpath(caminho)
+    while not os.path.ismount(caminho):
+        caminho = os.path.dirname(caminho)
+    return caminho
+
+
+def em_rede(caminho):
+    """True se o caminho está num compartilhamento de rede (UNC, drive mapeado, cifs/nfs)"""
+    caminho = os.path.abspath(caminho)
+    if caminho.startswith('\\\\'):
+        return True
+    if os.name == 'nt':
+        import ctypes
+        drive = os.path.splitdrive(caminho)[0] + '\\'
+        return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+
+    ponto = compartilhamento(caminho)
+    tipo = None
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8', errors='replace') as f:
+            for linha in f:
+                campos = linha.split()
+                if len(campos) > 2 and campos[1].replace('\\040', ' ') == ponto:
+                    tipo = campos[2]  # A última montagem no mesmo ponto é a que vale
+    except OSError:
+        pass  # Sem /proc (macOS): tratado como local
+    return tipo in SISTEMAS_REDE
+
+
+_limites = {}  # {compartilhamento: Semaphore}
+_trava_limites = threading.Lock()
+
+
+def limite_compartilhamento(caminho):
+    """Semáforo que limita as sondagens simultâneas no compartilhamento do caminho
+
+    É o mesmo para todas as raízes de um compartilhamento: buscar dois
+    canais do mesmo servidor não dobra as conexões.
+    """
+    chave = compartilhamento(caminho)
+    with _trava_limites:
+        if chave not in _limites:
+            _limites[chave] = threading.BoundedSemaphore(SONDAGENS_POR_COMPARTILHAMENTO)
+        return _limites[chave]
+
+
+class RegrasIgnorar:
+    """Regras do .scriptcopierignore (como no .gitignore, mas só para pastas)
+
+    Uma regra por linha; linhas vazias e começando com # são puladas.
+    Sem "/" a regra vale para o nome da pasta em qualquer nível
+    (renders/, node_modules, *_old); com "/" vale para o caminho a partir
+    da raiz (2019/*/audio).
+    """
+
+    def __init__(self, padroes=()):
+        self.por_nome = []
+        self.por_caminho = []
+        for padrao in padroes:
+            padrao = padrao.strip().rstrip('/')
+            if not padrao or padrao.startswith('#'):
+                continue
+            if '/' in padrao:
+                self.por_caminho.append(padrao.lstrip('/'))
+            else:
+                self.por_nome.append(padrao)
+
+    def ignorar(self, relativo):
+        """True se a pasta (caminho relativo à raiz) deve ser pulada com tudo o que tem dentro"""
+        relativo = relativo.replace(os.sep, '/')
+        nome = relativo.rsplit('/', 1)[-1]
+        return (any(fnmatch.fnmatch(nome, padrao) for padrao in self.por_nome)
+                or any(fnmatch.fnmatch(relativo, padrao) for padrao in self.por_caminho))
+
+
+def carregar_regras_ignorar(raiz):
+    """Regras padrão mais as do .scriptcopierignore da raiz, se existir"""
+    padroes = list(IGNORAR_PADRAO)
+    caminho = os.path.join(raiz, NOME_ARQUIVO_IGNORAR)
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            padroes.extend(f.read().splitlines())
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Erro ao ler {caminho}: {e}")
+    return RegrasIgnorar(padroes)
+
+
+class PercursoPastas:
+    """Percorre as subpastas da raiz até uma profundidade, sem entrar nas ignoradas
+
+    Gera (caminho relativo, DirEntry) de cada subpasta. Quem percorre
+    chama podar() para não descer na última pasta gerada (ex.: já é uma
+    pasta de roteiro). Pastas ignoradas não chegam a ser listadas.
+    inicio (relativo à raiz) percorre só o que está dentro daquela pasta.
+
+    Quem só sabe depois se deve descer (ex.: a pasta é examinada em outra
+    thread) poda e chama descer() mais tarde; um novo "for" continua o
+    percurso de onde parou.
+
+    Ao final: visitadas = pastas listadas, ignoradas = puladas pelas
+    regras, no_limite = não exploradas por causa da profundidade.
+    """
+
+    def __init__(self, raiz, pastas, profundidade_maxima=PROFUNDIDADE_PADRAO, regras=None, inicio=""):
+        self.raiz = raiz
+        self.inicio = os.path.normpath(inicio) if inicio else ""
+        self.pastas = pastas
+        self.profundidade_maxima = max(1, profundidade_maxima)
+        self.regras = regras
+        self.visitadas = self.ignoradas = self.no_limite = 0
+        self._podar = False
+
+        self._pilha = []  # (relativo, caminho, nível das subpastas) a listar
+        self.descer(self.inicio, os.path.join(self.raiz, self.inicio), contar=False)
+
+    def podar(self):
+        self._podar = True
+
+    def descer(self, relativo, caminho, contar=True):
+        """Inclui no percurso as subpastas de uma pasta (se couberem na profundidade)"""
+        nivel = relativo.count(os.sep) + 2 if relativo else 1
+        if nivel <= self.profundidade_maxima:
+            self._pilha.append((relativo, caminho, nivel))
+        elif contar:
+            self.no_limite += 1
+
+    def __iter__(self):
+        while self._pilha:
+            relativo, caminho, nivel = self._pilha.pop()
+            try:
+                subpastas = self.pastas.subpastas(caminho)
+            except OSError as e:
+                print(f"Erro ao listar {caminho}: {e}")
+                continue
+            self.visitadas += 1
+
+            filhas = []
+            for entrada in subpastas:
+                relativo_filha = os.path.join(relativo, entrada.name) if relativo else entrada.name
+                if self.regras and self.regras.ignorar(relativo_filha):
+                    self.ignoradas += 1
+                    continue
+
+                self._podar = False
+                yield relativo_filha, entrada
+                if not self._podar:
+                    filhas.append((relativo_filha, entrada.path))
+
+            for relativo_filha, caminho_filha in reversed(filhas):
+                self.descer(relativo_filha, caminho_filha)
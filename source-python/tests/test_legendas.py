@@ -0,0 +1,70 @@
+"""
+Testes do motor de legendas .srt
+
+Uso:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from legendas import Legendas
+
+
+SRT_NORMAL = """1
+00:00:01,000 --> 00:00:02,500
+Primeira linha
+continua aqui
+
+2
+00:00:03,000 --> 00:00:04,000
+Segunda legenda
+"""
+
+# Sem linha em branco entre os cues (comum em arquivos exportados à mão)
+SRT_SEM_SEPARADOR = """1
+00:00:01,000 --> 00:00:02,500
+Primeira linha
+continua aqui
+2
+00:00:03,000 --> 00:00:04,000
+Segunda legenda
+3
+00:00:05,000 --> 00:00:06,000
+Terceira
+"""
+
+
+class TestTextoDosCues(unittest.TestCase):
+
+    def test_cues_separados_por_linha_em_branco(self):
+        legendas = Legendas(SRT_NORMAL)
+        self.assertEqual(len(legendas), 2)
+        self.assertEqual(legendas.texto(0), "Primeira linha\ncontinua aqui")
+        self.assertEqual(legendas.texto(1), "Segunda legenda")
+
+    def test_cues_sem_linha_em_branco(self):
+        legendas = Legendas(SRT_SEM_SEPARADOR)
+        self.assertEqual(len(legendas), 3)
+        self.assertEqual(legendas.texto(0), "Primeira linha\ncontinua aqui")
+        self.assertEqual(legendas.texto(1), "Segunda legenda")
+        self.assertEqual(legendas.texto(2), "Terceira")
+
+    def test_numero_no_texto_sem_linha_de_tempo_depois(self):
+        legendas = Legendas("1\n00:00:01,000 --> 00:00:02,000\nCapítulo\n42\n")
+        self.assertEqual(legendas.texto(0), "Capítulo\n42")
+
+    def test_srt_cues_sem_linha_em_branco(self):
+        legendas = Legendas(SRT_SEM_SEPARADOR)
+        self.assertEqual(
+            legendas.srt_cues([0, 1]),
+            "1\n00:00:01,000 --> 00:00:02,500\nPrimeira linha\ncontinua aqui\n\n"
+            "2\n00:00:03,000 --> 00:00:04,000\nSegunda legenda\n"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()